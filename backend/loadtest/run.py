@@ -0,0 +1,437 @@
+"""Concurrency load test for the backend.
+
+Replays realistic wizard sessions (upload, streamed analysis, several applies with
+varying accepted_change_ids, PDF and preview fetches) at increasing concurrency
+levels, and writes a JSON and a Markdown report with per-endpoint latency
+percentiles, throughput, error rates and pdflatex CPU/memory.
+
+By default the backend and a stub Anthropic API (loadtest/stub_anthropic.py) are
+started as subprocesses, with DATA_DIR in a temporary directory:
+
+    cd backend
+    python -m loadtest.run --levels 1,2,4,8 --duration 60
+
+Pass --backend-url to test an already running instance instead (it should be
+configured with ANTHROPIC_BASE_URL pointing at the stub). Reports contain no
+timestamps or host details, so runs on different commits can be diffed directly.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import fitz  # PyMuPDF
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+REPO_ROOT = BACKEND_DIR.parent
+SAMPLE_JOB_PATH = REPO_ROOT / "examples" / "sample-job.json"
+
+SAMPLE_INTERVAL_SECONDS = 0.1
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+FIRST_NAMES = ["Alex", "Sam", "Robin", "Kim", "Noa", "Charlie", "Maya", "Elias"]
+SKILLS = ["Python", "SQL", "Spark", "Airflow", "Docker", "Kafka", "dbt", "Terraform"]
+
+
+# --- Measurements -------------------------------------------------------------
+
+
+@dataclass
+class Recorder:
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    # Errors that were 429s from admission control (a subset of errors)
+    rejected: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    sessions: int = 0
+
+    def record(self, endpoint: str, seconds: float, ok: bool, status: int | None = None) -> None:
+        self.latencies[endpoint].append(seconds)
+        if not ok:
+            self.errors[endpoint] += 1
+        if status == 429:
+            self.rejected[endpoint] += 1
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    rank = max(1, round(pct / 100 * len(sorted_values) + 0.5 - 1e-9))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class PdflatexSampler:
+    """Samples CPU time and RSS of pdflatex processes from /proc.
+
+    With a root PID only descendants of that process are counted, otherwise every
+    pdflatex process on the host. CPU time is taken from the last sample of each
+    process, so up to one sampling interval per process is not counted.
+    """
+
+    def __init__(self, root_pid: int | None) -> None:
+        self.root_pid = root_pid
+        self.available = Path("/proc/self/stat").exists()
+        self.reset()
+
+    def reset(self) -> None:
+        self.cpu_ticks: dict[int, int] = {}
+        self.peak_rss: dict[int, int] = {}
+        self.peak_concurrent = 0
+
+    @staticmethod
+    def _stat(pid: int) -> tuple[str, int, int, int] | None:
+        """(comm, ppid, utime+stime ticks, rss bytes) of a process."""
+        try:
+            raw = Path(f"/proc/{pid}/stat").read_text()
+        except OSError:
+            return None
+        comm = raw[raw.index("(") + 1:raw.rindex(")")]
+        fields = raw[raw.rindex(")") + 2:].split()
+        # fields[0] is field 3 (state) of proc(5)
+        return comm, int(fields[1]), int(fields[11]) + int(fields[12]), int(fields[21]) * PAGE_SIZE
+
+    def _descends_from_root(self, ppid: int) -> bool:
+        for _ in range(4):
+            if ppid == self.root_pid:
+                return True
+            stat = self._stat(ppid)
+            if stat is None:
+                return False
+            ppid = stat[1]
+        return False
+
+    def sample(self) -> None:
+        if not self.available:
+            return
+        running = 0
+        for entry in Path("/proc").iterdir():
+            if not entry.name.isdigit():
+                continue
+            stat = self._stat(int(entry.name))
+            if stat is None or stat[0] != "pdflatex":
+                continue
+            comm, ppid, ticks, rss = stat
+            if self.root_pid is not None and not self._descends_from_root(ppid):
+                continue
+            pid = int(entry.name)
+            running += 1
+            self.cpu_ticks[pid] = ticks
+            self.peak_rss[pid] = max(rss, self.peak_rss.get(pid, 0))
+        self.peak_concurrent = max(self.peak_concurrent, running)
+
+    async def run(self) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(SAMPLE_INTERVAL_SECONDS)
+
+    def summary(self) -> dict | None:
+        if not self.available:
+            return None
+        return {
+            "processes": len(self.cpu_ticks),
+            "cpu_seconds": round(sum(self.cpu_ticks.values()) / CLOCK_TICKS, 2),
+            "peak_rss_mb": round(max(self.peak_rss.values(), default=0) / 1024 / 1024, 1),
+            "peak_concurrent": self.peak_concurrent,
+        }
+
+
+# --- Sessions -----------------------------------------------------------------
+
+
+def make_cv_pdf(rng: random.Random) -> bytes:
+    """A one-page text CV that is unique per session (so every session is a cache miss)."""
+    doc = fitz.open()
+    page = doc.new_page()
+    name = f"{rng.choice(FIRST_NAMES)} {rng.randrange(10**6):06d}"
+    lines = [name, "", "Experience"]
+    for _ in range(6):
+        skills = ", ".join(rng.sample(SKILLS, 3))
+        lines.append(f"- Built data pipelines with {skills} for reporting ({rng.randrange(1000)})")
+    lines += ["", "Skills", ", ".join(SKILLS)]
+    page.insert_text((50, 60), "\n".join(lines), fontsize=10)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+async def _timed(recorder: Recorder, endpoint: str, coro) -> httpx.Response | None:
+    start = time.perf_counter()
+    try:
+        response = await coro
+    except httpx.HTTPError:
+        recorder.record(endpoint, time.perf_counter() - start, ok=False)
+        return None
+    recorder.record(
+        endpoint, time.perf_counter() - start, ok=response.is_success, status=response.status_code
+    )
+    return response
+
+
+async def _analyze(client: httpx.AsyncClient, recorder: Recorder, cv_id: str, job: dict):
+    """Run the streamed analysis; returns (job_id, change_ids) or None on failure."""
+    start = time.perf_counter()
+    job_id, change_ids, event, ok, status = None, [], None, False, None
+    try:
+        async with client.stream("POST", "/api/cv/analyze/stream", json={"cv_id": cv_id, "job": job}) as r:
+            status = r.status_code
+            if not r.is_success:
+                await r.aread()
+            else:
+                async for line in r.aiter_lines():
+                    if line.startswith("event: "):
+                        event = line[len("event: "):]
+                        continue
+                    if not line.startswith("data: "):
+                        continue
+                    data = json.loads(line[len("data: "):])
+                    if event == "meta":
+                        job_id = data["job_id"]
+                    elif event == "summary":
+                        recorder.record("analyze_stream.first_result", time.perf_counter() - start, ok=True)
+                    elif event == "change":
+                        change_ids.append(data["id"])
+                    elif event == "done":
+                        ok = True
+                    elif event == "error":
+                        break
+    except httpx.HTTPError:
+        pass
+    recorder.record("analyze_stream", time.perf_counter() - start, ok=ok, status=status)
+    return (job_id, change_ids) if ok else None
+
+
+async def run_session(
+    client: httpx.AsyncClient, recorder: Recorder, rng: random.Random, job: dict, applies: int
+) -> None:
+    files = {"file": ("cv.pdf", make_cv_pdf(rng), "application/pdf")}
+    r = await _timed(recorder, "upload", client.post("/api/cv/upload", files=files))
+    if r is None or not r.is_success:
+        return
+    cv_id = r.json()["id"]
+
+    result = await _analyze(client, recorder, cv_id, job)
+    if result is None or not result[1]:
+        return
+    job_id, change_ids = result
+
+    # Users toggle changes between applies; each apply uses a different subset
+    for _ in range(applies):
+        accepted = rng.sample(change_ids, rng.randint(1, len(change_ids)))
+        r = await _timed(recorder, "apply", client.post("/api/cv/apply", json={
+            "cv_id": cv_id, "job_id": job_id, "accepted_change_ids": accepted,
+        }))
+        if r is None or not r.is_success:
+            continue
+        urls = r.json()
+        await _timed(recorder, "pdf_optimized", client.get(urls["optimized_pdf_url"]))
+        await _timed(recorder, "pdf_highlighted", client.get(urls["highlighted_pdf_url"]))
+        await _timed(recorder, "preview", client.get(f"{urls['highlighted_pdf_url']}/preview/1"))
+
+    recorder.sessions += 1
+
+
+async def run_level(
+    base_url: str, concurrency: int, duration: float, applies: int, seed: int,
+    sampler: PdflatexSampler, job: dict,
+) -> dict:
+    recorder = Recorder()
+    sampler.reset()
+    deadline = time.perf_counter() + duration
+
+    async def user(index: int) -> None:
+        rng = random.Random(f"{seed}-{concurrency}-{index}")
+        while time.perf_counter() < deadline:
+            await run_session(client, recorder, rng, job, applies)
+
+    start = time.perf_counter()
+    async with httpx.AsyncClient(base_url=base_url, timeout=600) as client:
+        await asyncio.gather(*(user(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    endpoints = {}
+    for name in sorted(recorder.latencies):
+        values = sorted(recorder.latencies[name])
+        endpoints[name] = {
+            "count": len(values),
+            "errors": recorder.errors[name],
+            "error_rate": round(recorder.errors[name] / len(values), 4),
+            "rejected": recorder.rejected[name],
+            "p50_ms": round(percentile(values, 50) * 1000),
+            "p95_ms": round(percentile(values, 95) * 1000),
+            "p99_ms": round(percentile(values, 99) * 1000),
+            "max_ms": round(values[-1] * 1000),
+        }
+    requests = sum(e["count"] for n, e in endpoints.items() if n != "analyze_stream.first_result")
+    return {
+        "concurrency": concurrency,
+        "elapsed_seconds": round(elapsed, 1),
+        "sessions": recorder.sessions,
+        "sessions_per_second": round(recorder.sessions / elapsed, 3),
+        "requests_per_second": round(requests / elapsed, 3),
+        "endpoints": endpoints,
+        "pdflatex": sampler.summary(),
+    }
+
+
+# --- Processes ----------------------------------------------------------------
+
+
+def _spawn(args: list[str], env: dict, log_path: Path) -> subprocess.Popen:
+    log = log_path.open("wb")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", *args],
+        cwd=REPO_ROOT,  # the backend resolves examples/ relative to the working directory
+        env={**os.environ, "PYTHONPATH": str(BACKEND_DIR), **env},
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+
+
+async def _wait_ready(base_url: str, timeout: float) -> dict:
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=base_url, timeout=5) as client:
+        while time.perf_counter() < deadline:
+            try:
+                r = await client.get("/api/ready")
+                details = r.json()
+                if details.get("status") != "warming":
+                    return details
+            except (httpx.HTTPError, ValueError):
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"Backend at {base_url} did not finish warming up in {timeout:.0f}s")
+
+
+# --- Reports ------------------------------------------------------------------
+
+
+def render_markdown(report: dict) -> str:
+    config = report["config"]
+    lines = [
+        "# Load test report",
+        "",
+        f"Stub latency {config['stub_latency_ms']} ms, {config['stub_tokens_per_second']} tokens/s; "
+        f"{config['duration_seconds']} s per level; {config['applies_per_session']} applies per session; "
+        f"seed {config['seed']}.",
+        "",
+        "| Concurrency | Sessions/s | Requests/s | pdflatex CPU s | pdflatex peak RSS MB | Peak concurrent pdflatex |",
+        "|---|---|---|---|---|---|",
+    ]
+    for level in report["levels"]:
+        tex = level["pdflatex"] or {}
+        lines.append(
+            f"| {level['concurrency']} | {level['sessions_per_second']} | {level['requests_per_second']} "
+            f"| {tex.get('cpu_seconds', 'n/a')} | {tex.get('peak_rss_mb', 'n/a')} "
+            f"| {tex.get('peak_concurrent', 'n/a')} |"
+        )
+    for level in report["levels"]:
+        lines += [
+            "",
+            f"## Concurrency {level['concurrency']}",
+            "",
+            "| Endpoint | Count | Error rate | Rejected (429) | p50 ms | p95 ms | p99 ms | max ms |",
+            "|---|---|---|---|---|---|---|---|",
+        ]
+        for name, e in level["endpoints"].items():
+            lines.append(
+                f"| {name} | {e['count']} | {e['error_rate']:.2%} | {e['rejected']} | {e['p50_ms']} "
+                f"| {e['p95_ms']} | {e['p99_ms']} | {e['max_ms']} |"
+            )
+    return "\n".join(lines) + "\n"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--backend-url", help="Test a running backend instead of spawning one")
+    parser.add_argument("--levels", default="1,2,4,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds per concurrency level")
+    parser.add_argument("--applies", type=int, default=3, help="Applies per session")
+    parser.add_argument("--stub-latency-ms", type=float, default=800)
+    parser.add_argument("--stub-tokens-per-second", type=float, default=80)
+    parser.add_argument("--stub-port", type=int, default=8100)
+    parser.add_argument("--backend-port", type=int, default=8200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, default=BACKEND_DIR / "loadtest" / "reports")
+    args = parser.parse_args()
+
+    job = json.loads(SAMPLE_JOB_PATH.read_text(encoding="utf-8"))
+    job = {k: job[k] for k in ("title", "company", "location", "type", "description")}
+
+    processes: list[subprocess.Popen] = []
+    workdir = tempfile.TemporaryDirectory(prefix="jobbmatch-loadtest-")
+    sampling: asyncio.Task | None = None
+    try:
+        base_url = args.backend_url
+        backend_pid = None
+        if base_url is None:
+            logs = Path(workdir.name)
+            processes.append(_spawn(
+                ["loadtest.stub_anthropic:app", "--port", str(args.stub_port), "--log-level", "warning"],
+                {
+                    "STUB_LATENCY_MS": str(args.stub_latency_ms),
+                    "STUB_TOKENS_PER_SECOND": str(args.stub_tokens_per_second),
+                },
+                logs / "stub.log",
+            ))
+            backend = _spawn(
+                ["src.main:app", "--port", str(args.backend_port), "--log-level", "warning"],
+                {
+                    "ANTHROPIC_API_KEY": "stub",
+                    "ANTHROPIC_BASE_URL": f"http://127.0.0.1:{args.stub_port}",
+                    "DATA_DIR": str(logs / "data"),
+                },
+                logs / "backend.log",
+            )
+            processes.append(backend)
+            backend_pid = backend.pid
+            base_url = f"http://127.0.0.1:{args.backend_port}"
+
+        readiness = await _wait_ready(base_url, timeout=120)
+        if readiness.get("status") != "ready":
+            print(f"Warning: backend is not fully ready: {json.dumps(readiness['components'])}", file=sys.stderr)
+
+        sampler = PdflatexSampler(backend_pid)
+        sampling = asyncio.create_task(sampler.run())
+        levels = []
+        for concurrency in (int(level) for level in args.levels.split(",")):
+            print(f"Running {concurrency} concurrent sessions for {args.duration:.0f}s...", file=sys.stderr)
+            levels.append(await run_level(
+                base_url, concurrency, args.duration, args.applies, args.seed, sampler, job,
+            ))
+    finally:
+        if sampling is not None:
+            sampling.cancel()
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+        workdir.cleanup()
+
+    report = {
+        "config": {
+            "levels": [level["concurrency"] for level in levels],
+            "duration_seconds": args.duration,
+            "applies_per_session": args.applies,
+            "stub_latency_ms": args.stub_latency_ms,
+            "stub_tokens_per_second": args.stub_tokens_per_second,
+            "seed": args.seed,
+        },
+        "levels": levels,
+    }
+    args.output.mkdir(parents=True, exist_ok=True)
+    (args.output / "loadtest.json").write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+    (args.output / "loadtest.md").write_text(render_markdown(report))
+    print(f"Wrote {args.output / 'loadtest.json'} and {args.output / 'loadtest.md'}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
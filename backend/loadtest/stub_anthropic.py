@@ -0,0 +1,215 @@
+"""Local stand-in for the Anthropic Messages API, for load tests.
+
+Answers the requests the backend makes (vision LaTeX generation, page fragments,
+full-document optimization, diff-only LaTeX edits, streamed analysis tool calls and
+the models list) with plausible, deterministic content. Latency is simulated as a
+time to first token plus output tokens at a fixed rate, both configurable:
+
+    STUB_LATENCY_MS=800 STUB_TOKENS_PER_SECOND=80 \\
+        uvicorn loadtest.stub_anthropic:app --port 8100
+
+Point the backend at it with ANTHROPIC_BASE_URL=http://localhost:8100.
+"""
+
+import asyncio
+import json
+import os
+import re
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LATENCY_MS = float(os.environ.get("STUB_LATENCY_MS", "800"))
+TOKENS_PER_SECOND = float(os.environ.get("STUB_TOKENS_PER_SECOND", "80"))
+# Characters per output token, for converting generated text into simulated tokens
+CHARS_PER_TOKEN = 4
+STREAM_CHUNK_CHARS = 64
+
+_PLACEHOLDER = re.compile(r"\[([A-Za-z][^\]=\\]*)\]")
+_RESUME_ITEM = re.compile(r"\\resumeItem\{([^{}]{20,})\}")
+
+app = FastAPI(title="Stub Anthropic API")
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+async def _generation_delay(text: str) -> None:
+    await asyncio.sleep(LATENCY_MS / 1000 + _tokens(text) / TOKENS_PER_SECOND)
+
+
+def _prompt_text(body: dict) -> str:
+    parts = []
+    for message in body.get("messages", []):
+        content = message.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        else:
+            parts.extend(block.get("text", "") for block in content if block.get("type") == "text")
+    return "\n".join(parts)
+
+
+def _section(text: str, start_marker: str, end_marker: str) -> str:
+    start = text.index(start_marker) + len(start_marker)
+    end = text.index(end_marker, start)
+    return text[start:end].strip("\n")
+
+
+def _fill_placeholders(latex: str) -> str:
+    """Replace template placeholders like [Company Name] with plausible content."""
+    counter = iter(range(1, 10_000))
+
+    def fill(match: re.Match) -> str:
+        label = match.group(1)
+        if "description" in label.lower() or "bullet" in label.lower() or "summary" in label.lower():
+            return (
+                f"Designed and maintained data pipelines processing event streams for analytics "
+                f"and reporting across teams, item {next(counter)}"
+            )
+        return f"{label} {next(counter)}"
+
+    return _PLACEHOLDER.sub(fill, latex)
+
+
+def _fill_document(template: str) -> str:
+    start = template.index("\\begin{document}")
+    return template[:start] + _fill_placeholders(template[start:])
+
+
+def _text_reply(prompt: str) -> str:
+    if "=== TEMPLATE BODY ===" in prompt:
+        return _fill_placeholders(_section(prompt, "=== TEMPLATE BODY ===\n", "=== END TEMPLATE BODY ==="))
+    if "=== LATEX TEMPLATE ===" in prompt:
+        return _fill_document(_section(prompt, "=== LATEX TEMPLATE ===\n", "=== END TEMPLATE ==="))
+    if "=== ORIGINAL CV LATEX ===" in prompt:
+        latex = _section(prompt, "=== ORIGINAL CV LATEX ===\n", "\n\nYou must respond")
+        return (
+            f"---CLEAN_LATEX---\n{latex}\n---HIGHLIGHTED_LATEX---\n{latex}\n"
+            "---SUMMARY---\n- Tightened bullet points around data engineering keywords"
+        )
+    return "OK"
+
+
+def _analysis(prompt: str) -> dict:
+    latex = _section(prompt, "=== FULL CV LATEX ===\n", "\n\n=== LATEX SNIPPET")
+    items = list(dict.fromkeys(_RESUME_ITEM.findall(latex)))[:8]
+    impacts = ("high", "medium", "low")
+    return {
+        "score": 64,
+        "score_label": "Needs Work",
+        "matched_keywords": ["Python", "SQL", "Git"],
+        "missing_keywords": ["GCP", "CI/CD", "Golang"],
+        "section_scores": [
+            {"section": "Summary", "relevance": "moderate"},
+            {"section": "Skills", "relevance": "weak"},
+            {"section": "Experience", "relevance": "strong"},
+            {"section": "Education", "relevance": "moderate"},
+        ],
+        "issues": [{"text": "Cloud platforms are not mentioned", "severity": "high"}],
+        "strengths": [{"text": "Hands-on pipeline experience"}],
+        "changes": [
+            {
+                "id": f"change-{i}",
+                "section": "Experience",
+                "original_text": item,
+                "proposed_text": item.replace("data pipelines", "GCP data pipelines", 1),
+                "reason": "Adds a missing keyword without lengthening the bullet",
+                "impact": impacts[(i - 1) % 3],
+            }
+            for i, item in enumerate(items, start=1)
+        ],
+    }
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _stream_tool_use(body: dict, tool_name: str, tool_input: dict):
+    payload = json.dumps(tool_input)
+    output_tokens = _tokens(payload)
+    yield _sse("message_start", {
+        "type": "message_start",
+        "message": {
+            "id": f"msg_{uuid.uuid4().hex[:24]}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "stub"),
+            "content": [],
+            "stop_reason": None,
+            "stop_sequence": None,
+            "usage": {"input_tokens": _tokens(_prompt_text(body)), "output_tokens": 1},
+        },
+    })
+    await asyncio.sleep(LATENCY_MS / 1000)
+    yield _sse("content_block_start", {
+        "type": "content_block_start",
+        "index": 0,
+        "content_block": {"type": "tool_use", "id": f"toolu_{uuid.uuid4().hex[:24]}", "name": tool_name, "input": {}},
+    })
+    for i in range(0, len(payload), STREAM_CHUNK_CHARS):
+        chunk = payload[i:i + STREAM_CHUNK_CHARS]
+        await asyncio.sleep(_tokens(chunk) / TOKENS_PER_SECOND)
+        yield _sse("content_block_delta", {
+            "type": "content_block_delta",
+            "index": 0,
+            "delta": {"type": "input_json_delta", "partial_json": chunk},
+        })
+    yield _sse("content_block_stop", {"type": "content_block_stop", "index": 0})
+    yield _sse("message_delta", {
+        "type": "message_delta",
+        "delta": {"stop_reason": "tool_use", "stop_sequence": None},
+        "usage": {"output_tokens": output_tokens},
+    })
+    yield _sse("message_stop", {"type": "message_stop"})
+
+
+@app.post("/v1/messages")
+async def create_message(request: Request):
+    body = await request.json()
+    prompt = _prompt_text(body)
+
+    tool_choice = body.get("tool_choice") or {}
+    if tool_choice.get("type") == "tool":
+        if tool_choice["name"] == "report_latex_edits":
+            tool_input = {"edits": []}
+        else:
+            tool_input = _analysis(prompt)
+        if body.get("stream"):
+            return StreamingResponse(
+                _stream_tool_use(body, tool_choice["name"], tool_input),
+                media_type="text/event-stream",
+            )
+        await _generation_delay(json.dumps(tool_input))
+        content = [{"type": "tool_use", "id": "toolu_stub", "name": tool_choice["name"], "input": tool_input}]
+        output = json.dumps(tool_input)
+        stop_reason = "tool_use"
+    else:
+        output = _text_reply(prompt)
+        await _generation_delay(output)
+        content = [{"type": "text", "text": output}]
+        stop_reason = "end_turn"
+
+    return JSONResponse({
+        "id": f"msg_{uuid.uuid4().hex[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": body.get("model", "stub"),
+        "content": content,
+        "stop_reason": stop_reason,
+        "stop_sequence": None,
+        "usage": {"input_tokens": _tokens(prompt), "output_tokens": _tokens(output)},
+    })
+
+
+@app.get("/v1/models")
+async def list_models():
+    model = {
+        "type": "model",
+        "id": "claude-opus-4-6",
+        "display_name": "Stub model",
+        "created_at": "2025-01-01T00:00:00Z",
+    }
+    return {"data": [model], "has_more": False, "first_id": model["id"], "last_id": model["id"]}
@@ -1,11 +1,22 @@
+import asyncio
 import hashlib
 import json
 import logging
-import shutil
-from pathlib import Path
-
-from fastapi import APIRouter, HTTPException, UploadFile
-from fastapi.responses import FileResponse
+import re
+from contextlib import asynccontextmanager, nullcontext
+
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Path as PathParam,
+    Query,
+    Request,
+    UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
 
 from src.config import settings
 from src.models.cv import (
@@ -13,22 +24,77 @@ from src.models.cv import (
     CVAnalyzeResponse,
     CVApplyRequest,
     CVApplyResponse,
+    CVEstimateRequest,
+    CVEstimateResponse,
     CVProcessRequest,
     CVProcessResponse,
     CVUploadResponse,
+    LivePreviewUpdate,
+)
+from src.services.admission import Overloaded, get_queue
+from src.services.cv_analyzer import (
+    analyze_cv_for_job,
+    compute_job_id,
+    load_cached_analysis,
+    replay_analysis,
+    stream_analysis,
+)
+from src.services.cv_applier import (
+    apply_changes_and_compile,
+    change_set_artifact_key,
+    is_change_set_compiled,
+    load_cached_inputs,
+    overlay_highlights,
 )
-from src.services.cv_analyzer import analyze_cv_for_job, compute_job_id
-from src.services.cv_applier import apply_changes_and_compile
-from src.services.cv_optimizer import optimize_cv
+from src.services.cv_optimizer import load_sample_job, optimize_cv
 from src.services.latex_compiler import compile_latex
-from src.services.latex_generator import generate_latex
+from src.services.latex_generator import convert_cv
+from src.services.live_preview import LivePreviewSession
+from src.services.page_estimator import cached_layout, fit_changes
+from src.services.page_preview import (
+    MEDIA_TYPES,
+    artifact_digest,
+    get_page_preview,
+    webp_available,
+)
+from src.services.pdf_highlighter import changed_phrases
 from src.services.pdf_parser import pdf_to_images
+from src.services.speculation import (
+    cancel_speculation,
+    claim_speculation,
+    schedule_speculative_compiles,
+)
+from src.services.storage import LocalArtifactStore, get_store
 
 logger = logging.getLogger("uvicorn.error")
 
 router = APIRouter()
 
-SAMPLE_JOB_PATH = Path("examples/sample-job.json")
+# cv_id, job_id and change set IDs are all 16-hex-digit content hashes
+ARTIFACT_ID_PATTERN = r"^[0-9a-f]{16}$"
+
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+def _too_busy(e: Overloaded) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=f"The server is busy ({e}). Please try again shortly.",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+@asynccontextmanager
+async def _admitted(queue: str):
+    """Hold a slot of the named admission queue for the enclosed uncached work (429 if full)."""
+    try:
+        admission = await get_queue(queue).acquire()
+    except Overloaded as e:
+        raise _too_busy(e)
+    try:
+        yield
+    finally:
+        admission.release()
 
 
 @router.post("/api/cv/upload", response_model=CVUploadResponse)
@@ -47,12 +113,12 @@ async def upload_cv(file: UploadFile):
     # Deterministic ID from file content — same PDF always gets same ID
     cv_id = hashlib.sha256(content).hexdigest()[:16]
 
-    upload_dir = settings.DATA_DIR / "uploads"
-    upload_dir.mkdir(parents=True, exist_ok=True)
-
-    file_path = upload_dir / f"{cv_id}.pdf"
-    if not file_path.exists():
-        file_path.write_bytes(content)
+    store = get_store()
+    upload_key = f"uploads/{cv_id}.pdf"
+    if not await asyncio.to_thread(store.exists, upload_key):
+        await asyncio.to_thread(store.write_bytes, upload_key, content)
+    else:
+        await asyncio.to_thread(store.touch, upload_key)
 
     return CVUploadResponse(id=cv_id, filename=file.filename)
 
@@ -60,85 +126,99 @@ async def upload_cv(file: UploadFile):
 @router.post("/api/cv/process", response_model=CVProcessResponse)
 async def process_cv(request: CVProcessRequest):
     cv_id = request.id
-    pdf_path = settings.DATA_DIR / "uploads" / f"{cv_id}.pdf"
+    store = get_store()
+    upload_key = f"uploads/{cv_id}.pdf"
 
-    if not pdf_path.exists():
+    if not await asyncio.to_thread(store.exists, upload_key):
         raise HTTPException(status_code=404, detail="CV not found. Please upload first.")
 
     # Demo shortcut: if full results already cached, return immediately
-    generated_dir = settings.DATA_DIR / "generated" / cv_id
-    cached_optimized = generated_dir / f"{cv_id}_optimized.pdf"
-    cached_highlighted = generated_dir / f"{cv_id}_highlighted.pdf"
-    cached_summary = generated_dir / "summary.txt"
+    optimized_key = f"generated/{cv_id}/{cv_id}_optimized.pdf"
+    highlighted_key = f"generated/{cv_id}/{cv_id}_highlighted.pdf"
+    summary_key = f"generated/{cv_id}/summary.txt"
 
-    if cached_optimized.exists() and cached_highlighted.exists() and cached_summary.exists():
+    cached = await asyncio.to_thread(
+        lambda: all(store.exists(k) for k in (optimized_key, highlighted_key, summary_key))
+    )
+    if cached:
         logger.info(f"Returning fully cached results for {cv_id}")
+        get_queue("process").bypass()
+        for key in (optimized_key, highlighted_key, summary_key):
+            await asyncio.to_thread(store.touch, key)
         return CVProcessResponse(
             id=cv_id,
             original_pdf_url=f"/api/cv/{cv_id}/original",
             optimized_pdf_url=f"/api/cv/{cv_id}/optimized",
             highlighted_pdf_url=f"/api/cv/{cv_id}/highlighted",
-            changes_summary=cached_summary.read_text(encoding="utf-8"),
+            changes_summary=await asyncio.to_thread(store.read_text, summary_key),
         )
 
     # Load job description
-    if not SAMPLE_JOB_PATH.exists():
-        raise HTTPException(status_code=500, detail="Job description file not found")
-
-    job_description = json.loads(SAMPLE_JOB_PATH.read_text(encoding="utf-8"))
-
-    # Step 1: Convert PDF to images
     try:
-        images = pdf_to_images(pdf_path)
-    except Exception as e:
-        logger.error(f"Failed to parse PDF: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Failed to parse PDF: {e}")
-
-    generated_dir = settings.DATA_DIR / "generated" / cv_id
-    generated_dir.mkdir(parents=True, exist_ok=True)
-    cached_latex_path = generated_dir / "original.tex"
+        job_description = load_sample_job()
+    except FileNotFoundError:
+        raise HTTPException(status_code=500, detail="Job description file not found")
 
-    # Step 2: Generate LaTeX from images via Claude (or use cached)
-    if cached_latex_path.exists():
-        logger.info(f"Using cached LaTeX for {cv_id}")
-        original_latex = cached_latex_path.read_text(encoding="utf-8")
-    else:
+    async with _admitted("process"):
+        # Step 1: Convert PDF to images
         try:
-            original_latex = await generate_latex(images)
-            cached_latex_path.write_text(original_latex, encoding="utf-8")
+            pdf_path = await asyncio.to_thread(store.local_path, upload_key)
+            images = pdf_to_images(pdf_path)
         except Exception as e:
-            logger.error(f"Failed to generate LaTeX from PDF: {e}", exc_info=True)
-            raise HTTPException(status_code=500, detail=f"Failed to generate LaTeX from PDF: {e}")
-
-    # Step 3: Optimize LaTeX for job description
-    try:
-        clean_latex, highlighted_latex, changes_summary = await optimize_cv(original_latex, job_description)
-    except Exception as e:
-        logger.error(f"Failed to optimize CV: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Failed to optimize CV: {e}")
+            logger.error(f"Failed to parse PDF: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Failed to parse PDF: {e}")
 
-    # Step 4: Compile clean optimized LaTeX to PDF (for download)
-    optimized_dir = generated_dir / "optimized"
-    try:
-        optimized_pdf = await compile_latex(clean_latex, optimized_dir)
-        final_optimized = generated_dir / f"{cv_id}_optimized.pdf"
-        shutil.copy2(optimized_pdf, final_optimized)
-    except RuntimeError as e:
-        logger.error(f"Failed to compile optimized LaTeX: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Failed to compile optimized LaTeX: {e}")
-
-    # Step 5: Compile highlighted LaTeX to PDF (for side-by-side comparison)
-    highlighted_dir = generated_dir / "highlighted"
-    try:
-        highlighted_pdf = await compile_latex(highlighted_latex, highlighted_dir)
-        final_highlighted = generated_dir / f"{cv_id}_highlighted.pdf"
-        shutil.copy2(highlighted_pdf, final_highlighted)
-    except RuntimeError as e:
-        logger.error(f"Failed to compile highlighted LaTeX: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Failed to compile highlighted LaTeX: {e}")
+        latex_key = f"generated/{cv_id}/original.tex"
+
+        # Step 2: Generate LaTeX from images via Claude (or use cached)
+        if await asyncio.to_thread(store.exists, latex_key):
+            logger.info(f"Using cached LaTeX for {cv_id}")
+            await asyncio.to_thread(store.touch, latex_key)
+            original_latex = await asyncio.to_thread(store.read_text, latex_key)
+        else:
+            try:
+                original_latex = await convert_cv(cv_id, pdf_path, images)
+                await asyncio.to_thread(store.write_text, latex_key, original_latex)
+            except Exception as e:
+                logger.error(f"Failed to generate LaTeX from PDF: {e}", exc_info=True)
+                raise HTTPException(status_code=500, detail=f"Failed to generate LaTeX from PDF: {e}")
+
+        # Step 3: Optimize LaTeX for job description
+        try:
+            clean_latex, highlighted_latex, changes_summary = await optimize_cv(original_latex, job_description)
+        except Exception as e:
+            logger.error(f"Failed to optimize CV: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Failed to optimize CV: {e}")
 
-    # Cache the summary for future demo runs
-    cached_summary.write_text(changes_summary, encoding="utf-8")
+        # Step 4: Compile clean optimized LaTeX to PDF (for download)
+        cancel_speculation(cv_id)
+        try:
+            optimized_pdf = await compile_latex(clean_latex, settings.DATA_DIR / optimized_key)
+            await asyncio.to_thread(store.put_file, optimized_key, optimized_pdf)
+        except RuntimeError as e:
+            logger.error(f"Failed to compile optimized LaTeX: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Failed to compile optimized LaTeX: {e}")
+
+        # Step 5: Compile highlighted LaTeX to PDF (for side-by-side comparison),
+        # or overlay the changed text onto the clean PDF in overlay mode
+        try:
+            highlighted_pdf = None
+            if settings.HIGHLIGHT_MODE == "overlay":
+                phrases = changed_phrases(original_latex, clean_latex)
+                highlighted_pdf = await overlay_highlights(
+                    optimized_pdf, phrases, settings.DATA_DIR / highlighted_key
+                )
+            if highlighted_pdf is None:
+                highlighted_pdf = await compile_latex(
+                    highlighted_latex, settings.DATA_DIR / highlighted_key
+                )
+            await asyncio.to_thread(store.put_file, highlighted_key, highlighted_pdf)
+        except RuntimeError as e:
+            logger.error(f"Failed to compile highlighted LaTeX: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Failed to compile highlighted LaTeX: {e}")
+
+        # Cache the summary for future demo runs
+        await asyncio.to_thread(store.write_text, summary_key, changes_summary)
 
     return CVProcessResponse(
         id=cv_id,
@@ -149,12 +229,42 @@ async def process_cv(request: CVProcessRequest):
     )
 
 
+async def _load_or_generate_latex(cv_id: str) -> str:
+    """Get the cached LaTeX reproduction of an uploaded CV, generating it if needed."""
+    store = get_store()
+    latex_key = f"generated/{cv_id}/original.tex"
+
+    if await asyncio.to_thread(store.exists, latex_key):
+        logger.info(f"Using cached LaTeX for {cv_id}")
+        await asyncio.to_thread(store.touch, latex_key)
+        return await asyncio.to_thread(store.read_text, latex_key)
+
+    # Convert PDF to images, then generate LaTeX via Claude vision
+    try:
+        pdf_path = await asyncio.to_thread(store.local_path, f"uploads/{cv_id}.pdf")
+        images = pdf_to_images(pdf_path)
+    except Exception as e:
+        logger.error(f"Failed to parse PDF: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to parse PDF: {e}")
+
+    try:
+        original_latex = await convert_cv(cv_id, pdf_path, images)
+        await asyncio.to_thread(store.write_text, latex_key, original_latex)
+    except Exception as e:
+        logger.error(f"Failed to generate LaTeX from PDF: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500, detail=f"Failed to generate LaTeX from PDF: {e}"
+        )
+    return original_latex
+
+
 @router.post("/api/cv/analyze", response_model=CVAnalyzeResponse)
 async def analyze_cv(request: CVAnalyzeRequest):
     cv_id = request.cv_id
-    pdf_path = settings.DATA_DIR / "uploads" / f"{cv_id}.pdf"
+    store = get_store()
+    upload_key = f"uploads/{cv_id}.pdf"
 
-    if not pdf_path.exists():
+    if not await asyncio.to_thread(store.exists, upload_key):
         raise HTTPException(status_code=404, detail="CV not found. Please upload first.")
 
     # Compute deterministic job ID from job description
@@ -162,12 +272,11 @@ async def analyze_cv(request: CVAnalyzeRequest):
     job_id = compute_job_id(job_dict)
 
     # Check for cached analysis
-    cached_analysis_path = (
-        settings.DATA_DIR / "generated" / cv_id / "analyses" / job_id / "analysis.json"
-    )
-    if cached_analysis_path.exists():
+    analysis = await asyncio.to_thread(load_cached_analysis, cv_id, job_id)
+    if analysis is not None:
         logger.info(f"Returning cached analysis for {cv_id}/{job_id}")
-        analysis = json.loads(cached_analysis_path.read_text(encoding="utf-8"))
+        get_queue("analyze").bypass()
+        await schedule_speculative_compiles(cv_id, job_id)
         return CVAnalyzeResponse(
             cv_id=cv_id,
             job_id=job_id,
@@ -181,37 +290,18 @@ async def analyze_cv(request: CVAnalyzeRequest):
             changes=analysis.get("changes", []),
         )
 
-    # Get or generate LaTeX from the uploaded PDF
-    generated_dir = settings.DATA_DIR / "generated" / cv_id
-    generated_dir.mkdir(parents=True, exist_ok=True)
-    cached_latex_path = generated_dir / "original.tex"
+    async with _admitted("analyze"):
+        original_latex = await _load_or_generate_latex(cv_id)
 
-    if cached_latex_path.exists():
-        logger.info(f"Using cached LaTeX for {cv_id}")
-        original_latex = cached_latex_path.read_text(encoding="utf-8")
-    else:
-        # Convert PDF to images, then generate LaTeX via Claude vision
+        # Run analysis via Claude
         try:
-            images = pdf_to_images(pdf_path)
+            analysis = await analyze_cv_for_job(original_latex, job_dict, cv_id, job_id)
         except Exception as e:
-            logger.error(f"Failed to parse PDF: {e}", exc_info=True)
-            raise HTTPException(status_code=500, detail=f"Failed to parse PDF: {e}")
+            logger.error(f"Failed to analyze CV: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Failed to analyze CV: {e}")
 
-        try:
-            original_latex = await generate_latex(images)
-            cached_latex_path.write_text(original_latex, encoding="utf-8")
-        except Exception as e:
-            logger.error(f"Failed to generate LaTeX from PDF: {e}", exc_info=True)
-            raise HTTPException(
-                status_code=500, detail=f"Failed to generate LaTeX from PDF: {e}"
-            )
-
-    # Run analysis via Claude
-    try:
-        analysis = await analyze_cv_for_job(original_latex, job_dict, cv_id, job_id)
-    except Exception as e:
-        logger.error(f"Failed to analyze CV: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Failed to analyze CV: {e}")
+    # Precompile the change sets the user is most likely to accept while they read
+    await schedule_speculative_compiles(cv_id, job_id)
 
     return CVAnalyzeResponse(
         cv_id=cv_id,
@@ -224,6 +314,87 @@ async def analyze_cv(request: CVAnalyzeRequest):
         issues=analysis.get("issues", []),
         strengths=analysis.get("strengths", []),
         changes=analysis.get("changes", []),
+        complete=not analysis.get("incomplete", False),
+    )
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/api/cv/analyze/stream")
+async def analyze_cv_stream(request: CVAnalyzeRequest):
+    """Same as /api/cv/analyze, streamed as Server-Sent Events.
+
+    Events: "meta" (cv_id, job_id), "status" (stage), "summary" (score, label,
+    keywords), "details" (section scores, issues, strengths), one "change" per
+    validated change, then "done" (complete: false if the result was salvaged
+    from a broken-off generation) or "error".
+    """
+    cv_id = request.cv_id
+    store = get_store()
+
+    if not await asyncio.to_thread(store.exists, f"uploads/{cv_id}.pdf"):
+        raise HTTPException(status_code=404, detail="CV not found. Please upload first.")
+
+    job_dict = request.job.model_dump()
+    job_id = compute_job_id(job_dict)
+
+    # Admit before the response starts, so an overloaded server can still answer 429
+    cached = await asyncio.to_thread(load_cached_analysis, cv_id, job_id)
+    admission = None
+    if cached is not None:
+        get_queue("analyze").bypass()
+    else:
+        try:
+            admission = await get_queue("analyze").acquire()
+        except Overloaded as e:
+            raise _too_busy(e)
+
+    async def events():
+        yield _sse("meta", {"cv_id": cv_id, "job_id": job_id})
+        try:
+            if cached is not None:
+                logger.info(f"Returning cached analysis for {cv_id}/{job_id}")
+                for event, data in replay_analysis(cached):
+                    if event != "done":
+                        yield _sse(event, data)
+                complete = True
+            else:
+                yield _sse("status", {"stage": "reading_cv"})
+                original_latex = await _load_or_generate_latex(cv_id)
+                yield _sse("status", {"stage": "analyzing"})
+                complete = False
+                async for event, data in stream_analysis(original_latex, job_dict, cv_id, job_id):
+                    if event == "done":
+                        complete = not data.get("incomplete", False)
+                    else:
+                        yield _sse(event, data)
+        except HTTPException as e:
+            yield _sse("error", {"detail": e.detail})
+            return
+        except Exception as e:
+            logger.error(f"Failed to analyze CV: {e}", exc_info=True)
+            yield _sse("error", {"detail": f"Failed to analyze CV: {e}"})
+            return
+
+        await schedule_speculative_compiles(cv_id, job_id)
+        yield _sse("done", {"cv_id": cv_id, "job_id": job_id, "complete": complete})
+
+    async def admitted_events():
+        try:
+            async for chunk in events():
+                yield chunk
+        finally:
+            if admission is not None:
+                admission.release()
+
+    return StreamingResponse(
+        admitted_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also releases the slot if the stream is never iterated (client gone early)
+        background=BackgroundTask(admission.release) if admission is not None else None,
     )
 
 
@@ -232,49 +403,255 @@ async def apply_cv_changes(request: CVApplyRequest):
     cv_id = request.cv_id
     job_id = request.job_id
     accepted_change_ids = request.accepted_change_ids
+    dropped_change_ids: list[str] = []
 
-    try:
-        orig_url, opt_url, hl_url = await apply_changes_and_compile(
-            cv_id, job_id, accepted_change_ids
+    if request.auto_fit:
+        try:
+            latex, changes = await asyncio.to_thread(load_cached_inputs, cv_id, job_id)
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        fit = fit_changes(
+            latex, changes, accepted_change_ids, original=cached_layout(cv_id, latex)
         )
-    except FileNotFoundError as e:
-        logger.error(f"File not found during apply: {e}", exc_info=True)
-        raise HTTPException(status_code=404, detail=str(e))
-    except RuntimeError as e:
-        logger.error(f"Failed to compile during apply: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Failed to compile CV: {e}")
-    except Exception as e:
-        logger.error(f"Failed to apply changes: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Failed to apply changes: {e}")
+        accepted_change_ids = fit.kept_ids
+        dropped_change_ids = fit.dropped_ids
+        if dropped_change_ids:
+            logger.info(
+                f"Auto-fit deselected {dropped_change_ids} for {cv_id}/{job_id} "
+                f"(predicted {fit.original.pages} -> {fit.estimated.pages} pages)"
+            )
+
+    # Already compiled change sets (e.g. speculatively) are cheap and always admitted
+    if await asyncio.to_thread(is_change_set_compiled, cv_id, job_id, accepted_change_ids):
+        get_queue("apply").bypass()
+        admission = nullcontext()
+    else:
+        admission = _admitted("apply")
+
+    async with admission:
+        # Reuse a matching speculative precompile, and stop any other speculation
+        await claim_speculation(cv_id, job_id, accepted_change_ids)
+
+        try:
+            set_id, orig_url, opt_url, hl_url = await apply_changes_and_compile(
+                cv_id, job_id, accepted_change_ids
+            )
+        except FileNotFoundError as e:
+            logger.error(f"File not found during apply: {e}", exc_info=True)
+            raise HTTPException(status_code=404, detail=str(e))
+        except RuntimeError as e:
+            logger.error(f"Failed to compile during apply: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Failed to compile CV: {e}")
+        except Exception as e:
+            logger.error(f"Failed to apply changes: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Failed to apply changes: {e}")
 
     return CVApplyResponse(
         cv_id=cv_id,
+        change_set_id=set_id,
         original_pdf_url=orig_url,
         optimized_pdf_url=opt_url,
         highlighted_pdf_url=hl_url,
+        dropped_change_ids=dropped_change_ids,
+    )
+
+
+@router.websocket("/api/cv/{cv_id}/jobs/{job_id}/live")
+async def live_preview(websocket: WebSocket, cv_id: str, job_id: str):
+    """Live preview while reviewing changes.
+
+    The client sends {"accepted_change_ids": [...]} whenever the selection changes.
+    The server answers with {"type": "compiling" | "ready" | "busy" | "error", "revision": n, ...}
+    where n counts the client's messages; "ready" carries the change set's PDF URLs and
+    "busy" (the apply queue is full) a "retry_after" in seconds.
+    Superseded selections are never compiled to completion.
+    """
+    await websocket.accept()
+    if not (re.fullmatch(ARTIFACT_ID_PATTERN, cv_id) and re.fullmatch(ARTIFACT_ID_PATTERN, job_id)):
+        await websocket.close(code=4404, reason="Unknown CV or job")
+        return
+    try:
+        session = await asyncio.to_thread(LivePreviewSession, cv_id, job_id, websocket.send_json)
+    except FileNotFoundError as e:
+        await websocket.close(code=4404, reason=str(e))
+        return
+
+    try:
+        while True:
+            try:
+                update = LivePreviewUpdate.model_validate(await websocket.receive_json())
+            except ValueError as e:  # bad JSON or failed validation
+                await websocket.send_json({"type": "error", "detail": f"Invalid message: {e}"})
+                continue
+            session.update(update.accepted_change_ids)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        session.close()
+
+
+@router.post("/api/cv/estimate", response_model=CVEstimateResponse)
+async def estimate_cv_pages(request: CVEstimateRequest):
+    """Predict page usage for a set of accepted changes without compiling."""
+    try:
+        latex, changes = await asyncio.to_thread(
+            load_cached_inputs, request.cv_id, request.job_id
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    fit = fit_changes(
+        latex, changes, request.accepted_change_ids,
+        original=cached_layout(request.cv_id, latex),
+    )
+
+    return CVEstimateResponse(
+        cv_id=request.cv_id,
+        job_id=request.job_id,
+        original_pages=fit.original.pages,
+        estimated_pages=fit.requested.pages,
+        estimated_usage=round(fit.requested.usage, 3),
+        overflowing_change_ids=fit.dropped_ids,
+        line_deltas=fit.line_deltas,
     )
 
 
 @router.get("/api/cv/{cv_id}/original")
 async def get_original_pdf(cv_id: str):
     # Serve the actual uploaded PDF, not a reproduced version
-    pdf_path = settings.DATA_DIR / "uploads" / f"{cv_id}.pdf"
-    if not pdf_path.exists():
+    store = get_store()
+    upload_key = f"uploads/{cv_id}.pdf"
+    if not await asyncio.to_thread(store.exists, upload_key):
         raise HTTPException(status_code=404, detail="Original PDF not found")
+    await asyncio.to_thread(store.touch, upload_key)
+    pdf_path = await asyncio.to_thread(store.local_path, upload_key)
     return FileResponse(pdf_path, media_type="application/pdf", filename=f"{cv_id}_original.pdf")
 
 
+async def _latest_pdf(key: str, filename: str) -> Response:
+    """Serve a mutable (latest-result) PDF, never from the S3 backend's local cache.
+
+    Local files get a FileResponse (Content-Length, Last-Modified/ETag, range requests);
+    S3 objects are streamed straight from the bucket.
+    """
+    store = get_store()
+    await asyncio.to_thread(store.touch, key)
+    if isinstance(store, LocalArtifactStore):
+        pdf_path = await asyncio.to_thread(store.local_path, key)
+        return FileResponse(pdf_path, media_type="application/pdf", filename=filename)
+    return StreamingResponse(
+        store.iter_bytes(key),
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get("/api/cv/{cv_id}/optimized")
 async def get_optimized_pdf(cv_id: str):
-    pdf_path = settings.DATA_DIR / "generated" / cv_id / f"{cv_id}_optimized.pdf"
-    if not pdf_path.exists():
+    key = f"generated/{cv_id}/{cv_id}_optimized.pdf"
+    if not await asyncio.to_thread(get_store().exists, key):
         raise HTTPException(status_code=404, detail="Optimized PDF not found")
-    return FileResponse(pdf_path, media_type="application/pdf", filename=f"{cv_id}_optimized.pdf")
+    return await _latest_pdf(key, f"{cv_id}_optimized.pdf")
 
 
 @router.get("/api/cv/{cv_id}/highlighted")
 async def get_highlighted_pdf(cv_id: str):
-    pdf_path = settings.DATA_DIR / "generated" / cv_id / f"{cv_id}_highlighted.pdf"
-    if not pdf_path.exists():
+    key = f"generated/{cv_id}/{cv_id}_highlighted.pdf"
+    if not await asyncio.to_thread(get_store().exists, key):
         raise HTTPException(status_code=404, detail="Highlighted PDF not found")
-    return FileResponse(pdf_path, media_type="application/pdf", filename=f"{cv_id}_highlighted.pdf")
+    return await _latest_pdf(key, f"{cv_id}_highlighted.pdf")
+
+
+@router.get("/api/cv/{cv_id}/jobs/{job_id}/sets/{set_id}/{kind}")
+async def get_change_set_pdf(
+    kind: str,
+    cv_id: str = PathParam(pattern=ARTIFACT_ID_PATTERN),
+    job_id: str = PathParam(pattern=ARTIFACT_ID_PATTERN),
+    set_id: str = PathParam(pattern=ARTIFACT_ID_PATTERN),
+):
+    """Serve the PDF compiled for one change set. Its content never changes."""
+    if kind not in ("optimized", "highlighted"):
+        raise HTTPException(status_code=404, detail="Unknown PDF kind")
+    store = get_store()
+    key = change_set_artifact_key(cv_id, job_id, set_id, kind)
+    if not await asyncio.to_thread(store.exists, key):
+        raise HTTPException(status_code=404, detail=f"{kind.capitalize()} PDF not found")
+    await asyncio.to_thread(store.touch, key)
+    pdf_path = await asyncio.to_thread(store.local_path, key)
+    return FileResponse(
+        pdf_path,
+        media_type="application/pdf",
+        filename=f"{cv_id}_{kind}.pdf",
+        headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL},
+    )
+
+
+async def _preview_response(
+    request: Request, key: str, immutable: bool, page: int, width: int, fmt: str
+) -> Response:
+    """Serve a page preview image of a PDF artifact, honouring If-None-Match."""
+    if fmt == "webp" and not webp_available():
+        fmt = "png"
+
+    store = get_store()
+    if not await asyncio.to_thread(store.exists, key):
+        raise HTTPException(status_code=404, detail="PDF not found")
+    await asyncio.to_thread(store.touch, key)
+
+    digest, pdf_bytes = await artifact_digest(key, immutable)
+    etag = f'"{digest[:32]}-{page}-{width}-{fmt}"'
+    headers = {
+        "ETag": etag,
+        # Mutable "latest" PDFs keep their URL, so clients must revalidate
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if immutable else "private, no-cache",
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    try:
+        image = await get_page_preview(key, digest, pdf_bytes, page, width, fmt)
+    except IndexError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to render preview of {key}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to render preview: {e}")
+
+    return Response(content=image, media_type=MEDIA_TYPES[fmt], headers=headers)
+
+
+@router.get("/api/cv/{cv_id}/{kind}/preview/{page}")
+async def get_pdf_preview(
+    request: Request,
+    kind: str,
+    page: int = PathParam(ge=1),
+    cv_id: str = PathParam(pattern=ARTIFACT_ID_PATTERN),
+    width: int = Query(default=600, ge=100, le=2000),
+    fmt: str = Query(default="webp", alias="format", pattern="^(webp|png)$"),
+):
+    """Render a page of the original or latest optimized/highlighted PDF as an image."""
+    if kind == "original":
+        return await _preview_response(
+            request, f"uploads/{cv_id}.pdf", True, page, width, fmt
+        )
+    if kind in ("optimized", "highlighted"):
+        key = f"generated/{cv_id}/{cv_id}_{kind}.pdf"
+        return await _preview_response(request, key, False, page, width, fmt)
+    raise HTTPException(status_code=404, detail="Unknown PDF kind")
+
+
+@router.get("/api/cv/{cv_id}/jobs/{job_id}/sets/{set_id}/{kind}/preview/{page}")
+async def get_change_set_preview(
+    request: Request,
+    kind: str,
+    page: int = PathParam(ge=1),
+    cv_id: str = PathParam(pattern=ARTIFACT_ID_PATTERN),
+    job_id: str = PathParam(pattern=ARTIFACT_ID_PATTERN),
+    set_id: str = PathParam(pattern=ARTIFACT_ID_PATTERN),
+    width: int = Query(default=600, ge=100, le=2000),
+    fmt: str = Query(default="webp", alias="format", pattern="^(webp|png)$"),
+):
+    """Render a page of a change set's optimized/highlighted PDF as an image."""
+    if kind not in ("optimized", "highlighted"):
+        raise HTTPException(status_code=404, detail="Unknown PDF kind")
+    key = change_set_artifact_key(cv_id, job_id, set_id, kind)
+    return await _preview_response(request, key, True, page, width, fmt)
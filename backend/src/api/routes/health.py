@@ -1,4 +1,8 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from src.services.admission import admission_stats
+from src.services.warmup import readiness
 
 router = APIRouter()
 
@@ -6,3 +10,16 @@ router = APIRouter()
 @router.get("/api/health")
 async def health_check():
     return {"status": "ok"}
+
+
+@router.get("/api/ready")
+async def readiness_check():
+    """Readiness probe: 503 until startup warm-up has finished successfully."""
+    ready, details = readiness()
+    return JSONResponse(details, status_code=200 if ready else 503)
+
+
+@router.get("/api/admission")
+async def admission_status():
+    """Queue depth, admissions, cache hits and rejections of the expensive endpoints."""
+    return admission_stats()
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+
+from fastapi import APIRouter, HTTPException
+
+from src.models.cv import (
+    CVRankRequest,
+    CVRankResponse,
+    JobIndexRequest,
+    JobIndexResponse,
+    RankedJob,
+)
+from src.services.job_index import get_job_index, save_job_index
+from src.services.pdf_parser import pdf_to_text
+from src.services.storage import get_store
+
+logger = logging.getLogger("uvicorn.error")
+
+router = APIRouter()
+
+
+@router.post("/api/jobs", response_model=JobIndexResponse)
+async def index_jobs(request: JobIndexRequest):
+    """Add job descriptions to the ranking index (persisted, loaded by each worker at startup)."""
+    index = await asyncio.to_thread(get_job_index)
+    job_dicts = [job.model_dump() for job in request.jobs]
+    job_ids = await asyncio.to_thread(index.add_jobs, job_dicts)
+    await asyncio.to_thread(save_job_index)
+    return JobIndexResponse(job_ids=job_ids, total=len(index))
+
+
+@router.delete("/api/jobs/{job_id}", response_model=JobIndexResponse)
+async def remove_job(job_id: str):
+    index = await asyncio.to_thread(get_job_index)
+    if not index.remove_job(job_id):
+        raise HTTPException(status_code=404, detail="Job not found in index")
+    await asyncio.to_thread(save_job_index)
+    return JobIndexResponse(job_ids=[job_id], total=len(index))
+
+
+@router.post("/api/cv/rank", response_model=CVRankResponse)
+async def rank_jobs_for_cv(request: CVRankRequest):
+    """Rank indexed jobs for a CV locally, without any Claude calls.
+
+    The returned job IDs match those computed by /api/cv/analyze, so only the
+    top-K jobs need to go through the (expensive) per-job analysis.
+    """
+    cv_id = request.cv_id
+    store = get_store()
+    upload_key = f"uploads/{cv_id}.pdf"
+
+    if not await asyncio.to_thread(store.exists, upload_key):
+        raise HTTPException(status_code=404, detail="CV not found. Please upload first.")
+
+    if request.top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be at least 1")
+
+    try:
+        pdf_path = await asyncio.to_thread(store.local_path, upload_key)
+        cv_text = await asyncio.to_thread(pdf_to_text, pdf_path)
+    except Exception as e:
+        logger.error(f"Failed to extract text from PDF: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to extract text from PDF: {e}")
+
+    # Image-only PDFs have no text layer; fall back to the LaTeX conversion if we have one
+    if not cv_text.strip():
+        latex_key = f"generated/{cv_id}/original.tex"
+        if await asyncio.to_thread(store.exists, latex_key):
+            cv_text = await asyncio.to_thread(store.read_text, latex_key)
+        else:
+            raise HTTPException(
+                status_code=422,
+                detail="CV has no text layer. Run /api/cv/analyze once to convert it first.",
+            )
+
+    index = await asyncio.to_thread(get_job_index)
+    ranked = await asyncio.to_thread(index.rank, cv_text, request.top_k)
+
+    return CVRankResponse(
+        cv_id=cv_id,
+        matches=[RankedJob(job_id=job_id, score=score, job=job) for job_id, score, job in ranked],
+    )
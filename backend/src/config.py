@@ -1,14 +1,62 @@
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     ANTHROPIC_API_KEY: str = ""
+    # Override the API endpoint, e.g. the load-test stub (loadtest/stub_anthropic.py)
+    ANTHROPIC_BASE_URL: str = ""
     BACKEND_PORT: int = 8000
     FRONTEND_URL: str = "http://localhost:3000"
     DATA_DIR: Path = Path("data")
 
+    # Artifact storage: "local" (DATA_DIR only) or "s3" (shared bucket, DATA_DIR as local cache)
+    STORAGE_BACKEND: str = "local"
+    S3_BUCKET: str = ""
+    S3_PREFIX: str = ""
+    S3_ENDPOINT_URL: str = ""  # e.g. http://localhost:9000 for a local MinIO
+    S3_REGION: str = ""
+
+    # "compile": second pdflatex run with \textcolor markup; "overlay": draw highlights on the clean PDF
+    HIGHLIGHT_MODE: Literal["compile", "overlay"] = "compile"
+    # Warm the Anthropic client, pdflatex and PDF rendering at startup; /api/ready reports 503 until done
+    WARMUP_ON_STARTUP: bool = True
+    # Convert multi-page CVs to LaTeX one page per request, concurrently
+    PARALLEL_PAGE_CONVERSION: bool = True
+    # Reuse the LaTeX of an earlier upload with the same text, or update it with a diff-only
+    # request when the text-layer similarity (MinHash estimate) is at least NEAR_DUPLICATE_SIMILARITY
+    NEAR_DUPLICATE_REUSE: bool = True
+    NEAR_DUPLICATE_SIMILARITY: float = 0.8
+    # Precompile the likely accepted change sets in the background after an analysis
+    SPECULATIVE_PRECOMPILE: bool = True
+
+    # Admission control: concurrent expensive (uncached) requests per endpoint; beyond
+    # that up to ADMISSION_MAX_QUEUE wait, then requests are rejected with 429 + Retry-After
+    ADMISSION_PROCESS_CONCURRENCY: int = 2
+    ADMISSION_ANALYZE_CONCURRENCY: int = 4
+    ADMISSION_APPLY_CONCURRENCY: int = 4
+    ADMISSION_MAX_QUEUE: int = 16
+    ADMISSION_MAX_WAIT_SECONDS: float = 30
+
+    # Retention: artifacts not accessed within their TTL are deleted by the background sweeper
+    RETENTION_TTL_HOURS_UPLOADS: float = 30 * 24
+    RETENTION_TTL_HOURS_LATEX: float = 30 * 24
+    RETENTION_TTL_HOURS_ANALYSES: float = 30 * 24
+    RETENTION_TTL_HOURS_PDFS: float = 7 * 24
+    RETENTION_TTL_HOURS_PREVIEWS: float = 7 * 24
+    RETENTION_TTL_HOURS_INTERMEDIATES: float = 1
+    # Least recently used artifacts are evicted above this size (0 = no quota)
+    DATA_DIR_QUOTA_MB: int = 5120
+    RETENTION_SWEEP_INTERVAL_SECONDS: int = 600
+    # Quiet period after the last toggle before a live preview recompiles
+    LIVE_PREVIEW_DEBOUNCE_MS: int = 400
+    # Worker processes rendering page preview images
+    PREVIEW_WORKERS: int = 2
+    # Keep pdflatex .aux/.log/.tex files after a successful compile (for debugging)
+    KEEP_TEX_INTERMEDIATES: bool = False
+
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
 
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import traceback
 from contextlib import asynccontextmanager
@@ -9,7 +10,11 @@ from starlette.requests import Request
 
 from src.api.routes.cv import router as cv_router
 from src.api.routes.health import router as health_router
+from src.api.routes.jobs import router as jobs_router
 from src.config import settings
+from src.services.page_preview import shutdown_preview_pool
+from src.services.retention import run_sweeper
+from src.services.warmup import warm_up
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -30,7 +35,14 @@ async def lifespan(app: FastAPI):
     generated_dir = settings.DATA_DIR / "generated"
     uploads_dir.mkdir(parents=True, exist_ok=True)
     generated_dir.mkdir(parents=True, exist_ok=True)
+
+    sweeper = asyncio.create_task(run_sweeper())
+    # Warm up in the background: /api/health answers right away, /api/ready once warm
+    warmup = asyncio.create_task(warm_up())
     yield
+    warmup.cancel()
+    sweeper.cancel()
+    shutdown_preview_pool()
 
 
 app = FastAPI(title="JobbMatch Beta Optimizer API", lifespan=lifespan)
@@ -43,7 +55,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets the frontend read how long to back off after a 429
+    expose_headers=["Retry-After"],
 )
 
 app.include_router(health_router)
 app.include_router(cv_router)
+app.include_router(jobs_router)
@@ -66,16 +66,68 @@ class CVAnalyzeResponse(BaseModel):
     issues: list[AnalysisIssue]
     strengths: list[AnalysisStrength]
     changes: list[ChangeProposal]
+    # False if the analysis was salvaged from a broken-off generation
+    complete: bool = True
 
 
 class CVApplyRequest(BaseModel):
     cv_id: str
     job_id: str
     accepted_change_ids: list[str]
+    auto_fit: bool = False  # deselect changes predicted to overflow the original page count
 
 
 class CVApplyResponse(BaseModel):
     cv_id: str
+    change_set_id: str | None = None
     original_pdf_url: str
     optimized_pdf_url: str
     highlighted_pdf_url: str
+    dropped_change_ids: list[str] = []
+
+
+class LivePreviewUpdate(BaseModel):
+    """Message sent by the client over the live preview WebSocket."""
+
+    accepted_change_ids: list[str]
+
+
+class CVEstimateRequest(BaseModel):
+    cv_id: str
+    job_id: str
+    accepted_change_ids: list[str]
+
+
+class CVEstimateResponse(BaseModel):
+    cv_id: str
+    job_id: str
+    original_pages: int
+    estimated_pages: int
+    estimated_usage: float
+    overflowing_change_ids: list[str]
+    line_deltas: dict[str, int]
+
+
+class JobIndexRequest(BaseModel):
+    jobs: list[JobDescription]
+
+
+class JobIndexResponse(BaseModel):
+    job_ids: list[str]
+    total: int
+
+
+class CVRankRequest(BaseModel):
+    cv_id: str
+    top_k: int = 10
+
+
+class RankedJob(BaseModel):
+    job_id: str
+    score: float
+    job: JobDescription
+
+
+class CVRankResponse(BaseModel):
+    cv_id: str
+    matches: list[RankedJob]
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+
+from src.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+# Weight of the newest sample in the service time moving average
+EWMA_ALPHA = 0.2
+
+# Service time assumed per queue until requests have been measured
+INITIAL_SERVICE_SECONDS = {"process": 90.0, "analyze": 45.0, "apply": 5.0}
+
+
+class Overloaded(Exception):
+    """A request was not admitted; the client should retry after `retry_after` seconds."""
+
+    def __init__(self, queue: str, reason: str, retry_after: int) -> None:
+        super().__init__(f"{queue} queue {reason}, retry after {retry_after}s")
+        self.queue = queue
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass
+class Admission:
+    """A slot in an admission queue, held while the expensive work runs."""
+
+    queue: "AdmissionQueue"
+    started: float
+    released: bool = False
+
+    def release(self) -> None:
+        # Idempotent, so a streaming response can release from more than one place
+        if not self.released:
+            self.released = True
+            self.queue._finish(time.perf_counter() - self.started)
+
+
+class AdmissionQueue:
+    """Bounds the concurrent expensive requests of one kind.
+
+    At most `concurrency` requests run at once; up to `max_queue` more wait, each
+    for at most `max_wait` seconds. Anything beyond that is rejected immediately
+    with a retry hint derived from the measured service time, so a spike degrades
+    into fast 429s instead of piling up Anthropic calls and pdflatex processes.
+    """
+
+    def __init__(self, name: str, concurrency: int, max_queue: int, max_wait: float,
+                 initial_service_seconds: float) -> None:
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._service_seconds = initial_service_seconds
+        self.running = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.bypassed = 0
+        self.rejected_full = 0
+        self.rejected_timeout = 0
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free for a new request, from the average service time."""
+        ahead = self.waiting + 1
+        return max(1, math.ceil(self._service_seconds * ahead / self.concurrency))
+
+    def _reject(self, reason: str) -> Overloaded:
+        error = Overloaded(self.name, reason, self.retry_after())
+        logger.warning(f"Rejected request: {error}")
+        return error
+
+    async def acquire(self) -> Admission:
+        """Wait for a slot; raises Overloaded if the queue is full or the wait times out."""
+        if self.waiting >= self.max_queue and self._semaphore.locked():
+            self.rejected_full += 1
+            raise self._reject("is full")
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            raise self._reject(f"wait exceeded {self.max_wait:g}s") from None
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        self.admitted += 1
+        return Admission(self, time.perf_counter())
+
+    def bypass(self) -> None:
+        """Count a request answered from cache, which is always admitted."""
+        self.bypassed += 1
+
+    def _finish(self, seconds: float) -> None:
+        self.running -= 1
+        self._semaphore.release()
+        self._service_seconds += EWMA_ALPHA * (seconds - self._service_seconds)
+
+    def stats(self) -> dict:
+        rejected = self.rejected_full + self.rejected_timeout
+        decided = self.admitted + rejected
+        return {
+            "concurrency": self.concurrency,
+            "running": self.running,
+            "queued": self.waiting,
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait,
+            "admitted": self.admitted,
+            "cache_hits": self.bypassed,
+            "rejected_full": self.rejected_full,
+            "rejected_timeout": self.rejected_timeout,
+            "rejection_rate": round(rejected / decided, 4) if decided else 0.0,
+            "service_seconds_ewma": round(self._service_seconds, 3),
+            "retry_after_seconds": self.retry_after(),
+        }
+
+
+_queues: dict[str, AdmissionQueue] = {}
+
+
+def get_queue(name: str) -> AdmissionQueue:
+    """The admission queue for "process", "analyze" or "apply"."""
+    if name not in _queues:
+        concurrency = {
+            "process": settings.ADMISSION_PROCESS_CONCURRENCY,
+            "analyze": settings.ADMISSION_ANALYZE_CONCURRENCY,
+            "apply": settings.ADMISSION_APPLY_CONCURRENCY,
+        }[name]
+        _queues[name] = AdmissionQueue(
+            name,
+            concurrency,
+            settings.ADMISSION_MAX_QUEUE,
+            settings.ADMISSION_MAX_WAIT_SECONDS,
+            INITIAL_SERVICE_SECONDS[name],
+        )
+    return _queues[name]
+
+
+def admission_stats() -> dict:
+    """Queue depth, admissions and rejections of every admission queue."""
+    return {name: get_queue(name).stats() for name in INITIAL_SERVICE_SECONDS}
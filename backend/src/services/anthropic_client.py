@@ -1,4 +1,5 @@
 import base64
+from functools import lru_cache
 from pathlib import Path
 
 import anthropic
@@ -17,12 +18,16 @@ _client: anthropic.AsyncAnthropic | None = None
 def get_client() -> anthropic.AsyncAnthropic:
     global _client
     if _client is None:
-        _client = anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+        _client = anthropic.AsyncAnthropic(
+            api_key=settings.ANTHROPIC_API_KEY,
+            base_url=settings.ANTHROPIC_BASE_URL or None,
+        )
     return _client
 
 
-def _load_template() -> str:
-    """Load the CV LaTeX template from disk."""
+@lru_cache(maxsize=1)
+def load_template() -> str:
+    """Load the CV LaTeX template from disk (read once per process)."""
     if not TEMPLATE_PATH.exists():
         raise FileNotFoundError(f"CV template not found at {TEMPLATE_PATH}")
     return TEMPLATE_PATH.read_text(encoding="utf-8")
@@ -31,7 +36,7 @@ def _load_template() -> str:
 async def generate_latex_from_images(images: list[bytes]) -> str:
     """Send PDF page images to Claude along with a reference LaTeX template to get a faithful LaTeX reproduction."""
     client = get_client()
-    template = _load_template()
+    template = load_template()
 
     content: list[dict] = []
     for img in images:
@@ -84,6 +89,68 @@ async def generate_latex_from_images(images: list[bytes]) -> str:
     return latex
 
 
+async def generate_page_fragment(
+    image: bytes, page_number: int, page_count: int, template_body: str
+) -> str:
+    """Reproduce ONE page of a multi-page CV as a LaTeX body fragment (no preamble).
+
+    Fragments are self-contained: lists that continue from the previous page are
+    re-opened at the start and lists continuing onto the next page are closed at
+    the end, so the caller can merge pages deterministically.
+    """
+    client = get_client()
+    b64 = base64.standard_b64encode(image).decode("utf-8")
+
+    if page_number == 1:
+        position = "This is the FIRST page: include the header (name, contact details) and any summary."
+    else:
+        position = (
+            "This is NOT the first page: do NOT repeat the header. If the page starts in the middle "
+            "of a section, do NOT repeat that section's \\section heading; if it starts in the middle "
+            "of an entry, do NOT repeat the \\resumeSubheading."
+        )
+
+    response = await client.messages.create(
+        model=VISION_MODEL,
+        max_tokens=8192,
+        messages=[{
+            "role": "user",
+            "content": [
+                {
+                    "type": "image",
+                    "source": {"type": "base64", "media_type": "image/png", "data": b64},
+                },
+                {
+                    "type": "text",
+                    "text": (
+                        f"This image is page {page_number} of {page_count} of a CV. Reproduce ONLY the "
+                        "content visible on this page as a fragment of the body of this LaTeX template:\n\n"
+                        "=== TEMPLATE BODY ===\n"
+                        f"{template_body}\n"
+                        "=== END TEMPLATE BODY ===\n\n"
+                        "Instructions:\n"
+                        f"- {position}\n"
+                        "- Output only body content: no preamble, no \\documentclass, no \\begin{document} "
+                        "or \\end{document}.\n"
+                        "- Use the template's custom commands (\\resumeSubheading, \\resumeItem, "
+                        "\\resumeSubHeadingListStart, etc.) exactly as in the template body.\n"
+                        "- The fragment must be balanced on its own. If the page starts inside a list that began "
+                        "on the previous page, open the enclosing lists first (e.g. \\resumeSubHeadingListStart "
+                        "then \\resumeItemListStart). If the page ends inside a list that continues on the next "
+                        "page, close those lists at the end (e.g. \\resumeItemListEnd then "
+                        "\\resumeSubHeadingListEnd).\n"
+                        "- Do NOT add manual \\vspace adjustments between items or subheadings.\n"
+                        "- Ensure all special characters are properly escaped for LaTeX.\n"
+                        "- Output ONLY the LaTeX fragment, no explanations or markdown fences."
+                    ),
+                },
+            ],
+        }],
+    )
+
+    return _strip_markdown_fences(response.content[0].text.strip())
+
+
 def _strip_markdown_fences(text: str) -> str:
     """Strip markdown code fences from a string if present."""
     if text.startswith("```"):
@@ -177,3 +244,67 @@ async def optimize_latex(latex: str, job_description: dict) -> tuple[str, str, s
     highlighted_latex = _strip_markdown_fences(highlighted_latex)
 
     return clean_latex, highlighted_latex, summary
+
+
+LATEX_EDITS_TOOL = {
+    "name": "report_latex_edits",
+    "description": "Report the find/replace edits that bring the LaTeX CV in line with the text changes.",
+    "strict": True,
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "edits": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "find": {"type": "string"},
+                        "replace": {"type": "string"},
+                    },
+                    "required": ["find", "replace"],
+                    "additionalProperties": False,
+                },
+            },
+        },
+        "required": ["edits"],
+        "additionalProperties": False,
+    },
+}
+
+
+async def generate_latex_edits(latex: str, text_diff: str) -> list[dict]:
+    """Ask Claude for find/replace edits that carry a small text change into existing LaTeX.
+
+    Used when a new upload differs from an already converted CV by a few lines: only
+    the text diff is sent (no page images) and only the edits come back, which is far
+    cheaper than a full vision conversion.
+    """
+    client = get_client()
+
+    response = await client.messages.create(
+        model=OPTIMIZATION_MODEL,
+        max_tokens=4096,
+        tools=[LATEX_EDITS_TOOL],
+        tool_choice={"type": "tool", "name": LATEX_EDITS_TOOL["name"]},
+        messages=[{
+            "role": "user",
+            "content": (
+                "A CV was converted to the LaTeX document below. The candidate has uploaded a new "
+                "version of the CV; the unified diff shows how its extracted text changed.\n\n"
+                f"=== CV LATEX ===\n{latex}\n=== END CV LATEX ===\n\n"
+                f"=== TEXT DIFF (old -> new) ===\n{text_diff}\n=== END TEXT DIFF ===\n\n"
+                "Report the edits that make the LaTeX match the new text:\n"
+                "- Each `find` must be an exact substring of the LaTeX that occurs exactly once; "
+                "include enough surrounding text to make it unique.\n"
+                "- `replace` is the new LaTeX for that span. Escape special characters for LaTeX and "
+                "use the document's existing commands (\\resumeItem, \\resumeSubheading, ...) for new entries.\n"
+                "- Change only what the diff requires. Ignore differences that are only line breaks "
+                "or spacing of the extracted text."
+            ),
+        }],
+    )
+
+    for block in response.content:
+        if block.type == "tool_use":
+            return block.input.get("edits", [])
+    raise ValueError("Claude did not report any LaTeX edits")
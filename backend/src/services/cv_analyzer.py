@@ -1,9 +1,15 @@
+import asyncio
 import hashlib
 import json
 import logging
+from collections.abc import AsyncIterator
 
-from src.config import settings
+import anthropic
+from pydantic import ValidationError
+
+from src.models.cv import AnalysisIssue, AnalysisStrength, ChangeProposal, SectionScore
 from src.services.anthropic_client import get_client
+from src.services.storage import get_store
 
 OPTIMIZATION_MODEL = "claude-opus-4-6"
 
@@ -16,35 +22,102 @@ def compute_job_id(job_dict: dict) -> str:
     return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
 
 
-def _strip_markdown_fences(text: str) -> str:
-    """Strip markdown code fences (```json ... ```) from a string if present."""
-    text = text.strip()
-    if text.startswith("```"):
-        lines = text.split("\n")
-        lines = lines[1:]  # Remove opening fence line
-        if lines and lines[-1].strip() == "```":
-            lines = lines[:-1]
-        text = "\n".join(lines)
-    return text.strip()
+HEADER_FIELDS = ("score", "score_label", "matched_keywords", "missing_keywords")
+DETAIL_FIELDS = ("section_scores", "issues", "strengths")
+# The order the model fills the tool input in; a field is complete once a later one appears
+FIELD_ORDER = HEADER_FIELDS + DETAIL_FIELDS + ("changes",)
 
+_LEVEL = {"type": "string", "enum": ["high", "medium", "low"]}
 
-async def analyze_cv_for_job(latex: str, job_dict: dict, cv_id: str, job_id: str) -> dict:
-    """Analyze a CV (LaTeX) against a job description using Claude.
+ANALYSIS_TOOL = {
+    "name": "report_cv_analysis",
+    "description": "Report the analysis of a CV against a job description.",
+    "strict": True,
+    "input_schema": {
+        "type": "object",
+        "additionalProperties": False,
+        "required": list(FIELD_ORDER),
+        "properties": {
+            "score": {"type": "integer", "description": "Match score from 0 to 100"},
+            "score_label": {
+                "type": "string",
+                "description": "Short label, e.g. Good Match, Needs Work, Strong Match",
+            },
+            "matched_keywords": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Keywords from the job that ARE in the CV",
+            },
+            "missing_keywords": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Keywords from the job that are NOT in the CV",
+            },
+            "section_scores": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "additionalProperties": False,
+                    "required": ["section", "relevance"],
+                    "properties": {
+                        "section": {"type": "string"},
+                        "relevance": {"type": "string", "enum": ["strong", "moderate", "weak"]},
+                    },
+                },
+            },
+            "issues": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "additionalProperties": False,
+                    "required": ["text", "severity"],
+                    "properties": {"text": {"type": "string"}, "severity": _LEVEL},
+                },
+            },
+            "strengths": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "additionalProperties": False,
+                    "required": ["text"],
+                    "properties": {"text": {"type": "string"}},
+                },
+            },
+            "changes": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "additionalProperties": False,
+                    "required": [
+                        "id", "section", "original_text", "proposed_text", "reason", "impact",
+                    ],
+                    "properties": {
+                        "id": {"type": "string"},
+                        "section": {"type": "string", "description": "e.g. Experience, Skills, Summary"},
+                        "original_text": {
+                            "type": "string",
+                            "description": "EXACT substring of the LaTeX source",
+                        },
+                        "proposed_text": {"type": "string", "description": "Improved replacement text"},
+                        "reason": {"type": "string", "description": "Why this change helps"},
+                        "impact": _LEVEL,
+                    },
+                },
+            },
+        },
+    },
+}
 
-    Returns a dict with: score, score_label, issues, strengths, changes.
-    Each change includes original_text that is validated as an exact substring of the LaTeX.
-    Results are cached to disk.
-    """
-    client = get_client()
 
+def _build_prompt(latex: str, job_dict: dict) -> str:
     job_json = json.dumps(job_dict, indent=2, ensure_ascii=False)
 
     # Include a snippet of the LaTeX so Claude can see exact formatting
     latex_snippet = latex[:3000] if len(latex) > 3000 else latex
 
-    prompt = (
+    return (
         "You are a CV optimization analyst. Analyze the following CV (in LaTeX) against the "
-        "job description and return a structured JSON response.\n\n"
+        "job description and report your findings with the report_cv_analysis tool.\n\n"
         "=== JOB DESCRIPTION ===\n"
         f"{job_json}\n\n"
         "=== FULL CV LATEX ===\n"
@@ -85,84 +158,232 @@ async def analyze_cv_for_job(latex: str, job_dict: dict, cv_id: str, job_id: str
         "- Escape these special characters: & → \\&, # → \\#, % → \\%, $ → \\$, _ → \\_\n"
         "- For example, write 'H\\&M' not 'H&M', and 'C\\#' not 'C#'.\n"
         "- If the original_text already uses LaTeX commands (like \\textbf, \\LaTeX, \\%), preserve them in proposed_text.\n\n"
-        "Respond with ONLY valid JSON (no markdown fences, no explanation) in this exact structure:\n"
-        "{\n"
-        '  "score": <integer 0-100>,\n'
-        '  "score_label": "<string like Good Match, Needs Work, Strong Match, etc.>",\n'
-        '  "matched_keywords": ["<keyword from job that IS in the CV>", ...],\n'
-        '  "missing_keywords": ["<keyword from job that is NOT in the CV>", ...],\n'
-        '  "section_scores": [\n'
-        '    {"section": "Summary", "relevance": "strong|moderate|weak"},\n'
-        '    {"section": "Skills", "relevance": "strong|moderate|weak"},\n'
-        '    {"section": "Experience", "relevance": "strong|moderate|weak"},\n'
-        '    {"section": "Education", "relevance": "strong|moderate|weak"}\n'
-        "  ],\n"
-        '  "issues": [\n'
-        '    {"text": "<issue description>", "severity": "high|medium|low"}\n'
-        "  ],\n"
-        '  "strengths": [\n'
-        '    {"text": "<strength description>"}\n'
-        "  ],\n"
-        '  "changes": [\n'
-        "    {\n"
-        '      "id": "change-1",\n'
-        '      "section": "<section name, e.g. Experience, Skills, Summary>",\n'
-        '      "original_text": "<EXACT substring from the LaTeX source>",\n'
-        '      "proposed_text": "<improved replacement text>",\n'
-        '      "reason": "<why this change helps>",\n'
-        '      "impact": "high|medium|low"\n'
-        "    }\n"
-        "  ]\n"
-        "}\n"
+        "Fill in the tool fields in the order they are defined, and give each change a unique id "
+        "(change-1, change-2, ...).\n"
     )
 
-    response = await client.messages.create(
-        model=OPTIMIZATION_MODEL,
-        max_tokens=16384,
-        messages=[{"role": "user", "content": prompt}],
+
+def validate_change(change: dict, latex: str) -> dict | None:
+    """Check a proposed change against the schema and the LaTeX source.
+
+    original_text must be an exact substring of the LaTeX (a whitespace-stripped
+    match is accepted and normalized). Returns the change, or None to drop it.
+    """
+    try:
+        change = ChangeProposal.model_validate(change).model_dump()
+    except ValidationError as e:
+        logger.warning(f"Dropping malformed change {change.get('id')!r}: {e}")
+        return None
+
+    original = change["original_text"]
+    if original and original in latex:
+        return change
+    if original.strip() and original.strip() in latex:
+        logger.warning(
+            f"Change '{change['id']}' matched after stripping whitespace. "
+            f"Updating original_text."
+        )
+        change["original_text"] = original.strip()
+        return change
+
+    logger.warning(
+        f"Dropping change '{change['id']}' -- original_text not found in LaTeX. "
+        f"Text was: {original[:100]!r}"
     )
+    return None
+
+
+def _valid_items(model, items) -> list[dict]:
+    valid = []
+    for item in items if isinstance(items, list) else []:
+        try:
+            valid.append(model.model_validate(item).model_dump())
+        except ValidationError:
+            logger.warning(f"Dropping malformed {model.__name__}: {item!r}")
+    return valid
+
+
+class _AnalysisAssembler:
+    """Turns successive snapshots of the partially generated tool input into events.
+
+    Events are ("summary", {...}), ("details", {...}) and ("change", {...}), each
+    emitted once its fields are complete. Only validated data is emitted.
+    """
+
+    def __init__(self, latex: str) -> None:
+        self.latex = latex
+        self.analysis: dict = {}
+        self._changes_seen = 0
+        self._change_ids: set[str] = set()
+
+    def _complete(self, snapshot: dict, field: str, finished: bool) -> bool:
+        if field not in snapshot:
+            return False
+        later = FIELD_ORDER[FIELD_ORDER.index(field) + 1:]
+        return finished or any(f in snapshot for f in later)
+
+    def advance(self, snapshot: dict, finished: bool) -> list[tuple[str, dict]]:
+        events = []
+
+        if "score" not in self.analysis and all(
+            self._complete(snapshot, f, finished) for f in HEADER_FIELDS
+        ):
+            try:
+                summary = {
+                    "score": max(0, min(100, int(snapshot["score"]))),
+                    "score_label": str(snapshot["score_label"]),
+                    "matched_keywords": [str(k) for k in snapshot["matched_keywords"]],
+                    "missing_keywords": [str(k) for k in snapshot["missing_keywords"]],
+                }
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Analysis header is malformed: {e}")
+            self.analysis.update(summary)
+            events.append(("summary", summary))
+
+        if "score" in self.analysis and "issues" not in self.analysis and all(
+            self._complete(snapshot, f, finished) for f in DETAIL_FIELDS
+        ):
+            details = {
+                "section_scores": _valid_items(SectionScore, snapshot["section_scores"]),
+                "issues": _valid_items(AnalysisIssue, snapshot["issues"]),
+                "strengths": _valid_items(AnalysisStrength, snapshot["strengths"]),
+            }
+            self.analysis.update(details)
+            events.append(("details", details))
+
+        changes = snapshot.get("changes")
+        if "issues" in self.analysis and isinstance(changes, list):
+            # The last change may still be streaming unless the input is finished
+            complete = len(changes) if finished else len(changes) - 1
+            for raw in changes[self._changes_seen:complete]:
+                self._changes_seen += 1
+                change = validate_change(raw, self.latex) if isinstance(raw, dict) else None
+                if change is None:
+                    continue
+                if change["id"] in self._change_ids:
+                    suffix = self._changes_seen
+                    while f"change-{suffix}" in self._change_ids:
+                        suffix += 1
+                    change["id"] = f"change-{suffix}"
+                self._change_ids.add(change["id"])
+                self.analysis.setdefault("changes", []).append(change)
+                events.append(("change", change))
+
+        return events
 
-    text = response.content[0].text
-    text = _strip_markdown_fences(text)
+
+async def stream_analysis(
+    latex: str, job_dict: dict, cv_id: str, job_id: str
+) -> AsyncIterator[tuple[str, dict]]:
+    """Analyze a CV against a job description, yielding results as they are generated.
+
+    Claude fills a schema-constrained tool call that is streamed; the score and
+    keywords come first ("summary"), then section scores, issues and strengths
+    ("details"), then one "change" event per validated ChangeProposal. A final
+    ("done", analysis) carries the whole analysis, which is also cached.
+
+    If the stream breaks off or ends with malformed input, everything completed up
+    to that point is kept (marked "incomplete") instead of failing the request. It is
+    still stored, since applies need its changes, but is not served as a cache hit.
+    """
+    client = get_client()
+    assembler = _AnalysisAssembler(latex)
+    snapshot: dict = {}
+    finished = False
 
     try:
-        analysis = json.loads(text)
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse Claude analysis JSON: {e}\nRaw response:\n{text[:2000]}")
-        raise ValueError(f"Failed to parse analysis response as JSON: {e}")
-
-    # Validate and filter changes: original_text must be an exact substring of the LaTeX
-    validated_changes = []
-    for change in analysis.get("changes", []):
-        original = change.get("original_text", "")
-        if original in latex:
-            validated_changes.append(change)
-        elif original.strip() in latex:
-            # Try stripped version -- update original_text to the stripped form
-            logger.warning(
-                f"Change '{change.get('id')}' matched after stripping whitespace. "
-                f"Updating original_text."
-            )
-            change["original_text"] = original.strip()
-            validated_changes.append(change)
-        else:
-            logger.warning(
-                f"Dropping change '{change.get('id')}' -- original_text not found in LaTeX. "
-                f"Text was: {original[:100]!r}"
-            )
-
-    analysis["changes"] = validated_changes
-
-    # Cache to disk
-    cache_dir = settings.DATA_DIR / "generated" / cv_id / "analyses" / job_id
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    cache_path = cache_dir / "analysis.json"
-    cache_path.write_text(json.dumps(analysis, indent=2, ensure_ascii=False), encoding="utf-8")
+        async with client.messages.stream(
+            model=OPTIMIZATION_MODEL,
+            max_tokens=16384,
+            tools=[ANALYSIS_TOOL],
+            tool_choice={"type": "tool", "name": ANALYSIS_TOOL["name"]},
+            messages=[{"role": "user", "content": _build_prompt(latex, job_dict)}],
+        ) as stream:
+            async for event in stream:
+                if event.type == "input_json" and isinstance(event.snapshot, dict):
+                    snapshot = event.snapshot
+                    for item in assembler.advance(snapshot, finished=False):
+                        yield item
+            message = await stream.get_final_message()
+
+        for block in message.content:
+            if block.type == "tool_use" and isinstance(block.input, dict):
+                snapshot = block.input
+        finished = message.stop_reason != "max_tokens"
+        if not finished:
+            logger.warning(f"Analysis for {cv_id}/{job_id} hit max_tokens; keeping completed parts")
+    except (anthropic.APIError, ValueError) as e:
+        if "score" not in assembler.analysis:
+            raise
+        logger.warning(f"Analysis stream for {cv_id}/{job_id} broke off, salvaging partial result: {e}")
+
+    for item in assembler.advance(snapshot, finished=finished):
+        yield item
+
+    analysis = assembler.analysis
+    if "score" not in analysis:
+        raise ValueError("Analysis response did not contain a score")
+    for field in DETAIL_FIELDS + ("changes",):
+        analysis.setdefault(field, [])
+    if not finished:
+        analysis["incomplete"] = True
+
+    # Cache in the artifact store
+    await asyncio.to_thread(
+        get_store().write_text,
+        analysis_key(cv_id, job_id),
+        json.dumps(analysis, indent=2, ensure_ascii=False),
+    )
 
     logger.info(
         f"CV analysis complete for {cv_id}/{job_id}: "
         f"score={analysis.get('score')}, "
-        f"{len(validated_changes)} validated changes"
+        f"{len(analysis['changes'])} validated changes"
     )
 
+    yield "done", analysis
+
+
+def analysis_key(cv_id: str, job_id: str) -> str:
+    return f"generated/{cv_id}/analyses/{job_id}/analysis.json"
+
+
+def load_cached_analysis(cv_id: str, job_id: str) -> dict | None:
+    """The stored analysis of a CV/job pair, or None if there is none or it is incomplete.
+
+    An incomplete analysis was salvaged from a broken-off generation, so it is a cache
+    miss: the next request analyzes again and replaces it. Blocking (artifact store I/O).
+    """
+    store = get_store()
+    key = analysis_key(cv_id, job_id)
+    if not store.exists(key):
+        return None
+    analysis = json.loads(store.read_text(key))
+    if analysis.get("incomplete"):
+        return None
+    store.touch(key)
     return analysis
+
+
+def replay_analysis(analysis: dict) -> list[tuple[str, dict]]:
+    """The events stream_analysis would have produced for a cached analysis."""
+    events = [
+        ("summary", {f: analysis.get(f, [] if f.endswith("keywords") else None) for f in HEADER_FIELDS}),
+        ("details", {f: analysis.get(f, []) for f in DETAIL_FIELDS}),
+    ]
+    events.extend(("change", change) for change in analysis.get("changes", []))
+    events.append(("done", analysis))
+    return events
+
+
+async def analyze_cv_for_job(latex: str, job_dict: dict, cv_id: str, job_id: str) -> dict:
+    """Analyze a CV (LaTeX) against a job description using Claude.
+
+    Returns a dict with: score, score_label, issues, strengths, changes.
+    Each change includes original_text that is validated as an exact substring of the LaTeX.
+    Results are cached in the artifact store.
+    """
+    async for event, data in stream_analysis(latex, job_dict, cv_id, job_id):
+        if event == "done":
+            return data
+    raise ValueError("Analysis stream ended without a result")
@@ -1,10 +1,15 @@
+import asyncio
+import hashlib
 import json
 import logging
 import re
-import shutil
+from pathlib import Path
 
 from src.config import settings
 from src.services.latex_compiler import compile_latex
+from src.services.pdf_highlighter import highlight_phrases
+from src.services.pdf_parser import pdf_page_count
+from src.services.storage import get_store
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -42,12 +47,13 @@ def _apply_string_replacements(
     latex: str,
     changes: list[dict],
     accepted_ids: list[str],
-) -> tuple[str, str]:
+) -> tuple[str, str, list[str]]:
     """Apply accepted changes to the LaTeX source.
 
-    Returns (clean_latex, highlighted_latex).
+    Returns (clean_latex, highlighted_latex, inserted_texts).
     - clean_latex: replacements applied directly
     - highlighted_latex: replacements wrapped in green bold + xcolor package swap
+    - inserted_texts: the proposed texts that were inserted, in document order
     """
     accepted_set = set(accepted_ids)
 
@@ -89,71 +95,210 @@ def _apply_string_replacements(
         "\\usepackage[usenames,dvipsnames]{xcolor}",
     )
 
-    return clean_latex, highlighted_latex
+    inserted_texts = [
+        _sanitize_proposed_latex(change["proposed_text"]) for _pos, change in reversed(positioned)
+    ]
 
+    return clean_latex, highlighted_latex, inserted_texts
 
-async def apply_changes_and_compile(
-    cv_id: str,
-    job_id: str,
-    accepted_ids: list[str],
-) -> tuple[str, str, str]:
-    """Apply accepted changes to the CV and compile PDFs.
 
-    Returns (original_pdf_url, optimized_pdf_url, highlighted_pdf_url).
+async def overlay_highlights(clean_pdf: Path, phrases: list[str], output_path: Path) -> Path | None:
+    """Produce the highlighted PDF by drawing overlays on the clean one.
+
+    Returns None if the overlay fails or any phrase could not be located in the PDF,
+    so callers can fall back to compiling instead of serving missing highlights.
     """
-    generated_dir = settings.DATA_DIR / "generated" / cv_id
+    try:
+        found = await asyncio.to_thread(highlight_phrases, clean_pdf, phrases, output_path)
+    except Exception as e:
+        logger.warning(f"Highlight overlay failed, falling back to compile: {e}", exc_info=True)
+        return None
+    if found < len(phrases):
+        logger.warning(
+            f"Located only {found}/{len(phrases)} changes in the PDF, falling back to compile"
+        )
+        return None
+    logger.info(f"Overlaid highlights for {found} changes")
+    return output_path
+
+
+def load_cached_inputs(cv_id: str, job_id: str) -> tuple[str, list[dict]]:
+    """Load the cached original LaTeX and the analysis change proposals for a CV/job pair.
+
+    Blocking (artifact store I/O); call it from a worker thread.
+    """
+    store = get_store()
 
     # Load cached LaTeX
-    latex_path = generated_dir / "original.tex"
-    if not latex_path.exists():
-        raise FileNotFoundError(f"Cached LaTeX not found at {latex_path}")
-    latex = latex_path.read_text(encoding="utf-8")
+    latex_key = f"generated/{cv_id}/original.tex"
+    if not store.exists(latex_key):
+        raise FileNotFoundError(f"Cached LaTeX not found at {latex_key}")
+    store.touch(latex_key)
+    latex = store.read_text(latex_key)
 
     # Load cached analysis
-    analysis_path = generated_dir / "analyses" / job_id / "analysis.json"
-    if not analysis_path.exists():
-        raise FileNotFoundError(f"Cached analysis not found at {analysis_path}")
-    analysis = json.loads(analysis_path.read_text(encoding="utf-8"))
+    analysis_key = f"generated/{cv_id}/analyses/{job_id}/analysis.json"
+    if not store.exists(analysis_key):
+        raise FileNotFoundError(f"Cached analysis not found at {analysis_key}")
+    store.touch(analysis_key)
+    analysis = json.loads(store.read_text(analysis_key))
+
+    return latex, analysis.get("changes", [])
+
+
+def change_set_key(changes: list[dict], accepted_ids: list[str]) -> str:
+    """Deterministic key for the set of accepted changes (order and unknown IDs ignored).
+
+    Hashes the content of the accepted changes, not just their IDs: a re-analysis of
+    the same CV/job pair reuses IDs like "change-1" for different edits, and must not
+    be served PDFs compiled for the old ones.
+    """
+    accepted = set(accepted_ids)
+    canonical = json.dumps(sorted(
+        [c["id"], c["original_text"], c["proposed_text"]] for c in changes if c["id"] in accepted
+    ))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
 
-    changes = analysis.get("changes", [])
+
+def change_set_artifact_key(cv_id: str, job_id: str, set_id: str, kind: str) -> str:
+    """Artifact key of a change set's PDF; kind is "optimized" or "highlighted"."""
+    return f"generated/{cv_id}/wizard/{job_id}/sets/{set_id}/{kind}.pdf"
+
+
+def is_change_set_compiled(cv_id: str, job_id: str, accepted_ids: list[str]) -> bool:
+    """Whether both PDFs of this change set are already stored (an apply is then a cache hit).
+
+    Blocking (artifact store I/O); call it from a worker thread.
+    """
+    store = get_store()
+    try:
+        _latex, changes = load_cached_inputs(cv_id, job_id)
+    except FileNotFoundError:
+        return False
+    set_id = change_set_key(changes, accepted_ids)
+    return all(
+        store.exists(change_set_artifact_key(cv_id, job_id, set_id, kind))
+        for kind in ("optimized", "highlighted")
+    )
+
+
+async def compile_change_set(
+    cv_id: str,
+    job_id: str,
+    accepted_ids: list[str],
+    background: bool = False,
+) -> str:
+    """Compile the optimized and highlighted PDFs for one set of accepted changes.
+
+    Results are stored per change set under wizard/<job_id>/sets/<set_id>/, so
+    compiling a set that was already compiled (e.g. speculatively, or by another
+    replica) returns immediately. These artifacts are never overwritten with
+    different content, so concurrent applies cannot clobber each other's results.
+    Returns the change set ID.
+    """
+    store = get_store()
+    latex, changes = await asyncio.to_thread(load_cached_inputs, cv_id, job_id)
+
+    set_id = change_set_key(changes, accepted_ids)
+    optimized_key = change_set_artifact_key(cv_id, job_id, set_id, "optimized")
+    highlighted_key = change_set_artifact_key(cv_id, job_id, set_id, "highlighted")
+
+    def use_compiled() -> bool:
+        if not (store.exists(optimized_key) and store.exists(highlighted_key)):
+            return False
+        store.touch(optimized_key)
+        store.touch(highlighted_key)
+        return True
+
+    if await asyncio.to_thread(use_compiled):
+        logger.info(f"Using precompiled change set for {cv_id}/{job_id}")
+        return set_id
 
     # Apply accepted changes
-    clean_latex, highlighted_latex = _apply_string_replacements(latex, changes, accepted_ids)
+    clean_latex, highlighted_latex, inserted_texts = _apply_string_replacements(
+        latex, changes, accepted_ids
+    )
 
     # Normalize spacing: strip aggressive manual \vspace hacks
     clean_latex = _normalize_vspace(clean_latex)
     highlighted_latex = _normalize_vspace(highlighted_latex)
 
-    # Compile clean optimized PDF
-    wizard_dir = generated_dir / "wizard" / job_id
-    optimized_dir = wizard_dir / "optimized"
+    # Compile clean optimized PDF (in a private workspace, published atomically)
+    set_dir = settings.DATA_DIR / optimized_key.rsplit("/", 1)[0]
     try:
-        optimized_pdf = await compile_latex(clean_latex, optimized_dir)
-        # Also copy to the standard location for the serving endpoint
-        final_optimized = generated_dir / f"{cv_id}_optimized.pdf"
-        shutil.copy2(optimized_pdf, final_optimized)
+        optimized_pdf = await compile_latex(
+            clean_latex, set_dir / "optimized.pdf", background=background
+        )
     except RuntimeError as e:
         logger.error(f"Failed to compile optimized LaTeX: {e}", exc_info=True)
         raise
 
-    # Compile highlighted PDF
-    highlighted_dir = wizard_dir / "highlighted"
+    # The changes are supposed to keep the page count; warn when they did not
+    upload_key = f"uploads/{cv_id}.pdf"
+    if await asyncio.to_thread(store.exists, upload_key):
+        upload_path = await asyncio.to_thread(store.local_path, upload_key)
+        original_pages = await asyncio.to_thread(pdf_page_count, upload_path)
+        optimized_pages = await asyncio.to_thread(pdf_page_count, optimized_pdf)
+        if optimized_pages > original_pages:
+            logger.warning(
+                f"Optimized CV for {cv_id}/{job_id} grew from {original_pages} to "
+                f"{optimized_pages} pages"
+            )
+
+    # Compile highlighted PDF (or overlay highlights onto the clean one)
     try:
-        highlighted_pdf = await compile_latex(highlighted_latex, highlighted_dir)
-        # Also copy to the standard location for the serving endpoint
-        final_highlighted = generated_dir / f"{cv_id}_highlighted.pdf"
-        shutil.copy2(highlighted_pdf, final_highlighted)
+        highlighted_pdf = None
+        if settings.HIGHLIGHT_MODE == "overlay":
+            highlighted_pdf = await overlay_highlights(
+                optimized_pdf, inserted_texts, set_dir / "highlighted.pdf"
+            )
+        if highlighted_pdf is None:
+            highlighted_pdf = await compile_latex(
+                highlighted_latex, set_dir / "highlighted.pdf", background=background
+            )
     except RuntimeError as e:
         logger.error(f"Failed to compile highlighted LaTeX: {e}", exc_info=True)
         raise
 
+    # Only mark the set as compiled once both PDFs are stored
+    await asyncio.to_thread(store.put_file, optimized_key, optimized_pdf)
+    await asyncio.to_thread(store.put_file, highlighted_key, highlighted_pdf)
+
+    return set_id
+
+
+async def apply_changes_and_compile(
+    cv_id: str,
+    job_id: str,
+    accepted_ids: list[str],
+) -> tuple[str, str, str, str]:
+    """Apply accepted changes to the CV and compile PDFs.
+
+    Returns (change_set_id, original_pdf_url, optimized_pdf_url, highlighted_pdf_url).
+    The optimized/highlighted URLs point at this change set's own artifacts, so a
+    concurrent apply for another job or change set cannot swap them out.
+    """
+    store = get_store()
+
+    set_id = await compile_change_set(cv_id, job_id, accepted_ids)
+    optimized_key = change_set_artifact_key(cv_id, job_id, set_id, "optimized")
+    highlighted_key = change_set_artifact_key(cv_id, job_id, set_id, "highlighted")
+
+    # Also publish as the CV's latest result for the legacy download endpoints
+    await asyncio.to_thread(store.copy, optimized_key, f"generated/{cv_id}/{cv_id}_optimized.pdf")
+    await asyncio.to_thread(
+        store.copy, highlighted_key, f"generated/{cv_id}/{cv_id}_highlighted.pdf"
+    )
+
     logger.info(
         f"Applied {len(accepted_ids)} changes for {cv_id}/{job_id}, "
         f"compiled optimized and highlighted PDFs"
     )
 
+    set_url = f"/api/cv/{cv_id}/jobs/{job_id}/sets/{set_id}"
     return (
+        set_id,
         f"/api/cv/{cv_id}/original",
-        f"/api/cv/{cv_id}/optimized",
-        f"/api/cv/{cv_id}/highlighted",
+        f"{set_url}/optimized",
+        f"{set_url}/highlighted",
     )
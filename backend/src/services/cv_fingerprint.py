@@ -0,0 +1,196 @@
+import hashlib
+import logging
+import re
+import threading
+import unicodedata
+from pathlib import Path
+
+import numpy as np
+
+from src.config import settings
+from src.services.pdf_parser import pdf_to_text
+
+logger = logging.getLogger("uvicorn.error")
+
+WORD_PATTERN = re.compile(r"\w+")
+
+# Word n-grams hashed into the MinHash signature
+SHINGLE_SIZE = 5
+# Texts shorter than this (e.g. scanned, image-only PDFs) are not fingerprinted
+MIN_WORDS = 20
+
+# 128 hash functions split into 16 LSH bands of 8 rows: a pair of CVs becomes a
+# candidate with probability 1 - (1 - s^8)^16, i.e. ~1.0% at Jaccard similarity 0.4
+# and ~95% at 0.8
+NUM_HASHES = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_HASHES // BANDS
+
+# Fixed seed: signatures are persisted, so the hash functions must never change
+_rng = np.random.default_rng(20240601)
+_HASH_A = _rng.integers(1, 2**63, NUM_HASHES, dtype=np.uint64) | np.uint64(1)
+_HASH_B = _rng.integers(0, 2**63, NUM_HASHES, dtype=np.uint64)
+
+# On-disk record: cv_id, digest of the normalized text, MinHash signature
+RECORD = np.dtype([("cv_id", "S16"), ("text_digest", "S16"), ("signature", "<u4", (NUM_HASHES,))])
+
+
+def normalize_words(text: str) -> list[str]:
+    """Lowercased words of a text, ignoring punctuation, layout and Unicode variants."""
+    return WORD_PATTERN.findall(unicodedata.normalize("NFKC", text).casefold())
+
+
+def text_digest(words: list[str]) -> str:
+    return hashlib.sha256(" ".join(words).encode("utf-8")).hexdigest()[:16]
+
+
+def minhash(words: list[str]) -> np.ndarray | None:
+    """MinHash signature of a text's word shingles, or None if the text is too short."""
+    if len(words) < MIN_WORDS:
+        return None
+    shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+         for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+    # Multiply-shift hashing: (a*x + b) mod 2^64, keeping the high 32 bits
+    with np.errstate(over="ignore"):
+        permuted = (_HASH_A[:, None] * hashes[None, :] + _HASH_B[:, None]) >> np.uint64(32)
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def _band_keys(signature: np.ndarray) -> list[bytes]:
+    return [band.tobytes() for band in signature.reshape(BANDS, ROWS_PER_BAND)]
+
+
+class FingerprintIndex:
+    """MinHash LSH index over the text layer of converted CVs.
+
+    Maps a new upload to earlier uploads with the same or nearly the same text, so
+    their LaTeX conversion can be reused. Lookups are O(BANDS) dictionary probes plus
+    a vectorized similarity estimate over the few candidates, independent of corpus
+    size. Entries are appended to a local file of fixed-size records, loaded at startup.
+
+    The index is not shared: each process reads the file once, so it misses entries that
+    other workers on the host append later, and the file lives under DATA_DIR rather than
+    in the artifact store, so with STORAGE_BACKEND=s3 every replica builds its own index
+    from what is on its local disk (initially nothing). A missed near duplicate is simply
+    converted from scratch.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._lock = threading.Lock()
+        self._cv_ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._signatures = np.zeros((0, NUM_HASHES), dtype=np.uint32)
+        self._by_digest: dict[str, str] = {}
+        self._buckets: list[dict[bytes, list[int]]] = [{} for _ in range(BANDS)]
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _insert_locked(self, records: np.ndarray) -> None:
+        start = self._signatures.shape[0]
+        self._signatures = np.concatenate([self._signatures, records["signature"]])
+        for offset, record in enumerate(records):
+            row = start + offset
+            cv_id = record["cv_id"].decode("ascii")
+            self._cv_ids.append(cv_id)
+            self._rows[cv_id] = row  # a re-indexed CV shadows its older row
+            self._by_digest[record["text_digest"].decode("ascii")] = cv_id
+            for band, key in enumerate(_band_keys(record["signature"])):
+                self._buckets[band].setdefault(key, []).append(row)
+
+    def load(self) -> None:
+        """Load persisted entries (torn trailing records from a crash are ignored)."""
+        if not self._path.exists():
+            return
+        data = self._path.read_bytes()
+        records = np.frombuffer(data[: len(data) - len(data) % RECORD.itemsize], dtype=RECORD)
+        with self._lock:
+            self._insert_locked(records)
+        logger.info(f"Loaded {len(self)} CV fingerprints from {self._path}")
+
+    def add(self, cv_id: str, digest: str, signature: np.ndarray) -> None:
+        record = np.zeros(1, dtype=RECORD)
+        record["cv_id"] = cv_id.encode("ascii")
+        record["text_digest"] = digest.encode("ascii")
+        record["signature"] = signature
+        with self._lock:
+            if cv_id in self._rows:
+                return
+            self._insert_locked(record)
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with self._path.open("ab") as f:
+                f.write(record.tobytes())
+
+    def exact_match(self, digest: str) -> str | None:
+        """A CV with exactly the same normalized text, if any."""
+        return self._by_digest.get(digest)
+
+    def similar(self, signature: np.ndarray, min_similarity: float) -> list[tuple[str, float]]:
+        """CVs whose estimated Jaccard similarity is at least min_similarity, best first."""
+        with self._lock:
+            candidates: set[int] = set()
+            for band, key in enumerate(_band_keys(signature)):
+                candidates.update(self._buckets[band].get(key, ()))
+            # Only the latest row of each CV counts
+            rows = np.array(
+                sorted(r for r in candidates if self._rows[self._cv_ids[r]] == r), dtype=np.int64
+            )
+            if rows.size == 0:
+                return []
+            scores = (self._signatures[rows] == signature).mean(axis=1)
+            order = np.argsort(-scores, kind="stable")
+            return [
+                (self._cv_ids[rows[i]], float(scores[i]))
+                for i in order
+                if scores[i] >= min_similarity
+            ]
+
+
+def fingerprint_pdf(pdf_path: Path) -> tuple[str, str, np.ndarray | None]:
+    """(extracted text, normalized text digest, MinHash signature or None) of a PDF."""
+    text = pdf_to_text(pdf_path)
+    words = normalize_words(text)
+    return text, text_digest(words), minhash(words)
+
+
+def _backfill(index: FingerprintIndex) -> None:
+    """Index earlier conversions still on local disk (first start with an empty index)."""
+    uploads = settings.DATA_DIR / "uploads"
+    for latex_path in (settings.DATA_DIR / "generated").glob("*/original.tex"):
+        cv_id = latex_path.parent.name
+        pdf_path = uploads / f"{cv_id}.pdf"
+        if not pdf_path.exists():
+            continue
+        try:
+            _text, digest, signature = fingerprint_pdf(pdf_path)
+        except Exception as e:
+            logger.warning(f"Could not fingerprint {cv_id}: {e}")
+            continue
+        if signature is not None:
+            index.add(cv_id, digest, signature)
+    logger.info(f"Backfilled {len(index)} CV fingerprints")
+
+
+_index: FingerprintIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_fingerprint_index() -> FingerprintIndex:
+    """The process-wide fingerprint index, loaded (or backfilled) on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            path = settings.DATA_DIR / "index" / "cv_fingerprints.bin"
+            index = FingerprintIndex(path)
+            if path.exists():
+                index.load()
+            else:
+                _backfill(index)
+            _index = index
+        return _index
@@ -1,5 +1,23 @@
+import json
+from functools import lru_cache
+from pathlib import Path
+
 from src.services.anthropic_client import optimize_latex
 
+SAMPLE_JOB_PATH = Path("examples/sample-job.json")
+
+
+@lru_cache(maxsize=1)
+def _sample_job_text() -> str:
+    if not SAMPLE_JOB_PATH.exists():
+        raise FileNotFoundError(f"Job description file not found at {SAMPLE_JOB_PATH}")
+    return SAMPLE_JOB_PATH.read_text(encoding="utf-8")
+
+
+def load_sample_job() -> dict:
+    """The sample job description used by /api/cv/process (read once per process)."""
+    return json.loads(_sample_job_text())
+
 
 async def optimize_cv(latex: str, job_description: dict) -> tuple[str, str, str]:
     """Optimize CV LaTeX content for a job description. Returns (clean_latex, highlighted_latex, changes_summary)."""
@@ -0,0 +1,249 @@
+import json
+import logging
+import re
+import threading
+
+import numpy as np
+from scipy import sparse
+
+from src.services.cv_analyzer import compute_job_id
+from src.services.storage import get_store
+
+logger = logging.getLogger("uvicorn.error")
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+# Term counts from each field are scaled by these weights before TF-IDF weighting,
+# so a keyword in the job title counts more than the same word deep in the description.
+FIELD_WEIGHTS = {"title": 3.0, "keywords": 2.0, "description": 1.0}
+
+# Tombstoned rows are physically dropped once they make up this share of the matrix
+COMPACT_THRESHOLD = 0.25
+
+# Artifact store key of the indexed job descriptions (the matrix is rebuilt from them)
+JOBS_KEY = "index/jobs.json"
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase a string and split it into alphanumeric terms (keeps c++, c#, etc.)."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _job_term_weights(job_dict: dict) -> dict[str, float]:
+    """Field-weighted term counts for a job description dict."""
+    weights: dict[str, float] = {}
+    fields = {
+        "title": job_dict.get("title") or "",
+        "description": job_dict.get("description") or "",
+        "keywords": " ".join(job_dict.get("keywords") or []),
+    }
+    for field, text in fields.items():
+        for term in tokenize(text):
+            weights[term] = weights.get(term, 0.0) + FIELD_WEIGHTS[field]
+    return weights
+
+
+class JobIndex:
+    """Sparse TF-IDF index over job descriptions, held in memory.
+
+    Jobs are stored as rows of a SciPy CSR matrix of field-weighted term counts.
+    Adding jobs appends rows, removing a job tombstones its row (compacted lazily),
+    and ranking a CV against every indexed job is a single sparse matrix-vector product.
+    Job IDs are the same deterministic IDs used by the analysis endpoint.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._vocab: dict[str, int] = {}
+        self._job_ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._jobs: dict[str, dict] = {}
+        self._counts = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._df = np.zeros(0, dtype=np.float32)
+        self._weights: sparse.csr_matrix | None = None
+        self._idf: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._jobs
+
+    def get(self, job_id: str) -> dict | None:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> list[dict]:
+        """The indexed job description dicts, in indexing order."""
+        with self._lock:
+            return [self._jobs[job_id] for job_id in self._job_ids if job_id in self._rows]
+
+    def add_jobs(self, jobs: list[dict]) -> list[str]:
+        """Index job description dicts, replacing any already indexed under the same ID.
+
+        Returns the job IDs in input order.
+        """
+        job_ids = [compute_job_id(job) for job in jobs]
+
+        with self._lock:
+            for job_id in job_ids:
+                if job_id in self._rows:
+                    self._remove_locked(job_id)
+
+            # Deduplicate within the batch, keeping the last occurrence
+            batch = dict(zip(job_ids, jobs))
+            if not batch:
+                return job_ids
+
+            indptr = [0]
+            indices: list[int] = []
+            data: list[float] = []
+            for job in batch.values():
+                for term, weight in _job_term_weights(job).items():
+                    col = self._vocab.setdefault(term, len(self._vocab))
+                    indices.append(col)
+                    data.append(weight)
+                indptr.append(len(indices))
+
+            vocab_size = len(self._vocab)
+            new_rows = sparse.csr_matrix(
+                (np.asarray(data, dtype=np.float32), np.asarray(indices), np.asarray(indptr)),
+                shape=(len(batch), vocab_size),
+            )
+
+            counts = self._counts
+            counts.resize((counts.shape[0], vocab_size))
+            self._counts = sparse.vstack([counts, new_rows], format="csr")
+
+            df = np.zeros(vocab_size, dtype=np.float32)
+            df[: self._df.shape[0]] = self._df
+            df += np.bincount(new_rows.indices, minlength=vocab_size).astype(np.float32)
+            self._df = df
+
+            start = len(self._job_ids)
+            for offset, (job_id, job) in enumerate(batch.items()):
+                self._job_ids.append(job_id)
+                self._rows[job_id] = start + offset
+                self._jobs[job_id] = job
+            self._alive = np.concatenate([self._alive, np.ones(len(batch), dtype=bool)])
+            self._weights = None
+
+        logger.info(f"Indexed {len(batch)} jobs ({len(self._jobs)} total, {vocab_size} terms)")
+        return job_ids
+
+    def remove_job(self, job_id: str) -> bool:
+        """Remove a job from the index. Returns False if it was not indexed."""
+        with self._lock:
+            if job_id not in self._rows:
+                return False
+            self._remove_locked(job_id)
+            return True
+
+    def _remove_locked(self, job_id: str) -> None:
+        row = self._rows.pop(job_id)
+        del self._jobs[job_id]
+        self._alive[row] = False
+
+        start, end = self._counts.indptr[row], self._counts.indptr[row + 1]
+        self._df[self._counts.indices[start:end]] -= 1
+        self._weights = None
+
+        dead = len(self._job_ids) - len(self._rows)
+        if dead and dead >= COMPACT_THRESHOLD * len(self._job_ids):
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        """Drop tombstoned rows from the count matrix and reassign row numbers."""
+        self._counts = self._counts[self._alive]
+        self._job_ids = [job_id for job_id, alive in zip(self._job_ids, self._alive) if alive]
+        self._rows = {job_id: row for row, job_id in enumerate(self._job_ids)}
+        self._alive = np.ones(len(self._job_ids), dtype=bool)
+
+    def _ensure_weights_locked(self) -> tuple[sparse.csr_matrix, np.ndarray]:
+        """Build (or reuse) the L2-normalized TF-IDF matrix for all live jobs."""
+        if self._weights is not None and self._idf is not None:
+            return self._weights, self._idf
+
+        n_docs = int(self._alive.sum())
+        idf = (np.log((1.0 + n_docs) / (1.0 + self._df)) + 1.0).astype(np.float32)
+
+        tf = self._counts.copy()
+        tf.data = np.log1p(tf.data)  # sublinear term frequency
+        weights = (tf @ sparse.diags(idf)).tocsr()
+
+        norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)).ravel())
+        scale = np.divide(
+            self._alive.astype(np.float32), norms,
+            out=np.zeros_like(norms, dtype=np.float32), where=norms > 0,
+        )
+        self._weights = (sparse.diags(scale) @ weights).tocsr()
+        self._idf = idf
+        return self._weights, self._idf
+
+    def rank(self, text: str, top_k: int = 10) -> list[tuple[str, float, dict]]:
+        """Rank all indexed jobs against free text (e.g. a CV's extracted text).
+
+        Returns up to top_k (job_id, cosine_score, job_dict) tuples, best first.
+        Jobs with no term overlap are never returned.
+        """
+        with self._lock:
+            if not self._jobs or top_k <= 0:
+                return []
+
+            weights, idf = self._ensure_weights_locked()
+
+            query = np.zeros(len(self._vocab), dtype=np.float32)
+            for term in tokenize(text):
+                col = self._vocab.get(term)
+                if col is not None:
+                    query[col] += 1.0
+            query = np.log1p(query) * idf
+            norm = np.linalg.norm(query)
+            if norm == 0:
+                return []
+            query /= norm
+
+            scores = weights @ query
+
+            k = min(top_k, scores.shape[0])
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+
+            results = []
+            for row in top:
+                score = float(scores[row])
+                if score <= 0:
+                    break
+                job_id = self._job_ids[row]
+                results.append((job_id, score, self._jobs[job_id]))
+            return results
+
+
+_index: JobIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_job_index() -> JobIndex:
+    """The process-wide job index, loaded from the artifact store on first use.
+
+    Blocking on first use (artifact store I/O). Each process keeps its own copy: jobs
+    indexed through another worker or replica are only seen after a restart, so with
+    several workers, index jobs before starting them or through every replica.
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            index = JobIndex()
+            store = get_store()
+            if store.exists(JOBS_KEY):
+                index.add_jobs(json.loads(store.read_text(JOBS_KEY))["jobs"])
+            _index = index
+        return _index
+
+
+def save_job_index() -> None:
+    """Persist the indexed jobs to the artifact store. Blocking (artifact store I/O)."""
+    with _index_lock:
+        if _index is None:
+            return
+        get_store().write_text(JOBS_KEY, json.dumps({"jobs": _index.jobs()}, ensure_ascii=False))
@@ -1,11 +1,56 @@
 import asyncio
+import tempfile
+from collections.abc import Callable
 from pathlib import Path
 
+from src.config import settings
+from src.services.storage import atomic_copy
 
-async def compile_latex(latex: str, output_dir: Path) -> Path:
-    """Compile a LaTeX string to PDF using pdflatex. Returns path to the compiled PDF."""
-    output_dir.mkdir(parents=True, exist_ok=True)
+# Number of compiles currently running on behalf of a user request. Background work
+# (e.g. speculative precompiles) only starts while this is zero.
+_foreground_compiles = 0
+# Called whenever a user-facing compile starts, so running background work can yield
+_foreground_listeners: list[Callable[[], None]] = []
 
+
+def foreground_compiles() -> int:
+    """Number of user-facing compiles currently in progress."""
+    return _foreground_compiles
+
+
+def on_foreground_compile(listener: Callable[[], None]) -> None:
+    """Call `listener` whenever a user-facing compile starts."""
+    _foreground_listeners.append(listener)
+
+
+async def compile_latex(latex: str, output_path: Path, background: bool = False) -> Path:
+    """Compile a LaTeX string to PDF using pdflatex. Returns output_path.
+
+    Each compile runs in its own private temporary workspace, so concurrent compiles
+    (in this process or other workers) never share .tex/.aux/.pdf files. The finished
+    PDF is published to output_path atomically; the workspace is then removed.
+    If the calling task is cancelled, the running pdflatex process is killed.
+    """
+    global _foreground_compiles
+    if not background:
+        _foreground_compiles += 1
+        for listener in _foreground_listeners:
+            listener()
+    try:
+        with tempfile.TemporaryDirectory(prefix="jobbmatch-latex-") as workspace:
+            workspace_dir = Path(workspace)
+            pdf_path = await _run_pdflatex(latex, workspace_dir)
+            atomic_copy(pdf_path, output_path)
+            if settings.KEEP_TEX_INTERMEDIATES:
+                for suffix in (".tex", ".log"):
+                    atomic_copy(workspace_dir / f"document{suffix}", output_path.with_suffix(suffix))
+        return output_path
+    finally:
+        if not background:
+            _foreground_compiles -= 1
+
+
+async def _run_pdflatex(latex: str, output_dir: Path) -> Path:
     # Write the .tex file
     tex_path = output_dir / "document.tex"
     tex_path.write_text(latex, encoding="utf-8")
@@ -26,6 +71,10 @@ async def compile_latex(latex: str, output_dir: Path) -> Path:
         except asyncio.TimeoutError:
             proc.kill()
             raise RuntimeError("LaTeX compilation timed out after 60 seconds")
+        except asyncio.CancelledError:
+            proc.kill()
+            await proc.wait()
+            raise
 
     pdf_path = output_dir / "document.pdf"
     if not pdf_path.exists():
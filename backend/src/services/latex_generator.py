@@ -1,6 +1,322 @@
-from src.services.anthropic_client import generate_latex_from_images
+import asyncio
+import difflib
+import logging
+import re
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from src.config import settings
+from src.services.anthropic_client import (
+    generate_latex_edits,
+    generate_latex_from_images,
+    generate_page_fragment,
+    load_template,
+)
+from src.services.cv_fingerprint import (
+    FingerprintIndex,
+    fingerprint_pdf,
+    get_fingerprint_index,
+    normalize_words,
+)
+from src.services.latex_compiler import compile_latex
+from src.services.pdf_parser import pdf_to_text
+from src.services.storage import get_store
+
+logger = logging.getLogger("uvicorn.error")
+
+BEGIN_DOCUMENT = "\\begin{document}"
+END_DOCUMENT = "\\end{document}"
+
+# List closers at the end of a page fragment and the opener each one pairs with
+_CLOSER = re.compile(
+    r"(\\resumeItemListEnd|\\resumeSubHeadingListEnd|\\end\{itemize\})"
+    r"(?:\s*\\vspace\{[^}]*\})?\s*$"
+)
+_OPENER = re.compile(
+    r"\s*(\\resumeSubHeadingListStart|\\resumeItemListStart|\\begin\{itemize\}(?:\[[^\]]*\])?)"
+)
+_LIST_KIND = {
+    "\\resumeItemListEnd": "item",
+    "\\resumeItemListStart": "item",
+    "\\resumeSubHeadingListEnd": "subheading",
+    "\\resumeSubHeadingListStart": "subheading",
+    "\\end{itemize}": "itemize",
+    "\\begin{itemize}": "itemize",
+}
+
+# Text diffs with more changed lines than this get a full conversion instead of edits
+MAX_EDIT_DIFF_LINES = 40
+
+
+def split_template(template: str) -> tuple[str, str]:
+    """Split a LaTeX document into (preamble, body) around \\begin{document}."""
+    start = template.index(BEGIN_DOCUMENT)
+    end = template.rindex(END_DOCUMENT)
+    return template[:start], template[start + len(BEGIN_DOCUMENT):end].strip("\n")
+
+
+def _list_kind(token: str) -> str:
+    return _LIST_KIND[token.split("[", 1)[0]]
+
+
+def join_fragments(previous: str, following: str) -> str:
+    """Join two consecutive page fragments, merging lists split by the page break.
+
+    Each fragment closes the lists still open at its end and re-opens them at its
+    start. The closers trailing `previous` and the openers leading `following` are
+    cancelled pairwise from the outermost list inwards, as long as they match.
+    """
+    closers: list[tuple[str, int]] = []  # (kind, start index), outermost first
+    tail = previous.rstrip()
+    while match := _CLOSER.search(tail):
+        closers.append((_list_kind(match.group(1)), match.start()))
+        tail = tail[:match.start()].rstrip()
+
+    openers: list[tuple[str, int]] = []  # (kind, end index), outermost first
+    pos = 0
+    while match := _OPENER.match(following, pos):
+        openers.append((_list_kind(match.group(1)), match.end()))
+        pos = match.end()
+
+    cancelled = 0
+    while (
+        cancelled < min(len(closers), len(openers))
+        and closers[cancelled][0] == openers[cancelled][0]
+    ):
+        cancelled += 1
+
+    if cancelled == 0:
+        return f"{previous.rstrip()}\n\n{following.lstrip()}"
+
+    cut = closers[cancelled - 1][1]
+    resume = openers[cancelled - 1][1]
+    rest = following[resume:].lstrip("\r\n")  # keep the next line's indentation
+    return f"{previous[:cut].rstrip()}\n{rest}"
+
+
+def merge_fragments(preamble: str, fragments: list[str]) -> str:
+    """Assemble a complete document from the shared preamble and per-page body fragments."""
+    body = fragments[0].strip()
+    for fragment in fragments[1:]:
+        body = join_fragments(body, fragment.strip())
+    return f"{preamble}{BEGIN_DOCUMENT}\n\n{body}\n\n{END_DOCUMENT}\n"
+
+
+async def _compiles(latex: str) -> bool:
+    with tempfile.TemporaryDirectory(prefix="jobbmatch-validate-") as workspace:
+        try:
+            await compile_latex(latex, Path(workspace) / "merged.pdf")
+        except (RuntimeError, OSError) as e:
+            logger.warning(f"Merged page-parallel LaTeX failed to compile: {e}")
+            return False
+    return True
+
+
+async def generate_latex_per_page(images: list[bytes]) -> str | None:
+    """Convert each page concurrently and merge the fragments.
+
+    Returns None if any page fails or the merged document does not compile, so the
+    caller can fall back to a single whole-document request.
+    """
+    preamble, template_body = split_template(load_template())
+
+    results = await asyncio.gather(
+        *(
+            generate_page_fragment(image, i + 1, len(images), template_body)
+            for i, image in enumerate(images)
+        ),
+        return_exceptions=True,
+    )
+    for page_number, result in enumerate(results, start=1):
+        if isinstance(result, BaseException):
+            logger.warning(f"Page-parallel conversion of page {page_number} failed: {result}")
+            return None
+
+    latex = merge_fragments(preamble, results)
+    if not await _compiles(latex):
+        return None
+    return latex
 
 
 async def generate_latex(images: list[bytes]) -> str:
-    """Convert PDF page images to a LaTeX document via Claude vision."""
+    """Convert PDF page images to a LaTeX document via Claude vision.
+
+    Multi-page CVs are converted one page per request, concurrently, when
+    PARALLEL_PAGE_CONVERSION is enabled; otherwise (or if that fails) all pages go
+    in one request.
+    """
+    if settings.PARALLEL_PAGE_CONVERSION and len(images) > 1:
+        latex = await generate_latex_per_page(images)
+        if latex is not None:
+            logger.info(f"Converted {len(images)} pages in parallel")
+            return latex
+        logger.warning("Falling back to single-request LaTeX conversion")
     return await generate_latex_from_images(images)
+
+
+def text_diff(old_text: str, new_text: str) -> tuple[str, int]:
+    """Unified diff of two extracted texts, ignoring blank lines and spacing.
+
+    Returns (diff, number of changed lines).
+    """
+    def lines(text: str) -> list[str]:
+        return [" ".join(line.split()) for line in text.splitlines() if line.strip()]
+
+    diff = [
+        line
+        for line in difflib.unified_diff(lines(old_text), lines(new_text), lineterm="", n=1)
+        if not line.startswith(("---", "+++"))
+    ]
+    changed = sum(1 for line in diff if line.startswith(("+", "-")))
+    return "\n".join(diff), changed
+
+
+def apply_latex_edits(latex: str, edits: list[dict]) -> str | None:
+    """Apply find/replace edits; None if any `find` does not occur exactly once."""
+    for edit in edits:
+        if latex.count(edit["find"]) != 1:
+            return None
+        latex = latex.replace(edit["find"], edit["replace"])
+    return latex
+
+
+def diff_applied(document_text: str, diff: str, new_text: str) -> bool:
+    """Whether a document's text has the diff's added lines and lost its removed ones.
+
+    Lines are compared as normalized word sequences, so line wrapping and spacing of
+    the compiled document do not matter. A removed line that also occurs in the new
+    text (e.g. a moved line) may stay.
+    """
+    def joined(text: str) -> str:
+        return f" {' '.join(normalize_words(text))} "
+
+    document = joined(document_text)
+    target = joined(new_text)
+    for line in diff.splitlines():
+        if not line.startswith(("+", "-")):
+            continue
+        words = joined(line[1:])
+        if not words.strip():
+            continue
+        if line.startswith("+") and words not in document:
+            return False
+        if line.startswith("-") and words in document and words not in target:
+            return False
+    return True
+
+
+async def _compiled_text(latex: str) -> str | None:
+    """Text layer of the compiled document, or None if it does not compile."""
+    with tempfile.TemporaryDirectory(prefix="jobbmatch-validate-") as workspace:
+        try:
+            pdf_path = await compile_latex(latex, Path(workspace) / "edited.pdf")
+        except (RuntimeError, OSError) as e:
+            logger.warning(f"Edited LaTeX failed to compile: {e}")
+            return None
+        return await asyncio.to_thread(pdf_to_text, pdf_path)
+
+
+def _read_conversion(cv_id: str) -> str | None:
+    """The stored LaTeX of an earlier conversion (marked as used), or None."""
+    store = get_store()
+    latex_key = f"generated/{cv_id}/original.tex"
+    if not store.exists(latex_key):
+        return None
+    store.touch(latex_key)
+    return store.read_text(latex_key)
+
+
+def _read_candidate(cv_id: str) -> tuple[str, str] | None:
+    """(LaTeX, extracted upload text) of an earlier conversion, or None if either is gone."""
+    store = get_store()
+    if not store.exists(f"uploads/{cv_id}.pdf"):
+        return None
+    latex = _read_conversion(cv_id)
+    if latex is None:
+        return None
+    return latex, pdf_to_text(store.local_path(f"uploads/{cv_id}.pdf"))
+
+
+async def _latex_from_near_duplicate(
+    cv_id: str, index: FingerprintIndex, text: str, digest: str, signature: np.ndarray
+) -> str | None:
+    """Derive this CV's LaTeX from an earlier conversion of the same or a slightly edited CV.
+
+    Edited LaTeX is only accepted if it compiles and its text shows the diff's changes;
+    otherwise None is returned and the caller converts the CV from scratch.
+    """
+    match_id = index.exact_match(digest)
+    if match_id is not None and match_id != cv_id:
+        latex = await asyncio.to_thread(_read_conversion, match_id)
+        if latex is not None:
+            # Same text (e.g. re-exported, or only the metadata changed)
+            logger.info(f"Reusing the LaTeX of {match_id} for {cv_id} (same text)")
+            return latex
+
+    for match_id, similarity in index.similar(signature, settings.NEAR_DUPLICATE_SIMILARITY):
+        if match_id == cv_id:
+            continue
+        candidate = await asyncio.to_thread(_read_candidate, match_id)
+        if candidate is None:
+            continue
+        latex, old_text = candidate
+
+        diff, changed = text_diff(old_text, text)
+        if changed == 0:
+            logger.info(f"Reusing the LaTeX of {match_id} for {cv_id} (same text up to spacing)")
+            return latex
+        if changed > MAX_EDIT_DIFF_LINES:
+            continue  # a less similar candidate may still have a smaller line diff
+
+        try:
+            edits = await generate_latex_edits(latex, diff)
+        except Exception as e:
+            logger.warning(f"Diff-only LaTeX update from {match_id} failed: {e}")
+            return None
+        updated = apply_latex_edits(latex, edits) if edits else None
+        if updated is None:
+            logger.warning(
+                f"Diff-only LaTeX update from {match_id} returned {len(edits)} edits that do not "
+                f"apply to {changed} changed lines"
+            )
+            return None
+        compiled_text = await _compiled_text(updated)
+        if compiled_text is None or not diff_applied(compiled_text, diff, text):
+            logger.warning(f"Diff-only LaTeX update from {match_id} does not match the new text")
+            return None
+        logger.info(
+            f"Derived the LaTeX for {cv_id} from {match_id} with {len(edits)} edits "
+            f"({changed} changed lines, similarity {similarity:.2f})"
+        )
+        return updated
+
+    return None
+
+
+async def convert_cv(cv_id: str, pdf_path: Path, images: list[bytes]) -> str:
+    """LaTeX for an uploaded CV.
+
+    When NEAR_DUPLICATE_REUSE is enabled, an earlier conversion of a CV with the same
+    text is reused as-is, and one of a CV that differs by a few lines is updated with
+    a cheap diff-only request. Otherwise the page images are converted via vision.
+    """
+    if not settings.NEAR_DUPLICATE_REUSE:
+        return await generate_latex(images)
+
+    try:
+        text, digest, signature = await asyncio.to_thread(fingerprint_pdf, pdf_path)
+        index = await asyncio.to_thread(get_fingerprint_index)
+    except Exception as e:
+        logger.warning(f"Could not fingerprint {cv_id}: {e}")
+        return await generate_latex(images)
+    if signature is None:
+        # No usable text layer (e.g. a scanned CV)
+        return await generate_latex(images)
+
+    latex = await _latex_from_near_duplicate(cv_id, index, text, digest, signature)
+    if latex is None:
+        latex = await generate_latex(images)
+    await asyncio.to_thread(index.add, cv_id, digest, signature)
+    return latex
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+from src.config import settings
+from src.services.admission import Overloaded, get_queue
+from src.services.cv_applier import (
+    change_set_key,
+    compile_change_set,
+    is_change_set_compiled,
+    load_cached_inputs,
+)
+from src.services.speculation import claim_speculation
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class LivePreviewSession:
+    """Recompiles the preview of one CV/job pair as the user toggles changes.
+
+    Every update supersedes the previous one: updates are debounced, a compile whose
+    change set is no longer wanted is cancelled (which kills its pdflatex process),
+    and only the result for the latest update is sent to the client.
+    """
+
+    def __init__(self, cv_id: str, job_id: str, send: Callable[[dict], Awaitable[None]]) -> None:
+        # Raises FileNotFoundError if the CV has not been analyzed for this job
+        _latex, self._changes = load_cached_inputs(cv_id, job_id)
+        self.cv_id = cv_id
+        self.job_id = job_id
+        self._send = send
+        self._revision = 0
+        self._task: asyncio.Task | None = None
+        self._task_set_id: str | None = None
+        self._task_revision = 0
+
+    def update(self, accepted_ids: list[str]) -> None:
+        """Request a preview of `accepted_ids`, superseding any earlier request."""
+        self._revision += 1
+        set_id = change_set_key(self._changes, accepted_ids)
+
+        if self._task is not None and not self._task.done():
+            if set_id == self._task_set_id:
+                # Same change set as the work in flight (e.g. toggled back): let it finish
+                # and report under the new revision
+                self._task_revision = self._revision
+                return
+            self._task.cancel()
+
+        self._task_set_id = set_id
+        self._task_revision = self._revision
+        self._task = asyncio.create_task(self._compile(accepted_ids))
+
+    async def _notify(self, message: dict) -> None:
+        """Send a message to the client; a closed socket is logged, not raised.
+
+        The compile task is never awaited, so an exception escaping it would only
+        surface as an "exception was never retrieved" warning.
+        """
+        try:
+            await self._send(message)
+        except Exception as e:
+            logger.info(
+                f"Live preview for {self.cv_id}/{self.job_id} could not send "
+                f"{message['type']!r}: {e}"
+            )
+
+    async def _admitted_compile(self, accepted_ids: list[str]) -> str:
+        """Compile under the apply admission queue, like /api/cv/apply; returns the set ID."""
+        queue = get_queue("apply")
+        if await asyncio.to_thread(is_change_set_compiled, self.cv_id, self.job_id, accepted_ids):
+            queue.bypass()
+            admission = None
+        else:
+            admission = await queue.acquire()  # raises Overloaded
+        try:
+            await claim_speculation(self.cv_id, self.job_id, accepted_ids)
+            return await compile_change_set(self.cv_id, self.job_id, accepted_ids)
+        finally:
+            if admission is not None:
+                admission.release()
+
+    async def _compile(self, accepted_ids: list[str]) -> None:
+        await asyncio.sleep(settings.LIVE_PREVIEW_DEBOUNCE_MS / 1000)
+        await self._notify({"type": "compiling", "revision": self._task_revision})
+
+        try:
+            set_id = await self._admitted_compile(accepted_ids)
+        except Overloaded as e:
+            await self._notify({
+                "type": "busy",
+                "revision": self._task_revision,
+                "retry_after": e.retry_after,
+            })
+            return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Live preview compile failed for {self.cv_id}/{self.job_id}: {e}", exc_info=True)
+            await self._notify({"type": "error", "revision": self._task_revision, "detail": str(e)})
+            return
+
+        set_url = f"/api/cv/{self.cv_id}/jobs/{self.job_id}/sets/{set_id}"
+        await self._notify({
+            "type": "ready",
+            "revision": self._task_revision,
+            "change_set_id": set_id,
+            "optimized_pdf_url": f"{set_url}/optimized",
+            "highlighted_pdf_url": f"{set_url}/highlighted",
+        })
+
+    def close(self) -> None:
+        """Stop any pending or running compile (the client went away)."""
+        if self._task is not None:
+            self._task.cancel()
@@ -0,0 +1,407 @@
+"""Compile-free page usage estimator for CV LaTeX produced from our template.
+
+The template is compiled by pdflatex with the default Computer Modern fonts, so line
+wraps can be predicted from cmr10/cmbx10 advance widths and the template geometry
+(11pt article, letterpaper, fullpage with the margins widened by 1in). Block heights
+are approximations of the template's list and heading spacing; the estimate is meant
+to catch changes that push the CV onto an extra page, not to reproduce TeX exactly.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+PT_PER_IN = 72.27
+
+# Template geometry: fullpage gives 1in margins, the preamble widens text by 1in each way
+TEXT_WIDTH = 7.5 * PT_PER_IN
+TEXT_HEIGHT = 10.0 * PT_PER_IN
+
+# \resumeSubHeadingListStart indents 0.15in, the nested itemize adds \leftmarginii (2.2em @ 11pt)
+SUBHEADING_INDENT = 0.15 * PT_PER_IN
+ITEM_WIDTH = TEXT_WIDTH - SUBHEADING_INDENT - 2.2 * 11
+SUMMARY_WIDTH = 0.9 * TEXT_WIDTH
+
+SMALL_SIZE = 10.0  # \small in an 11pt article
+SMALL_BASELINE = 12.0
+
+# Fixed block heights (pt), including the template's built-in \vspace adjustments
+SECTION_HEIGHT = 27.0
+SUBHEADING_HEIGHT = 24.0
+SUBSUBHEADING_HEIGHT = 11.0
+ITEM_SPACING = 2.0
+LIST_END_HEIGHT = -2.0
+HEADER_HEIGHT = 46.0
+
+# Parsed layouts of this many CVs are kept in memory (see cached_layout)
+LAYOUT_CACHE_SIZE = 256
+
+# cmr10 advance widths in em (from cmr10.tfm); bold text uses cmbx10, roughly 11% wider
+CMR10_WIDTHS = {
+    "a": 0.5, "b": 0.5556, "c": 0.4444, "d": 0.5556, "e": 0.4444, "f": 0.3056,
+    "g": 0.5, "h": 0.5556, "i": 0.2778, "j": 0.3056, "k": 0.5278, "l": 0.2778,
+    "m": 0.8333, "n": 0.5556, "o": 0.5, "p": 0.5556, "q": 0.5278, "r": 0.3917,
+    "s": 0.3944, "t": 0.3889, "u": 0.5556, "v": 0.5278, "w": 0.7222, "x": 0.5278,
+    "y": 0.5278, "z": 0.4444,
+    "A": 0.75, "B": 0.7083, "C": 0.7222, "D": 0.7639, "E": 0.6806, "F": 0.6528,
+    "G": 0.7847, "H": 0.75, "I": 0.3611, "J": 0.5139, "K": 0.7778, "L": 0.625,
+    "M": 0.9167, "N": 0.75, "O": 0.7778, "P": 0.6806, "Q": 0.7778, "R": 0.7361,
+    "S": 0.5556, "T": 0.7222, "U": 0.75, "V": 0.75, "W": 1.0278, "X": 0.75,
+    "Y": 0.75, "Z": 0.6111,
+    ".": 0.2778, ",": 0.2778, ":": 0.2778, ";": 0.2778, "!": 0.2778, "?": 0.4722,
+    "'": 0.2778, "`": 0.2778, '"': 0.5, "(": 0.3889, ")": 0.3889, "[": 0.2778,
+    "]": 0.2778, "-": 0.3333, "\u2013": 0.5, "\u2014": 1.0, "/": 0.5, "&": 0.7778,
+    "%": 0.8333, "#": 0.8333, "$": 0.5, "+": 0.7778, "=": 0.7778, "*": 0.5,
+    "@": 0.7778, "|": 0.2778, "<": 0.7778, ">": 0.7778, "_": 0.5,
+}
+DIGIT_WIDTH = 0.5
+DEFAULT_WIDTH = 0.5
+SPACE_WIDTH = 0.3333
+BOLD_FACTOR = 1.11
+
+_BOLD_OPEN = "\x01"
+_BOLD_CLOSE = "\x02"
+
+_DROPPED_COMMANDS = re.compile(r"\\(?:vspace|hspace)\*?\{[^}]*\}")
+_HREF = re.compile(r"\\href\{[^}]*\}\s*")
+_TEXTBF = re.compile(r"\\textbf\{")
+_COMMAND = re.compile(r"\\[a-zA-Z]+\*?")
+_ESCAPED = re.compile(r"\\([&%$#_{}])")
+
+
+def latex_to_text(latex: str) -> str:
+    """Reduce a LaTeX fragment to its visible text, marking bold spans."""
+    text = _DROPPED_COMMANDS.sub("", latex)
+    text = _HREF.sub("", text)
+    text = text.replace("---", "\u2014").replace("--", "\u2013").replace("~", " ")
+    text = _ESCAPED.sub(lambda m: "\x00" + m.group(1), text)
+
+    # Mark \textbf{...} content so it can be measured with bold widths
+    out: list[str] = []
+    depth = 0
+    bold_depths: list[int] = []
+    i = 0
+    while i < len(text):
+        match = _TEXTBF.match(text, i)
+        if match:
+            depth += 1
+            bold_depths.append(depth)
+            out.append(_BOLD_OPEN)
+            i = match.end()
+            continue
+        ch = text[i]
+        if ch == "\x00":
+            out.append(text[i + 1])
+            i += 2
+            continue
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            if bold_depths and bold_depths[-1] == depth:
+                bold_depths.pop()
+                out.append(_BOLD_CLOSE)
+            depth -= 1
+        else:
+            out.append(ch)
+        i += 1
+
+    text = _COMMAND.sub("", "".join(out))
+    return re.sub(r"[ \t\n]+", " ", text).strip()
+
+
+def text_width(text: str, size: float = SMALL_SIZE) -> float:
+    """Natural width in pt of a marked-up text string (see latex_to_text)."""
+    width = 0.0
+    bold = False
+    for ch in text:
+        if ch == _BOLD_OPEN:
+            bold = True
+            continue
+        if ch == _BOLD_CLOSE:
+            bold = False
+            continue
+        if ch == " ":
+            w = SPACE_WIDTH
+        elif ch.isdigit():
+            w = DIGIT_WIDTH
+        else:
+            w = CMR10_WIDTHS.get(ch, DEFAULT_WIDTH)
+        width += w * (BOLD_FACTOR if bold else 1.0)
+    return width * size
+
+
+def count_lines(latex: str, width: float = ITEM_WIDTH, size: float = SMALL_SIZE) -> int:
+    """Predict how many lines a paragraph wraps to, using greedy first-fit line breaking."""
+    total = 0
+    # Forced breaks (\\) start new lines
+    for segment in re.split(r"\\\\(?:\[[^\]]*\])?", latex):
+        words = latex_to_text(segment).split(" ")
+        words = [w for w in words if w.strip(_BOLD_OPEN + _BOLD_CLOSE)]
+        if not words:
+            continue
+        space = SPACE_WIDTH * size
+        lines = 1
+        line_width = 0.0
+        for word in words:
+            w = text_width(word, size)
+            if line_width and line_width + space + w > width:
+                lines += 1
+                line_width = w
+            else:
+                line_width += (space if line_width else 0.0) + w
+        total += lines
+    return max(total, 1)
+
+
+@dataclass
+class Block:
+    start: int
+    end: int
+    kind: str
+    height: float
+
+
+@dataclass
+class LayoutEstimate:
+    pages: int
+    usage: float  # fractional pages, e.g. 1.82 = 82% of the second page
+    blocks: list[Block] = field(default_factory=list, repr=False)
+
+
+@dataclass
+class FitResult:
+    original: LayoutEstimate
+    requested: LayoutEstimate  # with every accepted change applied
+    estimated: LayoutEstimate  # after deselecting overflowing changes
+    kept_ids: list[str]
+    dropped_ids: list[str]
+    line_deltas: dict[str, int]
+
+
+def _find_group_end(latex: str, open_pos: int) -> int:
+    """Index just past the brace group starting at open_pos (which must be '{')."""
+    depth = 0
+    i = open_pos
+    while i < len(latex):
+        ch = latex[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return len(latex)
+
+
+def _item_height(content: str, width: float = ITEM_WIDTH) -> float:
+    return count_lines(content, width) * SMALL_BASELINE + ITEM_SPACING
+
+
+_BLOCK_PATTERN = re.compile(
+    r"\\section\*?\{|\\resumeSubheading\b|\\resumeSubSubheading\b|\\resumeProjectHeading\b"
+    r"|\\resumeItem\{|\\resumeItemListEnd\b|\\begin\{minipage\}|\\begin\{center\}"
+    r"|\\small\{\\item\{|\\vspace\*?\{-?[\d.]+pt\}"
+)
+
+
+def _parse_blocks(latex: str) -> list[Block]:
+    """Split the document body into vertical blocks with estimated heights."""
+    body_start = latex.find("\\begin{document}")
+    body_start = 0 if body_start == -1 else body_start + len("\\begin{document}")
+    body_end = latex.find("\\end{document}")
+    body_end = len(latex) if body_end == -1 else body_end
+
+    blocks: list[Block] = []
+    pos = body_start
+    seen_header = False
+    while True:
+        match = _BLOCK_PATTERN.search(latex, pos, body_end)
+        if not match:
+            break
+        token = match.group(0)
+        start = match.start()
+
+        if token.startswith("\\section"):
+            end = _find_group_end(latex, match.end() - 1)
+            blocks.append(Block(start, end, "section", SECTION_HEIGHT))
+        elif token == "\\resumeSubheading":
+            blocks.append(Block(start, match.end(), "subheading", SUBHEADING_HEIGHT))
+            end = match.end()
+        elif token in ("\\resumeSubSubheading", "\\resumeProjectHeading"):
+            blocks.append(Block(start, match.end(), "subsubheading", SUBSUBHEADING_HEIGHT))
+            end = match.end()
+        elif token == "\\resumeItem{":
+            end = _find_group_end(latex, match.end() - 1)
+            content = latex[match.end():end - 1]
+            blocks.append(Block(start, end, "item", _item_height(content)))
+        elif token == "\\resumeItemListEnd":
+            end = match.end()
+            blocks.append(Block(start, end, "list_end", LIST_END_HEIGHT))
+        elif token == "\\begin{minipage}":
+            end_pos = latex.find("\\end{minipage}", match.end(), body_end)
+            end = body_end if end_pos == -1 else end_pos + len("\\end{minipage}")
+            content = latex[match.end():end]
+            content = re.sub(r"^\{[^}]*\}", "", content.lstrip())
+            height = count_lines(content, SUMMARY_WIDTH) * SMALL_BASELINE
+            blocks.append(Block(start, end, "paragraph", height))
+        elif token == "\\begin{center}":
+            end = match.end()
+            if not seen_header:
+                seen_header = True
+                header_end = latex.find("\\end{center}", end, body_end)
+                end = body_end if header_end == -1 else header_end + len("\\end{center}")
+                blocks.append(Block(start, end, "header", HEADER_HEIGHT))
+            else:
+                # Centered heading line above the summary minipage
+                blocks.append(Block(start, end, "heading", SMALL_BASELINE + 2.0))
+        elif token == "\\small{\\item{":
+            end = _find_group_end(latex, match.end() - 1)
+            content = latex[match.end():end - 1]
+            blocks.append(Block(start, end, "item", _item_height(content, TEXT_WIDTH - SUBHEADING_INDENT)))
+        else:  # explicit \vspace in the body
+            amount = float(re.search(r"-?[\d.]+", token).group(0))
+            end = match.end()
+            blocks.append(Block(start, end, "vspace", amount))
+        pos = end
+
+    return blocks
+
+
+def _paginate(heights: list[float]) -> tuple[int, float]:
+    """Place blocks on pages without splitting them. Returns (pages, fractional usage)."""
+    pages = 1
+    fill = 0.0
+    for height in heights:
+        if height > 0 and fill + height > TEXT_HEIGHT and fill > 0:
+            pages += 1
+            fill = 0.0
+        fill = max(fill + height, 0.0)
+    return pages, (pages - 1) + fill / TEXT_HEIGHT
+
+
+def estimate_layout(latex: str) -> LayoutEstimate:
+    """Estimate how many pages a CV LaTeX document compiles to."""
+    blocks = _parse_blocks(latex)
+    pages, usage = _paginate([b.height for b in blocks])
+    return LayoutEstimate(pages=pages, usage=usage, blocks=blocks)
+
+
+_layouts: OrderedDict[str, tuple[str, LayoutEstimate]] = OrderedDict()
+_layouts_lock = threading.Lock()
+
+
+def cached_layout(cv_id: str, latex: str) -> LayoutEstimate:
+    """estimate_layout() of a CV's original LaTeX, parsed once per cv_id.
+
+    The estimate and apply endpoints are called on every toggle of a change, so the
+    document is only re-parsed if it is not cached (or its LaTeX has changed).
+    """
+    with _layouts_lock:
+        entry = _layouts.get(cv_id)
+        if entry is not None and entry[0] == latex:
+            _layouts.move_to_end(cv_id)
+            return entry[1]
+
+    layout = estimate_layout(latex)
+    with _layouts_lock:
+        _layouts[cv_id] = (latex, layout)
+        _layouts.move_to_end(cv_id)
+        while len(_layouts) > LAYOUT_CACHE_SIZE:
+            _layouts.popitem(last=False)
+    return layout
+
+
+def _block_index(blocks: list[Block], pos: int) -> int | None:
+    for i, block in enumerate(blocks):
+        if block.start <= pos < block.end:
+            return i
+    return None
+
+
+_IMPACT_ORDER = {"low": 0, "medium": 1, "high": 2}
+
+
+def fit_changes(
+    latex: str,
+    changes: list[dict],
+    accepted_ids: list[str],
+    original: LayoutEstimate | None = None,
+) -> FitResult:
+    """Predict the page usage of the CV with the accepted changes applied.
+
+    Only the blocks touched by a change are re-measured. If the changes would push the
+    CV past the original page count, the lowest-impact changes that add lines are
+    deselected (largest growth first) until it fits again.
+    """
+    if original is None:
+        original = estimate_layout(latex)
+    blocks = original.blocks
+
+    accepted_set = set(accepted_ids)
+    heights = [b.height for b in blocks]
+    block_deltas: dict[str, tuple[int, float]] = {}
+    line_deltas: dict[str, int] = {}
+
+    for change in changes:
+        if change["id"] not in accepted_set:
+            continue
+        pos = latex.find(change["original_text"])
+        if pos == -1:
+            continue
+        idx = _block_index(blocks, pos)
+        if idx is None or blocks[idx].kind not in ("item", "paragraph"):
+            line_deltas[change["id"]] = 0
+            continue
+
+        block = blocks[idx]
+        block_latex = latex[block.start:block.end]
+        rel = pos - block.start
+        new_latex = (
+            block_latex[:rel] + change["proposed_text"]
+            + block_latex[rel + len(change["original_text"]):]
+        )
+        width = SUMMARY_WIDTH if block.kind == "paragraph" else ITEM_WIDTH
+        old_lines = count_lines(block_latex, width)
+        new_lines = count_lines(new_latex, width)
+        delta = (new_lines - old_lines) * SMALL_BASELINE
+        block_deltas[change["id"]] = (idx, delta)
+        line_deltas[change["id"]] = new_lines - old_lines
+
+    def _estimate(ids: set[str]) -> tuple[int, float]:
+        adjusted = list(heights)
+        for change_id in ids:
+            if change_id in block_deltas:
+                idx, delta = block_deltas[change_id]
+                adjusted[idx] += delta
+        return _paginate(adjusted)
+
+    kept = {c["id"] for c in changes if c["id"] in accepted_set}
+    pages, usage = _estimate(kept)
+    requested = LayoutEstimate(pages=pages, usage=usage)
+
+    dropped: list[str] = []
+    if pages > original.pages:
+        candidates = sorted(
+            (c for c in changes if line_deltas.get(c["id"], 0) > 0 and c["id"] in kept),
+            key=lambda c: (_IMPACT_ORDER.get(c.get("impact", "medium"), 1), -line_deltas[c["id"]]),
+        )
+        for change in candidates:
+            kept.discard(change["id"])
+            dropped.append(change["id"])
+            pages, usage = _estimate(kept)
+            if pages <= original.pages:
+                break
+
+    return FitResult(
+        original=original,
+        requested=requested,
+        estimated=LayoutEstimate(pages=pages, usage=usage),
+        kept_ids=[i for i in accepted_ids if i in kept],
+        dropped_ids=dropped,
+        line_deltas=line_deltas,
+    )
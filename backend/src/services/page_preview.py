@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+import io
+import logging
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF
+
+from src.config import settings
+from src.services.storage import get_store
+
+logger = logging.getLogger("uvicorn.error")
+
+MEDIA_TYPES = {"png": "image/png", "webp": "image/webp"}
+
+# Digests of immutable artifacts by key, so repeat requests skip reading the PDF
+_MAX_DIGESTS = 1024
+_digests: OrderedDict[str, str] = OrderedDict()
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def webp_available() -> bool:
+    """WebP encoding needs Pillow, which is optional."""
+    try:
+        import PIL.Image  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def render_page(pdf_bytes: bytes, page_number: int, width: int, fmt: str) -> bytes:
+    """Render one page (1-based) of a PDF to an image `width` pixels wide.
+
+    Raises IndexError if the page does not exist. Runs in a worker process.
+    """
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        if not 1 <= page_number <= doc.page_count:
+            raise IndexError(f"Page {page_number} out of range (1-{doc.page_count})")
+        page = doc[page_number - 1]
+        scale = width / page.rect.width
+        pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
+    finally:
+        doc.close()
+
+    if fmt == "webp":
+        from PIL import Image
+
+        image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+        buf = io.BytesIO()
+        image.save(buf, format="WEBP", quality=80, method=4)
+        return buf.getvalue()
+    return pix.tobytes("png")
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.PREVIEW_WORKERS)
+    return _pool
+
+
+def shutdown_preview_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def render_in_pool(pdf_bytes: bytes, page_number: int, width: int, fmt: str) -> bytes:
+    """Run render_page in the preview worker pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), render_page, pdf_bytes, page_number, width, fmt)
+
+
+def _remember_digest(key: str, digest: str) -> None:
+    _digests[key] = digest
+    _digests.move_to_end(key)
+    while len(_digests) > _MAX_DIGESTS:
+        _digests.popitem(last=False)
+
+
+async def artifact_digest(key: str, immutable: bool) -> tuple[str, bytes | None]:
+    """SHA-256 of a PDF artifact, plus its bytes when they had to be read.
+
+    Digests of immutable artifacts are remembered, so a cached preview can be served
+    (or a 304 returned) without touching the PDF. Mutable "latest" artifacts are
+    always read from the backend.
+    """
+    if immutable and key in _digests:
+        _digests.move_to_end(key)
+        return _digests[key], None
+
+    store = get_store()
+    if immutable:
+        path = await asyncio.to_thread(store.local_path, key)
+        data = await asyncio.to_thread(path.read_bytes)
+    else:
+        data = await asyncio.to_thread(store.read_bytes, key)
+    digest = hashlib.sha256(data).hexdigest()
+    if immutable:
+        _remember_digest(key, digest)
+    return digest, data
+
+
+def preview_key(digest: str, page_number: int, width: int, fmt: str) -> str:
+    return f"previews/{digest[:2]}/{digest}/{page_number}-{width}.{fmt}"
+
+
+async def get_page_preview(
+    key: str,
+    digest: str,
+    pdf_bytes: bytes | None,
+    page_number: int,
+    width: int,
+    fmt: str,
+) -> bytes:
+    """Image of one page of the PDF stored under `key`, rendered once per digest/width/format.
+
+    Raises IndexError if the page does not exist.
+    """
+    store = get_store()
+    cache_key = preview_key(digest, page_number, width, fmt)
+    if await asyncio.to_thread(store.exists, cache_key):
+        await asyncio.to_thread(store.touch, cache_key)
+        path = await asyncio.to_thread(store.local_path, cache_key)
+        return await asyncio.to_thread(path.read_bytes)
+
+    if pdf_bytes is None:
+        path = await asyncio.to_thread(store.local_path, key)
+        pdf_bytes = await asyncio.to_thread(path.read_bytes)
+
+    image = await render_in_pool(pdf_bytes, page_number, width, fmt)
+    await asyncio.to_thread(store.write_bytes, cache_key, image)
+    logger.info(f"Rendered preview {cache_key} ({len(image)} bytes)")
+    return image
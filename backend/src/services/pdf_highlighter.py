@@ -0,0 +1,157 @@
+import difflib
+import logging
+import re
+import unicodedata
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+from src.services.page_estimator import latex_to_text
+from src.services.storage import atomic_write
+
+logger = logging.getLogger("uvicorn.error")
+
+# Approximation of dvipsnames OliveGreen, drawn semi-transparent over the text
+HIGHLIGHT_COLOR = (0.42, 0.66, 0.2)
+HIGHLIGHT_OPACITY = 0.35
+
+_PUNCTUATION = re.compile(r"^\W+|\W+$")
+
+
+def _normalize_word(word: str) -> str:
+    """Casefold a word, expand ligatures and strip surrounding punctuation."""
+    word = unicodedata.normalize("NFKC", word).casefold()
+    return _PUNCTUATION.sub("", word)
+
+
+def _plain_words(latex: str) -> list[str]:
+    """Normalized visible words of a LaTeX fragment."""
+    text = latex_to_text(latex).replace("\x01", "").replace("\x02", "")
+    words = (_normalize_word(w) for w in text.split())
+    return [w for w in words if w]
+
+
+def _document_words(doc: fitz.Document) -> list[tuple[str, int, list[fitz.Rect]]]:
+    """Normalized words of a PDF in reading order as (word, page_number, rects).
+
+    Words hyphenated across a line break are joined into a single entry with one
+    rect per fragment, so they still match the unhyphenated source text.
+    """
+    words: list[tuple[str, int, list[fitz.Rect]]] = []
+    pending: tuple[str, int, list[fitz.Rect]] | None = None
+
+    for page in doc:
+        for x0, y0, x1, y1, raw, *_ in page.get_text("words", sort=True):
+            rect = fitz.Rect(x0, y0, x1, y1)
+            if pending is not None:
+                text, page_no, rects = pending
+                pending = None
+                word = _normalize_word(text[:-1] + raw)
+                if word:
+                    words.append((word, page_no, rects + [rect]))
+                continue
+            if raw.endswith("-") and len(raw) > 1:
+                pending = (raw, page.number, [rect])
+                continue
+            word = _normalize_word(raw)
+            if word:
+                words.append((word, page.number, [rect]))
+
+    if pending is not None:
+        text, page_no, rects = pending
+        words.append((_normalize_word(text), page_no, rects))
+    return words
+
+
+def _find_sequence(haystack: list[str], needle: list[str], start: int) -> int:
+    """Index of the first occurrence of needle in haystack at or after start, or -1."""
+    n = len(needle)
+    first = needle[0]
+    for i in range(start, len(haystack) - n + 1):
+        if haystack[i] == first and haystack[i:i + n] == needle:
+            return i
+    return -1
+
+
+def highlight_phrases(pdf_path: Path, phrases: list[str], output_path: Path) -> int:
+    """Draw highlight overlays over LaTeX phrases in a compiled PDF.
+
+    Phrases are given as LaTeX source in document order. Each is located by its word
+    sequence (searching forward from the previous match, so repeated phrases land on
+    the right occurrence) and a translucent box is drawn over every matched line.
+    Returns the number of phrases located (phrases without visible text count as located).
+    """
+    doc = fitz.open(str(pdf_path))
+    try:
+        words = _document_words(doc)
+        tokens = [w for w, _, _ in words]
+
+        found = 0
+        cursor = 0
+        for phrase in phrases:
+            needle = _plain_words(phrase)
+            if not needle:
+                found += 1  # no visible text, nothing to highlight
+                continue
+            idx = _find_sequence(tokens, needle, cursor)
+            if idx == -1:
+                idx = _find_sequence(tokens, needle, 0)
+            if idx == -1:
+                logger.warning(f"Could not locate highlighted phrase in PDF: {phrase[:80]!r}")
+                continue
+            found += 1
+            cursor = idx + len(needle)
+
+            # Merge word boxes into one box per line
+            line_boxes: list[tuple[int, fitz.Rect]] = []
+            for _, page_no, rects in words[idx:cursor]:
+                for rect in rects:
+                    if line_boxes:
+                        last_page, last = line_boxes[-1]
+                        same_line = abs(last.y0 - rect.y0) < 2 and abs(last.y1 - rect.y1) < 2
+                        if last_page == page_no and same_line:
+                            line_boxes[-1] = (page_no, last | rect)
+                            continue
+                    line_boxes.append((page_no, fitz.Rect(rect)))
+
+            for page_no, box in line_boxes:
+                doc[page_no].draw_rect(
+                    box,
+                    color=None,
+                    fill=HIGHLIGHT_COLOR,
+                    fill_opacity=HIGHLIGHT_OPACITY,
+                    overlay=True,
+                )
+
+        data = doc.tobytes(garbage=1, deflate=True)
+    finally:
+        doc.close()
+
+    atomic_write(output_path, lambda f: f.write(data))
+    return found
+
+
+def changed_phrases(original_latex: str, new_latex: str) -> list[str]:
+    """Word runs of new_latex's body that differ from original_latex, in document order.
+
+    Used when the changes are not known up front (e.g. a full-document rewrite), so
+    the highlighted PDF can still be produced by overlaying the clean one.
+    """
+    def body(latex: str) -> str:
+        start = latex.find("\\begin{document}")
+        end = latex.find("\\end{document}")
+        return latex[start if start != -1 else 0:end if end != -1 else len(latex)]
+
+    old_words = latex_to_text(body(original_latex)).replace("\x01", "").replace("\x02", "").split()
+    new_words = latex_to_text(body(new_latex)).replace("\x01", "").replace("\x02", "").split()
+
+    matcher = difflib.SequenceMatcher(
+        a=[_normalize_word(w) for w in old_words],
+        b=[_normalize_word(w) for w in new_words],
+        autojunk=False,
+    )
+    phrases = []
+    for tag, _i1, _i2, j1, j2 in matcher.get_opcodes():
+        if tag in ("replace", "insert") and j2 > j1:
+            phrases.append(" ".join(new_words[j1:j2]))
+    return phrases
@@ -16,3 +16,19 @@ def pdf_to_images(pdf_path: Path) -> list[bytes]:
 
     doc.close()
     return images
+
+
+def pdf_to_text(pdf_path: Path) -> str:
+    """Extract the text layer of a PDF (empty string for scanned/image-only PDFs)."""
+    doc = fitz.open(str(pdf_path))
+    text = "\n".join(page.get_text() for page in doc)
+    doc.close()
+    return text
+
+
+def pdf_page_count(pdf_path: Path) -> int:
+    """Return the number of pages in a PDF."""
+    doc = fitz.open(str(pdf_path))
+    count = doc.page_count
+    doc.close()
+    return count
@@ -0,0 +1,264 @@
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+INTERMEDIATE_SUFFIXES = {".aux", ".log", ".out", ".tex"}
+
+# Groups and directories modified this recently are never removed, so a request that
+# has just checked for (or is about to write into) them is not raced by the sweeper
+GRACE_SECONDS = 300
+
+
+def classify(path: Path) -> str | None:
+    """Artifact class of a file under DATA_DIR, or None if retention should not touch it.
+
+    Classes: uploads, latex, analyses, pdfs, previews, intermediates.
+    """
+    try:
+        rel = path.relative_to(settings.DATA_DIR)
+    except ValueError:
+        return None
+    parts = rel.parts
+    if not parts:
+        return None
+
+    if parts[0] == "uploads":
+        return "uploads"
+    if parts[0] == "previews":
+        return "previews"
+    if parts[0] != "generated":
+        return None
+
+    if path.name == "original.tex":
+        return "latex"
+    if path.name in ("analysis.json", "summary.txt"):
+        return "analyses"
+    if path.suffix == ".pdf":
+        return "pdfs"
+    if path.suffix in INTERMEDIATE_SUFFIXES:
+        return "intermediates"
+    if path.name.startswith(".") and path.suffix == ".tmp":
+        return "intermediates"  # left behind by an interrupted atomic write
+    return None
+
+
+def ttl_seconds(artifact_class: str) -> float:
+    hours = {
+        "uploads": settings.RETENTION_TTL_HOURS_UPLOADS,
+        "latex": settings.RETENTION_TTL_HOURS_LATEX,
+        "analyses": settings.RETENTION_TTL_HOURS_ANALYSES,
+        "pdfs": settings.RETENTION_TTL_HOURS_PDFS,
+        "previews": settings.RETENTION_TTL_HOURS_PREVIEWS,
+        "intermediates": settings.RETENTION_TTL_HOURS_INTERMEDIATES,
+    }[artifact_class]
+    return hours * 3600
+
+
+def touch(path: Path) -> None:
+    """Record an access to an artifact.
+
+    Sets the file's atime explicitly, since data volumes are commonly mounted with
+    noatime/relatime. The mtime is left alone.
+    """
+    try:
+        st = path.stat()
+        os.utime(path, (time.time(), st.st_mtime))
+    except OSError:
+        pass
+
+
+def _last_access(st: os.stat_result) -> float:
+    return max(st.st_atime, st.st_mtime)
+
+
+def _remove_empty_dirs(root: Path, now: float) -> None:
+    for dirpath, _dirnames, _filenames in os.walk(root, topdown=False):
+        path = Path(dirpath)
+        if path == root:
+            continue
+        try:
+            if now - path.stat().st_mtime < GRACE_SECONDS:
+                continue
+            path.rmdir()  # only succeeds if empty
+        except OSError:
+            pass
+
+
+def _group(rel: Path) -> tuple[str, ...]:
+    """Retention group of a file (path relative to DATA_DIR).
+
+    Artifacts are only usable together with the ones they were derived from, so they
+    are removed as groups:
+      ("upload", cv)     uploads/<cv>.pdf
+      ("cv", cv)         generated/<cv>/ (original.tex, latest results), derived from the upload
+      ("job", cv, job)   generated/<cv>/analyses/<job>/ and wizard/<job>/, derived from original.tex
+      ("file", path)     anything else (previews), independent
+    """
+    parts = rel.parts
+    if parts[0] == "uploads" and len(parts) == 2:
+        return ("upload", Path(parts[1]).stem)
+    if parts[0] == "generated" and len(parts) >= 3:
+        if len(parts) >= 5 and parts[2] in ("analyses", "wizard"):
+            return ("job", parts[1], parts[3])
+        return ("cv", parts[1])
+    return ("file", str(rel))
+
+
+def _is_group_root(rel: Path) -> bool:
+    """Whether the rest of the file's group is unusable without it."""
+    parts = rel.parts
+    return (
+        parts[0] == "uploads"
+        or rel.name == "original.tex"
+        or (rel.name == "analysis.json" and "analyses" in parts)
+    )
+
+
+def _dependents(group: tuple[str, ...], groups: dict) -> list[tuple[str, ...]]:
+    """The group itself plus every group derived from it."""
+    if group[0] == "upload":
+        return [group, *_dependents(("cv", group[1]), groups)]
+    if group[0] == "cv":
+        return [group, *(g for g in groups if g[0] == "job" and g[1] == group[1])]
+    return [group]
+
+
+@dataclass
+class _File:
+    path: Path
+    size: int
+    access: float
+    mtime: float
+    artifact_class: str
+
+
+def sweep(now: float | None = None) -> dict:
+    """Delete expired artifacts, then evict least recently used ones above the quota.
+
+    Files expire individually by their class TTL, except that an expired group root
+    (an upload, original.tex or analysis.json) takes every artifact derived from it
+    along, so a cache check never finds results whose inputs are gone. Quota eviction
+    works on whole groups, least recently used first. Groups modified within
+    GRACE_SECONDS are left alone. Files that classify() does not recognize are neither
+    removed nor counted towards the quota. Returns counts and sizes for logging.
+    """
+    now = time.time() if now is None else now
+    data_dir = settings.DATA_DIR
+    if not data_dir.exists():
+        return {"expired": 0, "evicted": 0, "freed_bytes": 0, "total_bytes": 0}
+
+    groups: dict[tuple[str, ...], list[_File]] = {}
+    for dirpath, _dirnames, filenames in os.walk(data_dir):
+        for name in filenames:
+            path = Path(dirpath) / name
+            artifact_class = classify(path)
+            if artifact_class is None:
+                continue  # not an artifact (e.g. the indexes under index/): never removed
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            groups.setdefault(_group(path.relative_to(data_dir)), []).append(
+                _File(path, st.st_size, _last_access(st), st.st_mtime, artifact_class)
+            )
+
+    def recently_modified(group: tuple[str, ...]) -> bool:
+        return any(now - f.mtime < GRACE_SECONDS for f in groups.get(group, ()))
+
+    freed = 0
+
+    def remove(files: list[_File]) -> int:
+        nonlocal freed
+        removed = 0
+        for f in files:
+            try:
+                f.path.unlink()
+            except OSError:
+                continue
+            removed += 1
+            freed += f.size
+        return removed
+
+    def remove_groups(roots: list[tuple[str, ...]]) -> int:
+        removed = 0
+        for root in roots:
+            if root not in groups:
+                continue  # already removed with another root
+            dependents = [g for g in _dependents(root, groups) if g in groups]
+            if any(recently_modified(g) for g in dependents):
+                continue
+            for g in dependents:
+                removed += remove(groups.pop(g))
+        return removed
+
+    # Expiry: expired roots remove their groups, other expired files go individually
+    expired = 0
+    expired_roots: list[tuple[str, ...]] = []
+    for group, files in list(groups.items()):
+        kept = []
+        for f in files:
+            if now - f.access <= ttl_seconds(f.artifact_class):
+                kept.append(f)
+            elif _is_group_root(f.path.relative_to(data_dir)):
+                expired_roots.append(group)
+                kept.append(f)
+            else:
+                expired += remove([f])
+        groups[group] = kept
+    expired += remove_groups(expired_roots)
+
+    def size(group: tuple[str, ...]) -> int:
+        return sum(f.size for f in groups.get(group, ()))
+
+    total_bytes = sum(size(g) for g in groups)
+
+    # Quota: evict whole groups, least recently used first. A group counts as used as
+    # recently as anything derived from it, so inputs outlive their derived results.
+    evicted = 0
+    quota = settings.DATA_DIR_QUOTA_MB * 1024 * 1024
+    if quota and total_bytes > quota:
+        def last_use(group: tuple[str, ...]) -> float:
+            return max(
+                (f.access for g in _dependents(group, groups) for f in groups.get(g, ())),
+                default=0.0,
+            )
+
+        for group in sorted(groups, key=last_use):
+            if total_bytes <= quota:
+                break
+            if group not in groups:
+                continue
+            before = sum(size(g) for g in _dependents(group, groups))
+            removed = remove_groups([group])
+            if removed:
+                evicted += removed
+                total_bytes -= before
+
+    # Every sweep, since directories spared for their grace period are left for the next
+    for subdir in ("generated", "previews", "uploads"):
+        _remove_empty_dirs(data_dir / subdir, now)
+
+    return {"expired": expired, "evicted": evicted, "freed_bytes": freed, "total_bytes": total_bytes}
+
+
+async def run_sweeper() -> None:
+    """Periodically sweep DATA_DIR in a worker thread, so requests are never blocked."""
+    while True:
+        try:
+            stats = await asyncio.to_thread(sweep)
+            if stats["expired"] or stats["evicted"]:
+                logger.info(
+                    f"Retention sweep: {stats['expired']} expired, {stats['evicted']} evicted, "
+                    f"freed {stats['freed_bytes'] / 1024 / 1024:.1f} MB, "
+                    f"{stats['total_bytes'] / 1024 / 1024:.1f} MB in use"
+                )
+        except Exception as e:
+            logger.error(f"Retention sweep failed: {e}", exc_info=True)
+        await asyncio.sleep(settings.RETENTION_SWEEP_INTERVAL_SECONDS)
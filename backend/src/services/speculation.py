@@ -0,0 +1,144 @@
+import asyncio
+import logging
+
+from src.config import settings
+from src.services.cv_applier import change_set_key, compile_change_set, load_cached_inputs
+from src.services.latex_compiler import foreground_compiles, on_foreground_compile
+
+logger = logging.getLogger("uvicorn.error")
+
+# How often a pending speculation re-checks whether the compiler is idle
+IDLE_POLL_SECONDS = 0.25
+
+# In-flight speculative compiles keyed by (cv_id, job_id, change_set_key)
+_tasks: dict[tuple[str, str, str], asyncio.Task] = {}
+# Keys whose speculative compile has actually started running pdflatex
+_compiling: set[tuple[str, str, str]] = set()
+
+# Only one speculative compile runs at a time, so speculation never competes with itself
+_slot = asyncio.Semaphore(1)
+
+
+def likely_change_sets(changes: list[dict]) -> list[list[str]]:
+    """The change sets users most often accept: all high-impact changes, then all changes."""
+    all_ids = [c["id"] for c in changes]
+    high_ids = [c["id"] for c in changes if c.get("impact") == "high"]
+
+    candidates = []
+    if high_ids and len(high_ids) < len(all_ids):
+        candidates.append(high_ids)
+    if all_ids:
+        candidates.append(all_ids)
+    return candidates
+
+
+async def _speculate(key: tuple[str, str, str], accepted_ids: list[str]) -> None:
+    cv_id, job_id, _ = key
+    async with _slot:
+        # Use idle compile capacity only: wait until no user-facing compile is running
+        while foreground_compiles() > 0:
+            await asyncio.sleep(IDLE_POLL_SECONDS)
+        _compiling.add(key)
+        try:
+            await compile_change_set(cv_id, job_id, accepted_ids, background=True)
+        finally:
+            _compiling.discard(key)
+        logger.info(f"Speculatively precompiled {len(accepted_ids)} changes for {cv_id}/{job_id}")
+
+
+def _yield_to_foreground() -> None:
+    """Cancel running speculative compiles, so a user-facing compile that starts gets the CPU.
+
+    Queued speculation is left alone: it waits for the compiler to be idle anyway.
+    """
+    cancelled = 0
+    for key in list(_compiling):
+        task = _tasks.get(key)
+        if task is not None and not task.done():
+            task.cancel()
+            cancelled += 1
+    if cancelled:
+        logger.info(f"Cancelled {cancelled} running speculative precompiles for a user compile")
+
+
+on_foreground_compile(_yield_to_foreground)
+
+
+def _on_done(key: tuple[str, str, str], task: asyncio.Task) -> None:
+    if _tasks.get(key) is task:
+        del _tasks[key]
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Speculative precompile failed for {key}: {task.exception()}")
+
+
+async def schedule_speculative_compiles(cv_id: str, job_id: str) -> None:
+    """Precompile the likely accepted change sets in the background after an analysis."""
+    if not settings.SPECULATIVE_PRECOMPILE:
+        return
+
+    try:
+        _latex, changes = await asyncio.to_thread(load_cached_inputs, cv_id, job_id)
+    except FileNotFoundError:
+        return
+
+    for accepted_ids in likely_change_sets(changes):
+        key = (cv_id, job_id, change_set_key(changes, accepted_ids))
+        if key in _tasks:
+            continue
+        task = asyncio.create_task(_speculate(key, accepted_ids))
+        _tasks[key] = task
+        task.add_done_callback(lambda t, key=key: _on_done(key, t))
+
+
+def cancel_speculation(
+    cv_id: str, job_id: str | None = None, keep: tuple[str, str, str] | None = None
+) -> int:
+    """Cancel in-flight speculative compiles for a CV (or CV/job pair), except `keep`.
+
+    Used before a user-facing apply of that CV, so queued speculation for change sets
+    it will not need does not run. Other users' speculation is not cancelled here:
+    queued work waits for the compiler to be idle, and running work is cancelled by
+    _yield_to_foreground as soon as any user-facing compile starts.
+    """
+    cancelled = 0
+    for key, task in list(_tasks.items()):
+        if key[0] != cv_id or (job_id is not None and key[1] != job_id):
+            continue
+        if key != keep and not task.done():
+            task.cancel()
+            cancelled += 1
+    if cancelled:
+        logger.info(f"Cancelled {cancelled} speculative precompiles for {cv_id}")
+    return cancelled
+
+
+async def claim_speculation(cv_id: str, job_id: str, accepted_ids: list[str]) -> None:
+    """Prepare for a user-facing apply of `accepted_ids`.
+
+    Other speculative work for this CV/job pair is cancelled. If this exact change set is already being
+    compiled speculatively, wait for it so the apply reuses its output instead of
+    compiling again; if it is still queued, it is cancelled too.
+    """
+    try:
+        _latex, changes = await asyncio.to_thread(load_cached_inputs, cv_id, job_id)
+    except FileNotFoundError:
+        cancel_speculation(cv_id, job_id)
+        return
+
+    key = (cv_id, job_id, change_set_key(changes, accepted_ids))
+    if key not in _compiling:
+        cancel_speculation(cv_id, job_id)
+        return
+
+    cancel_speculation(cv_id, job_id, keep=key)
+    task = _tasks.get(key)
+    if task is None:
+        return
+    try:
+        await asyncio.shield(task)
+    except asyncio.CancelledError:
+        if not task.cancelled():
+            raise
+    except Exception:
+        # Speculation failed; the apply compiles the set itself
+        pass
@@ -0,0 +1,277 @@
+"""Artifact storage shared by the routes and services.
+
+Artifacts are addressed by POSIX-style keys relative to the data root, e.g.
+``uploads/<cv_id>.pdf`` or ``generated/<cv_id>/analyses/<job_id>/analysis.json``.
+Keys are built from content hashes (cv_id, job_id, change-set key), so an artifact
+stored under such a key never changes and may be cached locally indefinitely. The
+only mutable keys are the "latest result" PDFs served by the download endpoints;
+those are always read through the backend, never from the local cache.
+
+Two backends are available, selected by STORAGE_BACKEND:
+- "local": files under DATA_DIR (single host)
+- "s3": an S3-compatible bucket (AWS, MinIO, ...) shared by all replicas, with
+  DATA_DIR used as a read-through cache so hot artifacts are served from disk
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+from collections.abc import Iterator
+from pathlib import Path
+
+from src.config import settings
+from src.services.retention import touch as touch_path
+
+logger = logging.getLogger("uvicorn.error")
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def atomic_write(path: Path, writer) -> Path:
+    """Write a file via a temp file in the same directory + rename.
+
+    Concurrent readers (and other workers writing the same path) only ever see a
+    complete file: either the previous version or the new one.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            writer(f)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return path
+
+
+def atomic_copy(src: Path, dest: Path) -> Path:
+    """Copy a file so that dest is replaced atomically."""
+    with src.open("rb") as source:
+        return atomic_write(dest, lambda f: shutil.copyfileobj(source, f, CHUNK_SIZE))
+
+
+class ArtifactStore:
+    """Interface for artifact storage backends."""
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def read_bytes(self, key: str) -> bytes:
+        raise NotImplementedError
+
+    def write_bytes(self, key: str, data: bytes) -> None:
+        raise NotImplementedError
+
+    def put_file(self, key: str, path: Path) -> None:
+        """Store the contents of a local file under key."""
+        raise NotImplementedError
+
+    def copy(self, src_key: str, dst_key: str) -> None:
+        raise NotImplementedError
+
+    def iter_bytes(self, key: str) -> Iterator[bytes]:
+        """Stream an artifact in chunks, always from the backend."""
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> Path:
+        """Local file holding an immutable artifact, fetching it into the cache if needed."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def touch(self, key: str) -> None:
+        """Record an access for retention."""
+        raise NotImplementedError
+
+    def read_text(self, key: str) -> str:
+        return self.read_bytes(key).decode("utf-8")
+
+    def write_text(self, key: str, text: str) -> None:
+        self.write_bytes(key, text.encode("utf-8"))
+
+
+class LocalArtifactStore(ArtifactStore):
+    """Artifacts stored as plain files under a root directory."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def _path(self, key: str) -> Path:
+        return self.root / key
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def read_bytes(self, key: str) -> bytes:
+        path = self._path(key)
+        if not path.exists():
+            raise FileNotFoundError(f"Artifact not found: {key}")
+        return path.read_bytes()
+
+    def write_bytes(self, key: str, data: bytes) -> None:
+        atomic_write(self._path(key), lambda f: f.write(data))
+
+    def put_file(self, key: str, path: Path) -> None:
+        dest = self._path(key)
+        if dest.resolve() == path.resolve():
+            return
+        atomic_copy(path, dest)
+
+    def copy(self, src_key: str, dst_key: str) -> None:
+        self.put_file(dst_key, self._path(src_key))
+
+    def iter_bytes(self, key: str) -> Iterator[bytes]:
+        path = self._path(key)
+        if not path.exists():
+            raise FileNotFoundError(f"Artifact not found: {key}")
+        with path.open("rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                yield chunk
+
+    def local_path(self, key: str) -> Path:
+        path = self._path(key)
+        if not path.exists():
+            raise FileNotFoundError(f"Artifact not found: {key}")
+        return path
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def touch(self, key: str) -> None:
+        touch_path(self._path(key))
+
+
+class S3ArtifactStore(ArtifactStore):
+    """Artifacts stored in an S3-compatible bucket with a local read-through cache.
+
+    Point S3_ENDPOINT_URL at a local MinIO (or similar) to run against a stand-in.
+    The cache lives under cache_dir using the same key layout as the local backend,
+    so the retention sweeper manages it like any other local data.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        cache_dir: Path,
+        prefix: str = "",
+        endpoint_url: str | None = None,
+        region: str | None = None,
+    ) -> None:
+        try:
+            import boto3
+            from botocore.exceptions import ClientError
+        except ImportError as e:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires the boto3 package") from e
+
+        self._client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+        self._client_error = ClientError
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.cache_dir = cache_dir
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def _cache_path(self, key: str) -> Path:
+        return self.cache_dir / key
+
+    def _is_not_found(self, error: Exception) -> bool:
+        code = getattr(error, "response", {}).get("Error", {}).get("Code", "")
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    def _store_in_cache(self, key: str, writer) -> Path:
+        return atomic_write(self._cache_path(key), writer)
+
+    def exists(self, key: str) -> bool:
+        if self._cache_path(key).exists():
+            return True
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except self._client_error as e:
+            if self._is_not_found(e):
+                return False
+            raise
+
+    def read_bytes(self, key: str) -> bytes:
+        try:
+            response = self._client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+        except self._client_error as e:
+            if self._is_not_found(e):
+                raise FileNotFoundError(f"Artifact not found: {key}") from e
+            raise
+        return response["Body"].read()
+
+    def write_bytes(self, key: str, data: bytes) -> None:
+        self._client.put_object(Bucket=self.bucket, Key=self._object_key(key), Body=data)
+        self._store_in_cache(key, lambda f: f.write(data))
+
+    def put_file(self, key: str, path: Path) -> None:
+        # upload_file streams large files in multipart chunks
+        self._client.upload_file(str(path), self.bucket, self._object_key(key))
+        if self._cache_path(key).resolve() != path.resolve():
+            atomic_copy(path, self._cache_path(key))
+
+    def copy(self, src_key: str, dst_key: str) -> None:
+        # Server-side copy: nothing is transferred through this replica
+        self._client.copy_object(
+            Bucket=self.bucket,
+            Key=self._object_key(dst_key),
+            CopySource={"Bucket": self.bucket, "Key": self._object_key(src_key)},
+        )
+
+    def iter_bytes(self, key: str) -> Iterator[bytes]:
+        try:
+            response = self._client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+        except self._client_error as e:
+            if self._is_not_found(e):
+                raise FileNotFoundError(f"Artifact not found: {key}") from e
+            raise
+        yield from response["Body"].iter_chunks(CHUNK_SIZE)
+
+    def local_path(self, key: str) -> Path:
+        path = self._cache_path(key)
+        if path.exists():
+            return path
+
+        def download(f) -> None:
+            try:
+                self._client.download_fileobj(self.bucket, self._object_key(key), f)
+            except self._client_error as e:
+                if self._is_not_found(e):
+                    raise FileNotFoundError(f"Artifact not found: {key}") from e
+                raise
+
+        logger.info(f"Fetching {key} into local artifact cache")
+        return self._store_in_cache(key, download)
+
+    def delete(self, key: str) -> None:
+        self._client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+        self._cache_path(key).unlink(missing_ok=True)
+
+    def touch(self, key: str) -> None:
+        touch_path(self._cache_path(key))
+
+
+_store: ArtifactStore | None = None
+
+
+def get_store() -> ArtifactStore:
+    global _store
+    if _store is None:
+        if settings.STORAGE_BACKEND == "s3":
+            _store = S3ArtifactStore(
+                bucket=settings.S3_BUCKET,
+                cache_dir=settings.DATA_DIR,
+                prefix=settings.S3_PREFIX,
+                endpoint_url=settings.S3_ENDPOINT_URL or None,
+                region=settings.S3_REGION or None,
+            )
+        elif settings.STORAGE_BACKEND == "local":
+            _store = LocalArtifactStore(settings.DATA_DIR)
+        else:
+            raise RuntimeError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND!r}")
+    return _store
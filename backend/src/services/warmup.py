@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+from src.config import settings
+from src.services.anthropic_client import get_client, load_template
+from src.services.cv_fingerprint import get_fingerprint_index
+from src.services.cv_optimizer import load_sample_job
+from src.services.job_index import get_job_index
+from src.services.latex_compiler import compile_latex
+from src.services.page_preview import render_in_pool
+
+logger = logging.getLogger("uvicorn.error")
+
+# Components that must warm up successfully before the replica reports ready.
+# The Anthropic client and the CV fingerprint and job indexes are warmed but not
+# required: an upstream hiccup at startup should not keep a replica out of rotation,
+# without the fingerprint index uploads are simply converted in full, and the job
+# index is otherwise loaded by the first ranking request.
+REQUIRED_COMPONENTS = ("template", "sample_job", "latex", "pdf_renderer")
+
+
+@dataclass
+class ComponentStatus:
+    state: str = "pending"  # "pending" | "warming" | "ready" | "failed" | "skipped"
+    seconds: float | None = None
+    error: str | None = None
+
+
+_components: dict[str, ComponentStatus] = {
+    name: ComponentStatus()
+    for name in ("anthropic_client", "cv_fingerprints", "job_index", *REQUIRED_COMPONENTS)
+}
+_finished = False
+
+
+async def _warm_anthropic_client() -> None:
+    # A cheap authenticated call opens the HTTP connection pool (DNS, TLS)
+    client = get_client()
+    await client.models.list(limit=1)
+
+
+async def _warm_cv_fingerprints() -> None:
+    # Loads (or on first start, backfills) the near-duplicate index
+    await asyncio.to_thread(get_fingerprint_index)
+
+
+async def _warm_job_index() -> None:
+    # Loads the jobs indexed for ranking from the artifact store
+    await asyncio.to_thread(get_job_index)
+
+
+async def _warm_template() -> None:
+    await asyncio.to_thread(load_template)
+
+
+async def _warm_sample_job() -> None:
+    await asyncio.to_thread(load_sample_job)
+
+
+async def _warm_latex() -> None:
+    # A throwaway compile loads the TeX format and font caches from disk
+    template = await asyncio.to_thread(load_template)
+    with tempfile.TemporaryDirectory(prefix="jobbmatch-warmup-") as workspace:
+        await compile_latex(template, Path(workspace) / "template.pdf", background=True)
+
+
+async def _warm_pdf_renderer() -> None:
+    # Starts the preview worker processes and renders one page in them
+    doc = fitz.open()
+    doc.new_page()
+    pdf_bytes = doc.tobytes()
+    doc.close()
+    await render_in_pool(pdf_bytes, 1, 100, "png")
+
+
+_WARMERS = {
+    "anthropic_client": _warm_anthropic_client,
+    "cv_fingerprints": _warm_cv_fingerprints,
+    "job_index": _warm_job_index,
+    "template": _warm_template,
+    "sample_job": _warm_sample_job,
+    "latex": _warm_latex,
+    "pdf_renderer": _warm_pdf_renderer,
+}
+
+
+async def _run(name: str) -> None:
+    status = _components[name]
+    status.state = "warming"
+    start = time.perf_counter()
+    try:
+        await _WARMERS[name]()
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        status.state = "failed"
+        status.error = str(e) or type(e).__name__
+        logger.warning(f"Warm-up of {name} failed: {status.error}")
+    else:
+        status.state = "ready"
+    status.seconds = round(time.perf_counter() - start, 3)
+
+
+async def warm_up() -> None:
+    """Warm every component concurrently, so the first user request does not pay for it."""
+    global _finished
+    if not settings.WARMUP_ON_STARTUP:
+        for status in _components.values():
+            status.state = "skipped"
+        _finished = True
+        return
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_run(name) for name in _components))
+    _finished = True
+    logger.info(
+        f"Warm-up finished in {time.perf_counter() - start:.2f}s: "
+        + ", ".join(f"{name}={status.state}" for name, status in _components.items())
+    )
+
+
+def readiness() -> tuple[bool, dict]:
+    """Whether this replica should receive traffic, with per-component details."""
+    ready = _finished and all(
+        _components[name].state in ("ready", "skipped") for name in REQUIRED_COMPONENTS
+    )
+    if ready:
+        status = "ready"
+    elif _finished:
+        status = "failed"
+    else:
+        status = "warming"
+    return ready, {
+        "status": status,
+        "components": {
+            name: {"state": s.state, "seconds": s.seconds, "error": s.error}
+            for name, s in _components.items()
+        },
+    }
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from src.services.admission import AdmissionQueue, Overloaded
+
+
+def _queue(concurrency=1, max_queue=1, max_wait=1.0) -> AdmissionQueue:
+    return AdmissionQueue("apply", concurrency, max_queue, max_wait, initial_service_seconds=4.0)
+
+
+def test_rejects_when_the_queue_is_full():
+    queue = _queue(max_queue=1, max_wait=5.0)
+
+    async def run():
+        running = await queue.acquire()
+        waiter = asyncio.create_task(queue.acquire())
+        await asyncio.sleep(0)
+        assert queue.waiting == 1
+
+        with pytest.raises(Overloaded) as excinfo:
+            await queue.acquire()
+
+        running.release()
+        (await waiter).release()
+        return excinfo.value
+
+    error = asyncio.run(run())
+    assert error.reason == "is full"
+    # One request waiting ahead, at 4s each on one slot
+    assert error.retry_after == 8
+    assert queue.rejected_full == 1
+    assert queue.admitted == 2
+
+
+def test_rejects_when_the_wait_times_out():
+    queue = _queue(max_wait=0.01)
+
+    async def run():
+        running = await queue.acquire()
+        with pytest.raises(Overloaded) as excinfo:
+            await queue.acquire()
+        running.release()
+        return excinfo.value
+
+    error = asyncio.run(run())
+    assert error.reason.startswith("wait exceeded")
+    assert queue.rejected_timeout == 1
+    assert queue.waiting == 0
+
+
+def test_release_is_idempotent():
+    queue = _queue(concurrency=1, max_wait=0.01)
+
+    async def run():
+        admission = await queue.acquire()
+        admission.release()
+        admission.release()
+        # A double release must not free a second slot
+        first = await queue.acquire()
+        with pytest.raises(Overloaded):
+            await queue.acquire()
+        first.release()
+
+    asyncio.run(run())
+    assert queue.running == 0
+    assert queue.stats()["admitted"] == 2
+
+
+def test_bypass_is_counted_as_a_cache_hit():
+    queue = _queue()
+    queue.bypass()
+    assert queue.stats()["cache_hits"] == 1
+    assert queue.stats()["rejection_rate"] == 0.0
@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+from src.api.routes import cv as cv_routes
+from src.config import settings
+from src.models.cv import CVAnalyzeRequest, JobDescription
+from src.services import cv_analyzer
+from src.services.cv_analyzer import analysis_key, compute_job_id, load_cached_analysis
+from src.services.storage import LocalArtifactStore
+
+CV = "0123456789abcdef"
+JOB = JobDescription(
+    title="Data Engineer", company="Acme", location="Zurich", type="Full-time",
+    description="Build pipelines",
+)
+JOB_ID = compute_job_id(JOB.model_dump())
+
+ANALYSIS = {
+    "score": 70,
+    "score_label": "Good",
+    "matched_keywords": ["Python"],
+    "missing_keywords": [],
+    "section_scores": [],
+    "issues": [],
+    "strengths": [],
+    "changes": [],
+}
+
+
+def _store(monkeypatch, tmp_path, analysis: dict | None) -> LocalArtifactStore:
+    store = LocalArtifactStore(tmp_path)
+    for module in (cv_routes, cv_analyzer):
+        monkeypatch.setattr(module, "get_store", lambda: store)
+    monkeypatch.setattr(settings, "SPECULATIVE_PRECOMPILE", False)
+    store.write_bytes(f"uploads/{CV}.pdf", b"%PDF")
+    store.write_text(f"generated/{CV}/original.tex", "\\begin{document}\\end{document}")
+    if analysis is not None:
+        store.write_text(analysis_key(CV, JOB_ID), json.dumps(analysis))
+    return store
+
+
+def _analyze(monkeypatch, fresh: dict):
+    calls = []
+
+    async def analyze_cv_for_job(latex, job_dict, cv_id, job_id):
+        calls.append(job_id)
+        return fresh
+
+    monkeypatch.setattr(cv_routes, "analyze_cv_for_job", analyze_cv_for_job)
+    response = asyncio.run(cv_routes.analyze_cv(CVAnalyzeRequest(cv_id=CV, job=JOB)))
+    return response, calls
+
+
+def test_load_cached_analysis(monkeypatch, tmp_path):
+    _store(monkeypatch, tmp_path, None)
+    assert load_cached_analysis(CV, JOB_ID) is None
+
+    _store(monkeypatch, tmp_path, ANALYSIS)
+    assert load_cached_analysis(CV, JOB_ID) == ANALYSIS
+
+    _store(monkeypatch, tmp_path, {**ANALYSIS, "incomplete": True})
+    assert load_cached_analysis(CV, JOB_ID) is None
+
+
+def test_complete_analysis_is_a_cache_hit(monkeypatch, tmp_path):
+    _store(monkeypatch, tmp_path, ANALYSIS)
+
+    response, calls = _analyze(monkeypatch, {**ANALYSIS, "score": 10})
+
+    assert calls == []
+    assert response.score == 70
+    assert response.complete
+
+
+def test_incomplete_analysis_is_analyzed_again(monkeypatch, tmp_path):
+    _store(monkeypatch, tmp_path, {**ANALYSIS, "score": 10, "incomplete": True})
+
+    response, calls = _analyze(monkeypatch, ANALYSIS)
+
+    assert calls == [JOB_ID]
+    assert response.score == 70
+    assert response.complete
+
+
+def test_fresh_incomplete_analysis_is_reported(monkeypatch, tmp_path):
+    _store(monkeypatch, tmp_path, None)
+
+    response, _calls = _analyze(monkeypatch, {**ANALYSIS, "incomplete": True})
+
+    assert not response.complete
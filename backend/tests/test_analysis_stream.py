@@ -0,0 +1,161 @@
+import asyncio
+import json
+
+import anthropic
+import httpx
+import pytest
+
+from src.services import cv_analyzer
+from src.services.cv_analyzer import _AnalysisAssembler, analysis_key, stream_analysis
+from src.services.storage import LocalArtifactStore
+
+LATEX = "\\resumeItem{Built data pipelines in Python}\n\\resumeItem{Ran the on-call rotation}"
+
+HEADER = {
+    "score": 72,
+    "score_label": "Good Match",
+    "matched_keywords": ["Python"],
+    "missing_keywords": ["Spark"],
+}
+DETAILS = {
+    "section_scores": [{"section": "Experience", "relevance": "strong"}],
+    "issues": [{"text": "No Spark", "severity": "high"}],
+    "strengths": [{"text": "Python"}],
+}
+
+
+def _change(change_id: str, original: str = "Built data pipelines in Python") -> dict:
+    return {
+        "id": change_id,
+        "section": "Experience",
+        "original_text": original,
+        "proposed_text": "Built Spark pipelines in Python",
+        "reason": "Adds Spark",
+        "impact": "high",
+    }
+
+
+def _types(events) -> list[str]:
+    return [event for event, _data in events]
+
+
+def test_summary_is_emitted_once_a_later_field_appears():
+    assembler = _AnalysisAssembler(LATEX)
+    # The keyword list may still be growing
+    assert assembler.advance(HEADER, finished=False) == []
+
+    events = assembler.advance({**HEADER, "section_scores": []}, finished=False)
+    assert events == [("summary", HEADER)]
+    # Emitted only once
+    assert assembler.advance({**HEADER, "section_scores": [], "issues": []}, finished=False) == []
+
+
+def test_score_is_clamped_and_a_malformed_header_fails():
+    assembler = _AnalysisAssembler(LATEX)
+    [(_event, summary)] = assembler.advance({**HEADER, "score": "120"}, finished=True)
+    assert summary["score"] == 100
+
+    with pytest.raises(ValueError):
+        _AnalysisAssembler(LATEX).advance({**HEADER, "score": "high"}, finished=True)
+
+
+def test_last_change_is_held_back_until_the_stream_finishes():
+    assembler = _AnalysisAssembler(LATEX)
+    snapshot = {**HEADER, **DETAILS, "changes": [_change("change-1")]}
+    assert _types(assembler.advance(snapshot, finished=False)) == ["summary", "details"]
+
+    snapshot = {**snapshot, "changes": [_change("change-1"), _change("change-2", "Ran the on")]}
+    events = assembler.advance(snapshot, finished=False)
+    assert [data["id"] for _event, data in events] == ["change-1"]
+
+    snapshot["changes"][1] = _change("change-2", "Ran the on-call rotation")
+    events = assembler.advance(snapshot, finished=True)
+    assert events == [("change", _change("change-2", "Ran the on-call rotation"))]
+
+
+def test_duplicate_ids_are_renamed_and_invalid_changes_dropped():
+    assembler = _AnalysisAssembler(LATEX)
+    changes = [
+        _change("change-2"),
+        _change("change-2", "Ran the on-call rotation"),
+        _change("change-3", "Not in the LaTeX"),
+        {"id": "change-4", "original_text": "Ran the on-call rotation"},  # missing fields
+        _change("change-5", "  Ran the on-call rotation "),
+    ]
+    events = assembler.advance({**HEADER, **DETAILS, "changes": changes}, finished=True)
+
+    ids = [data["id"] for event, data in events if event == "change"]
+    assert len(ids) == 3 and len(set(ids)) == 3
+    assert ids[0] == "change-2"
+    assert [c["original_text"] for c in assembler.analysis["changes"]] == [
+        "Built data pipelines in Python",
+        "Ran the on-call rotation",
+        "Ran the on-call rotation",
+    ]
+
+
+class _Event:
+    type = "input_json"
+
+    def __init__(self, snapshot: dict) -> None:
+        self.snapshot = snapshot
+
+
+class _BrokenStream:
+    """Streams the given snapshots, then fails like a dropped connection."""
+
+    def __init__(self, snapshots: list[dict]) -> None:
+        self._snapshots = snapshots
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def __aiter__(self):
+        for snapshot in self._snapshots:
+            yield _Event(snapshot)
+        raise anthropic.APIConnectionError(request=httpx.Request("POST", "https://api.test"))
+
+
+class _Client:
+    def __init__(self, stream) -> None:
+        self.messages = self
+        self._stream = stream
+
+    def stream(self, **kwargs):
+        return self._stream
+
+
+def _run(monkeypatch, tmp_path, snapshots: list[dict]):
+    store = LocalArtifactStore(tmp_path)
+    monkeypatch.setattr(cv_analyzer, "get_store", lambda: store)
+    monkeypatch.setattr(cv_analyzer, "get_client", lambda: _Client(_BrokenStream(snapshots)))
+
+    async def collect():
+        return [item async for item in stream_analysis(LATEX, {"title": "Data"}, "cv", "job")]
+
+    return store, asyncio.run(collect())
+
+
+def test_api_error_after_the_summary_stores_an_incomplete_analysis(monkeypatch, tmp_path):
+    snapshots = [
+        {**HEADER, "section_scores": []},
+        {**HEADER, **DETAILS, "changes": [_change("change-1")]},
+        {**HEADER, **DETAILS, "changes": [_change("change-1"), _change("change-2", "Ran")]},
+    ]
+    store, events = _run(monkeypatch, tmp_path, snapshots)
+
+    assert _types(events) == ["summary", "details", "change", "done"]
+    analysis = events[-1][1]
+    assert analysis["incomplete"] is True
+    # The change that was still streaming is not salvaged
+    assert [c["id"] for c in analysis["changes"]] == ["change-1"]
+    assert json.loads(store.read_text(analysis_key("cv", "job"))) == analysis
+
+
+def test_api_error_before_the_summary_fails(monkeypatch, tmp_path):
+    with pytest.raises(anthropic.APIConnectionError):
+        _run(monkeypatch, tmp_path, [HEADER])
+    assert not (tmp_path / analysis_key("cv", "job")).exists()
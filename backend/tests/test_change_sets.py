@@ -0,0 +1,31 @@
+from src.services.cv_applier import change_set_key
+
+
+def _change(change_id, original, proposed):
+    return {"id": change_id, "original_text": original, "proposed_text": proposed}
+
+
+CHANGES = [
+    _change("change-1", "Built pipelines", "Built GCP pipelines"),
+    _change("change-2", "Led a team", "Led a team of five"),
+]
+
+
+def test_key_ignores_order_and_unknown_ids():
+    assert change_set_key(CHANGES, ["change-2", "change-1"]) == change_set_key(
+        CHANGES, ["change-1", "change-2", "change-9"]
+    )
+
+
+def test_key_depends_on_the_accepted_set():
+    assert change_set_key(CHANGES, ["change-1"]) != change_set_key(CHANGES, ["change-2"])
+
+
+def test_reanalysis_with_reused_ids_gets_a_new_key():
+    reanalyzed = [
+        _change("change-1", "Built pipelines", "Built Spark pipelines"),
+        CHANGES[1],
+    ]
+    assert change_set_key(CHANGES, ["change-1"]) != change_set_key(reanalyzed, ["change-1"])
+    # Changes that were not accepted do not affect the key
+    assert change_set_key(CHANGES, ["change-2"]) == change_set_key(reanalyzed, ["change-2"])
@@ -0,0 +1,121 @@
+from src.services import job_index
+from src.services.cv_analyzer import compute_job_id
+from src.services.job_index import COMPACT_THRESHOLD, JobIndex, get_job_index, save_job_index
+from src.services.storage import LocalArtifactStore
+
+CV_TEXT = "Data engineer: Python, Spark, Airflow, building pipelines"
+
+
+def _job(title: str, description: str, keywords: list[str] | None = None) -> dict:
+    return {
+        "title": title,
+        "company": "Acme",
+        "location": "Zurich",
+        "type": "Full-time",
+        "description": description,
+        "keywords": keywords,
+    }
+
+
+DATA = _job("Data Engineer", "Build Spark, Airflow pipelines; Python", ["python", "spark"])
+FRONTEND = _job("Frontend Developer", "React, TypeScript user interfaces")
+BAKER = _job("Baker", "Bread, pastry")
+
+
+def _ids(ranked) -> list[str]:
+    return [job_id for job_id, _score, _job in ranked]
+
+
+def test_rank_orders_by_overlap_and_skips_unrelated_jobs():
+    index = JobIndex()
+    data_id, frontend_id, _baker_id = index.add_jobs([DATA, FRONTEND, BAKER])
+
+    ranked = index.rank(f"{CV_TEXT}, React", top_k=10)
+
+    assert _ids(ranked) == [data_id, frontend_id]
+    assert ranked[0][1] > ranked[1][1] > 0
+    assert ranked[0][2] == DATA
+
+
+def test_rank_without_term_overlap_is_empty():
+    index = JobIndex()
+    index.add_jobs([DATA, FRONTEND])
+    assert index.rank("Gardening and pottery", top_k=10) == []
+    assert JobIndex().rank(CV_TEXT, top_k=10) == []
+
+
+def test_rank_returns_at_most_top_k():
+    index = JobIndex()
+    index.add_jobs([_job(f"Python Engineer {i}", "Python services") for i in range(5)])
+    assert len(index.rank("Python", top_k=2)) == 2
+    assert index.rank("Python", top_k=0) == []
+
+
+def test_adding_a_job_again_replaces_it():
+    index = JobIndex()
+    [data_id] = index.add_jobs([DATA])
+    changed = {**DATA, "description": "Only Kafka now"}
+    assert index.add_jobs([DATA]) == [data_id]
+    assert len(index) == 1
+
+    # Duplicates within a batch are indexed once
+    assert index.add_jobs([changed, changed]) == [compute_job_id(changed)] * 2
+    changed_id = compute_job_id(changed)
+    assert len(index) == 2
+    assert _ids(index.rank("Kafka", top_k=10)) == [changed_id]
+
+
+def test_removed_jobs_are_not_ranked_and_their_terms_forgotten():
+    index = JobIndex()
+    data_id, frontend_id, baker_id = index.add_jobs([DATA, FRONTEND, BAKER])
+
+    assert index.remove_job(baker_id)
+    assert not index.remove_job(baker_id)
+    assert baker_id not in index
+    assert index.rank("bread pastry", top_k=10) == []
+    # Document frequencies of the removed job's terms are back to zero
+    assert index._df[index._vocab["bread"]] == 0
+    assert _ids(index.rank(CV_TEXT, top_k=10)) == [data_id]
+
+
+def test_compaction_keeps_rankings_consistent():
+    jobs = [_job(f"Python Engineer {i}", f"Python role number {i}") for i in range(8)]
+    index = JobIndex()
+    job_ids = index.add_jobs(jobs)
+
+    removed = job_ids[: int(len(jobs) * COMPACT_THRESHOLD)]
+    for job_id in removed[:-1]:
+        index.remove_job(job_id)
+    # Below the threshold the rows are only tombstoned
+    assert len(index._job_ids) == len(jobs)
+    index.remove_job(removed[-1])
+
+    # Compacted: no tombstoned rows are left
+    assert len(index._job_ids) == len(jobs) - len(removed)
+    assert index._alive.all()
+    # Same scores as an index built from the remaining jobs only
+    fresh = JobIndex()
+    fresh.add_jobs([job for job_id, job in zip(job_ids, jobs) if job_id not in removed])
+    after = {job_id: score for job_id, score, _ in index.rank("Python role 7", top_k=10)}
+    expected = {job_id: score for job_id, score, _ in fresh.rank("Python role 7", top_k=10)}
+    assert after.keys() == expected.keys() == set(job_ids) - set(removed)
+    assert all(abs(after[job_id] - expected[job_id]) < 1e-6 for job_id in after)
+
+    [new_id] = index.add_jobs([DATA])
+    assert _ids(index.rank(CV_TEXT, top_k=1)) == [new_id]
+
+
+def test_index_is_saved_and_reloaded(monkeypatch, tmp_path):
+    store = LocalArtifactStore(tmp_path)
+    monkeypatch.setattr(job_index, "get_store", lambda: store)
+    monkeypatch.setattr(job_index, "_index", None)
+    data_id, frontend_id = get_job_index().add_jobs([DATA, FRONTEND])
+    get_job_index().remove_job(frontend_id)
+    save_job_index()
+
+    # A new process loads the saved jobs
+    monkeypatch.setattr(job_index, "_index", None)
+    reloaded = get_job_index()
+    assert len(reloaded) == 1
+    assert reloaded.get(data_id) == DATA
+    assert _ids(reloaded.rank(CV_TEXT, top_k=10)) == [data_id]
@@ -0,0 +1,137 @@
+import asyncio
+
+from src.config import settings
+from src.services import admission, latex_compiler, live_preview, speculation
+from src.services.admission import AdmissionQueue
+from src.services.live_preview import LivePreviewSession
+
+CHANGES = [{"id": "change-1", "original_text": "a", "proposed_text": "b", "impact": "high"}]
+
+
+def _session(monkeypatch, send) -> LivePreviewSession:
+    monkeypatch.setattr(live_preview, "load_cached_inputs", lambda cv_id, job_id: ("", CHANGES))
+    monkeypatch.setattr(settings, "LIVE_PREVIEW_DEBOUNCE_MS", 0)
+
+    async def claim(cv_id, job_id, accepted_ids):
+        pass
+
+    async def compile_change_set(cv_id, job_id, accepted_ids):
+        return "set"
+
+    monkeypatch.setattr(live_preview, "is_change_set_compiled", lambda *args: False)
+    monkeypatch.setattr(admission, "_queues", {})
+    monkeypatch.setattr(live_preview, "claim_speculation", claim)
+    monkeypatch.setattr(live_preview, "compile_change_set", compile_change_set)
+    return LivePreviewSession("cv", "job", send)
+
+
+def test_compile_survives_a_closed_socket(monkeypatch):
+    sent = []
+
+    async def send(message):
+        sent.append(message["type"])
+        raise RuntimeError("Cannot call send once a close message has been sent")
+
+    session = _session(monkeypatch, send)
+
+    async def run():
+        session.update(["change-1"])
+        await session._task
+        return session._task
+
+    task = asyncio.run(run())
+    assert task.exception() is None
+    assert sent == ["compiling", "ready"]
+
+
+def test_compile_reports_ready(monkeypatch):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    session = _session(monkeypatch, send)
+
+    async def run():
+        session.update(["change-1"])
+        await session._task
+
+    asyncio.run(run())
+    assert [m["type"] for m in sent] == ["compiling", "ready"]
+    assert sent[-1]["optimized_pdf_url"] == "/api/cv/cv/jobs/job/sets/set/optimized"
+
+
+def test_compile_reports_busy_when_the_apply_queue_is_full(monkeypatch):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    session = _session(monkeypatch, send)
+    queue = AdmissionQueue("apply", concurrency=1, max_queue=0, max_wait=1, initial_service_seconds=5)
+    admission._queues["apply"] = queue
+
+    async def run():
+        held = await queue.acquire()
+        session.update(["change-1"])
+        await session._task
+        held.release()
+
+    asyncio.run(run())
+    assert [m["type"] for m in sent] == ["compiling", "busy"]
+    assert sent[-1]["retry_after"] == 5
+    assert queue.running == 0
+
+
+def test_cancel_speculation_is_scoped_to_the_cv_and_job(monkeypatch):
+    async def run():
+        tasks = {
+            key: asyncio.create_task(asyncio.sleep(10))
+            for key in [("cv-a", "job-1", "s1"), ("cv-a", "job-1", "s2"),
+                        ("cv-a", "job-2", "s1"), ("cv-b", "job-1", "s1")]
+        }
+        monkeypatch.setattr(speculation, "_tasks", dict(tasks))
+
+        cancelled = speculation.cancel_speculation("cv-a", "job-1", keep=("cv-a", "job-1", "s2"))
+        await asyncio.sleep(0)
+        states = {key: task.cancelled() for key, task in tasks.items()}
+        for task in tasks.values():
+            task.cancel()
+        return cancelled, states
+
+    cancelled, states = asyncio.run(run())
+    assert cancelled == 1
+    assert states == {
+        ("cv-a", "job-1", "s1"): True,
+        ("cv-a", "job-1", "s2"): False,
+        ("cv-a", "job-2", "s1"): False,
+        ("cv-b", "job-1", "s1"): False,
+    }
+
+
+def test_foreground_compile_cancels_running_speculation(monkeypatch, tmp_path):
+    async def run_pdflatex(latex, output_dir):
+        pdf_path = output_dir / "document.pdf"
+        pdf_path.write_bytes(b"%PDF")
+        return pdf_path
+
+    monkeypatch.setattr(latex_compiler, "_run_pdflatex", run_pdflatex)
+
+    async def run():
+        running = ("cv-a", "job-1", "s1")
+        queued = ("cv-b", "job-1", "s1")
+        tasks = {key: asyncio.create_task(asyncio.sleep(10)) for key in (running, queued)}
+        monkeypatch.setattr(speculation, "_tasks", dict(tasks))
+        monkeypatch.setattr(speculation, "_compiling", {running})
+
+        # Background compiles do not preempt speculation; user-facing ones do
+        await latex_compiler.compile_latex("", tmp_path / "warm.pdf", background=True)
+        assert not tasks[running].cancelling()
+        await latex_compiler.compile_latex("", tmp_path / "user.pdf")
+        await asyncio.sleep(0)
+        states = {key: task.cancelled() for key, task in tasks.items()}
+        for task in tasks.values():
+            task.cancel()
+        return states[running], states[queued]
+
+    assert asyncio.run(run()) == (True, False)
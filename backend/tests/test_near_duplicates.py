@@ -0,0 +1,177 @@
+import asyncio
+
+import numpy as np
+
+from src.services import latex_generator
+from src.services.cv_fingerprint import (
+    MIN_WORDS,
+    FingerprintIndex,
+    minhash,
+    normalize_words,
+    text_digest,
+)
+from src.services.latex_generator import (
+    _latex_from_near_duplicate,
+    apply_latex_edits,
+    diff_applied,
+    text_diff,
+)
+from src.services.storage import LocalArtifactStore
+
+LINES = [
+    "Alex Example",
+    "Data Engineer at Acme, Zurich, 2020 to 2024",
+    "Built streaming data pipelines in Python and Spark",
+    "Reduced warehouse costs by a third with incremental dbt models",
+    "Ran the on-call rotation for the analytics platform",
+    "Mentored four junior engineers and interns",
+    "Education: MSc Computer Science, ETH Zurich",
+    "Skills: Python, SQL, Spark, Airflow, Docker, Kafka, Terraform",
+]
+TEXT = "\n".join(LINES)
+EDITED = TEXT.replace("Mentored four junior engineers", "Mentored five junior engineers")
+OTHER = " ".join(f"unrelated word number {i} about gardening and pottery" for i in range(10))
+
+
+def _signature(text: str) -> np.ndarray:
+    return minhash(normalize_words(text))
+
+
+def test_normalize_words_ignores_case_punctuation_and_layout():
+    assert normalize_words("Data  Engineer,\nACME") == ["data", "engineer", "acme"]
+
+
+def test_minhash_needs_enough_words():
+    assert minhash(["word"] * (MIN_WORDS - 1)) is None
+    assert minhash(normalize_words(TEXT)).dtype == np.uint32
+
+
+def test_minhash_estimates_similarity():
+    same = (_signature(TEXT) == _signature(TEXT.upper())).mean()
+    close = (_signature(TEXT) == _signature(EDITED)).mean()
+    far = (_signature(TEXT) == _signature(OTHER)).mean()
+    assert same == 1.0
+    assert 0.5 < close < 1.0
+    assert far < 0.1
+
+
+def test_index_finds_similar_cvs_and_persists(tmp_path):
+    path = tmp_path / "index.bin"
+    index = FingerprintIndex(path)
+    index.add("a" * 16, text_digest(normalize_words(TEXT)), _signature(TEXT))
+    index.add("b" * 16, text_digest(normalize_words(OTHER)), _signature(OTHER))
+
+    matches = index.similar(_signature(EDITED), 0.5)
+    assert [cv_id for cv_id, _ in matches] == ["a" * 16]
+    assert index.similar(_signature(EDITED), 0.99) == []
+    assert index.exact_match(text_digest(normalize_words(TEXT.lower()))) == "a" * 16
+
+    reloaded = FingerprintIndex(path)
+    reloaded.load()
+    assert len(reloaded) == 2
+    assert reloaded.similar(_signature(TEXT), 1.0) == [("a" * 16, 1.0)]
+
+
+def test_text_diff_ignores_spacing_and_blank_lines():
+    assert text_diff(TEXT, "\n\n".join("  ".join(line.split()) for line in LINES)) == ("", 0)
+
+    diff, changed = text_diff(TEXT, EDITED)
+    assert changed == 2
+    assert "-Mentored four junior engineers and interns" in diff
+    assert "+Mentored five junior engineers and interns" in diff
+
+
+def test_apply_latex_edits():
+    latex = "\\resumeItem{four engineers}\n\\resumeItem{Python}"
+    edits = [{"find": "four engineers", "replace": "five engineers"}]
+    assert apply_latex_edits(latex, edits) == latex.replace("four", "five")
+    # Ambiguous and missing spans are rejected
+    assert apply_latex_edits(latex, [{"find": "\\resumeItem", "replace": ""}]) is None
+    assert apply_latex_edits(latex, [{"find": "Java", "replace": "Go"}]) is None
+
+
+def test_diff_applied():
+    diff, _changed = text_diff(TEXT, EDITED)
+    assert diff_applied(EDITED.replace("\n", " "), diff, EDITED)
+    assert not diff_applied(TEXT, diff, EDITED)
+    assert not diff_applied(f"{TEXT}\nMentored five junior engineers and interns", diff, EDITED)
+
+
+class _Index:
+    """Stands in for FingerprintIndex with fixed lookup results."""
+
+    def __init__(self, similar: list[tuple[str, float]]) -> None:
+        self._similar = similar
+
+    def exact_match(self, digest):
+        return None
+
+    def similar(self, signature, min_similarity):
+        return self._similar
+
+
+def _near_duplicate(monkeypatch, tmp_path, uploads: dict[str, str], edits, compiled_text):
+    """Run _latex_from_near_duplicate for EDITED against earlier CVs with the given texts."""
+    store = LocalArtifactStore(tmp_path)
+    monkeypatch.setattr(latex_generator, "get_store", lambda: store)
+    for cv_id, text in uploads.items():
+        store.write_bytes(f"uploads/{cv_id}.pdf", b"%PDF")
+        store.write_text(f"generated/{cv_id}/original.tex", f"latex of {cv_id}: four")
+    monkeypatch.setattr(latex_generator, "pdf_to_text", lambda path: uploads[path.stem])
+
+    requests = []
+
+    async def generate_latex_edits(latex, diff):
+        requests.append(latex)
+        return edits
+
+    async def _compiled_text(latex):
+        return compiled_text
+
+    monkeypatch.setattr(latex_generator, "generate_latex_edits", generate_latex_edits)
+    monkeypatch.setattr(latex_generator, "_compiled_text", _compiled_text)
+    index = _Index([(cv_id, 0.9) for cv_id in uploads])
+    latex = asyncio.run(_latex_from_near_duplicate("new", index, EDITED, "digest", None))
+    return latex, requests
+
+
+EDIT = [{"find": "four", "replace": "five"}]
+
+
+def test_near_duplicate_edit_is_verified_and_accepted(monkeypatch, tmp_path):
+    latex, requests = _near_duplicate(monkeypatch, tmp_path, {"old": TEXT}, EDIT, EDITED)
+    assert latex == "latex of old: five"
+    assert requests == ["latex of old: four"]
+
+
+def test_near_duplicate_rejects_empty_edits(monkeypatch, tmp_path):
+    latex, _requests = _near_duplicate(monkeypatch, tmp_path, {"old": TEXT}, [], EDITED)
+    assert latex is None
+
+
+def test_near_duplicate_rejects_edits_that_do_not_compile(monkeypatch, tmp_path):
+    latex, _requests = _near_duplicate(monkeypatch, tmp_path, {"old": TEXT}, EDIT, None)
+    assert latex is None
+
+
+def test_near_duplicate_rejects_edits_that_miss_the_diff(monkeypatch, tmp_path):
+    latex, _requests = _near_duplicate(monkeypatch, tmp_path, {"old": TEXT}, EDIT, TEXT)
+    assert latex is None
+
+
+def test_near_duplicate_skips_candidates_with_large_diffs(monkeypatch, tmp_path):
+    monkeypatch.setattr(latex_generator, "MAX_EDIT_DIFF_LINES", 2)
+    rewritten = "\n".join(f"{line} (revised)" for line in LINES)
+    uploads = {"far": rewritten, "near": TEXT}
+    latex, requests = _near_duplicate(monkeypatch, tmp_path, uploads, EDIT, EDITED)
+    assert latex == "latex of near: five"
+    assert requests == ["latex of near: four"]
+
+
+def test_near_duplicate_reuses_same_text_and_marks_it_used(monkeypatch, tmp_path):
+    touched = []
+    monkeypatch.setattr(LocalArtifactStore, "touch", lambda self, key: touched.append(key))
+    latex, requests = _near_duplicate(monkeypatch, tmp_path, {"old": EDITED}, EDIT, EDITED)
+    assert latex == "latex of old: four"
+    assert requests == []
+    assert touched == ["generated/old/original.tex"]
@@ -0,0 +1,42 @@
+import asyncio
+
+import fitz  # PyMuPDF
+
+from src.services.cv_applier import overlay_highlights
+
+
+def _pdf(path, text):
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((50, 60), text, fontsize=10)
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+def test_overlay_returns_pdf_when_every_phrase_is_found(tmp_path):
+    clean = _pdf(tmp_path / "clean.pdf", "Built GCP data pipelines\nLed a team of five")
+    out = tmp_path / "highlighted.pdf"
+
+    result = asyncio.run(overlay_highlights(clean, ["GCP data pipelines", "team of five"], out))
+
+    assert result == out
+    assert out.exists()
+
+
+def test_overlay_falls_back_when_a_phrase_is_missing(tmp_path):
+    clean = _pdf(tmp_path / "clean.pdf", "Built GCP data pipelines")
+
+    result = asyncio.run(
+        overlay_highlights(clean, ["GCP data pipelines", "Kubernetes"], tmp_path / "highlighted.pdf")
+    )
+
+    assert result is None
+
+
+def test_overlay_falls_back_when_nothing_is_found(tmp_path):
+    clean = _pdf(tmp_path / "clean.pdf", "Built data pipelines")
+
+    result = asyncio.run(overlay_highlights(clean, ["Kubernetes"], tmp_path / "highlighted.pdf"))
+
+    assert result is None
@@ -0,0 +1,115 @@
+from src.services import page_estimator
+from src.services.page_estimator import (
+    ITEM_WIDTH,
+    SMALL_BASELINE,
+    TEXT_HEIGHT,
+    _paginate,
+    cached_layout,
+    count_lines,
+    estimate_layout,
+    fit_changes,
+    text_width,
+)
+
+SHORT = "Built data pipelines in Python"
+LONG = " ".join(["Designed and maintained streaming data pipelines for analytics"] * 4)
+
+
+def _document(items: list[str]) -> str:
+    body = "\n".join(f"    \\resumeItem{{{item}}}" for item in items)
+    return (
+        "\\begin{document}\n"
+        "\\section{Experience}\n"
+        "  \\resumeSubHeadingListStart\n"
+        "    \\resumeSubheading{Company}{2020}{Engineer}{City}\n"
+        "    \\resumeItemListStart\n"
+        f"{body}\n"
+        "    \\resumeItemListEnd\n"
+        "  \\resumeSubHeadingListEnd\n"
+        "\\end{document}\n"
+    )
+
+
+def test_short_paragraph_fits_on_one_line():
+    assert count_lines(SHORT) == 1
+
+
+def test_long_paragraph_wraps():
+    lines = count_lines(LONG)
+    assert lines > 1
+    # Greedy breaking never needs more lines than the natural width implies, plus one
+    assert lines <= text_width(LONG) // ITEM_WIDTH + 2
+
+
+def test_forced_break_starts_a_new_line():
+    assert count_lines(f"{SHORT}\\\\{SHORT}") == 2
+
+
+def test_bold_text_is_wider():
+    assert text_width("\x01Python\x02") > text_width("Python")
+
+
+def test_escaped_characters_are_measured_as_text():
+    assert count_lines("R\\&D \\% growth") == 1
+
+
+def test_paginate_keeps_blocks_whole():
+    half = TEXT_HEIGHT / 2 + 1
+    pages, usage = _paginate([half, half])
+    assert pages == 2
+    assert usage == 1 + half / TEXT_HEIGHT
+
+
+def test_paginate_fills_one_page_exactly():
+    pages, usage = _paginate([TEXT_HEIGHT / 2, TEXT_HEIGHT / 2])
+    assert pages == 1
+    assert usage == 1.0
+
+
+def test_paginate_negative_space_never_goes_below_zero():
+    pages, usage = _paginate([-10.0, SMALL_BASELINE])
+    assert pages == 1
+    assert usage == SMALL_BASELINE / TEXT_HEIGHT
+
+
+def test_estimate_counts_items():
+    layout = estimate_layout(_document([SHORT] * 3))
+    assert layout.pages == 1
+    assert [b.kind for b in layout.blocks].count("item") == 3
+
+
+def test_fit_changes_drops_low_impact_growth_that_overflows():
+    # Fill the page, leaving room for one grown item but not for two
+    count = 1
+    while estimate_layout(_document([SHORT] * (count + 1))).pages == 1:
+        count += 1
+    latex = _document([f"{SHORT} {i}" for i in range(count - 2)])
+    original = estimate_layout(latex)
+    assert original.pages == 1
+
+    changes = [
+        {"id": "change-1", "original_text": f"{SHORT} 1", "proposed_text": LONG, "impact": "high"},
+        {"id": "change-2", "original_text": f"{SHORT} 2", "proposed_text": LONG, "impact": "low"},
+    ]
+    fit = fit_changes(latex, changes, ["change-1", "change-2"], original=original)
+
+    assert fit.requested.pages == 2
+    assert fit.dropped_ids == ["change-2"]
+    assert fit.kept_ids == ["change-1"]
+    assert fit.estimated.pages == 1
+
+
+def test_cached_layout_parses_once_per_cv(monkeypatch):
+    latex = _document([SHORT])
+    calls = []
+    real = page_estimator.estimate_layout
+    monkeypatch.setattr(page_estimator, "estimate_layout", lambda l: calls.append(l) or real(l))
+    monkeypatch.setattr(page_estimator, "_layouts", type(page_estimator._layouts)())
+
+    first = cached_layout("0123456789abcdef", latex)
+    assert cached_layout("0123456789abcdef", latex) is first
+    assert len(calls) == 1
+
+    # Different LaTeX under the same cv_id is re-parsed
+    cached_layout("0123456789abcdef", _document([SHORT, SHORT]))
+    assert len(calls) == 2
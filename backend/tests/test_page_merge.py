@@ -0,0 +1,156 @@
+import asyncio
+
+from src.config import settings
+from src.services import latex_generator
+from src.services.latex_generator import (
+    BEGIN_DOCUMENT,
+    END_DOCUMENT,
+    generate_latex,
+    join_fragments,
+    merge_fragments,
+)
+
+PREAMBLE = "\\documentclass{article}\n"
+
+PAGE_1 = """\\section{Experience}
+  \\resumeSubHeadingListStart
+    \\resumeSubheading{Acme}{2020 -- 2024}{Data Engineer}{Zurich}
+      \\resumeItemListStart
+        \\resumeItem{Built data pipelines}
+      \\resumeItemListEnd
+  \\resumeSubHeadingListEnd"""
+
+
+def _balanced(latex: str) -> bool:
+    return all(
+        latex.count(start) == latex.count(end)
+        for start, end in [
+            ("\\resumeItemListStart", "\\resumeItemListEnd"),
+            ("\\resumeSubHeadingListStart", "\\resumeSubHeadingListEnd"),
+            ("\\begin{itemize}", "\\end{itemize}"),
+        ]
+    )
+
+
+def test_item_list_continues_across_the_page_break():
+    page_2 = """\\resumeSubHeadingListStart
+      \\resumeItemListStart
+        \\resumeItem{Ran the on-call rotation}
+      \\resumeItemListEnd
+  \\resumeSubHeadingListEnd"""
+
+    merged = join_fragments(PAGE_1, page_2)
+
+    assert merged.count("\\resumeItemListStart") == 1
+    assert merged.count("\\resumeSubHeadingListStart") == 1
+    assert _balanced(merged)
+    assert "\\resumeItem{Built data pipelines}\n        \\resumeItem{Ran the on-call rotation}" in merged
+
+
+def test_new_subheading_at_the_top_of_the_next_page():
+    page_2 = """\\resumeSubHeadingListStart
+    \\resumeSubheading{Globex}{2018 -- 2020}{Analyst}{Bern}
+      \\resumeItemListStart
+        \\resumeItem{Wrote reports}
+      \\resumeItemListEnd
+  \\resumeSubHeadingListEnd"""
+
+    merged = join_fragments(PAGE_1, page_2)
+
+    # The subheading list continues; the first job's item list stays closed
+    assert merged.count("\\resumeSubHeadingListStart") == 1
+    assert merged.count("\\resumeItemListStart") == 2
+    assert _balanced(merged)
+    assert merged.index("\\resumeItem{Built data pipelines}") < merged.index(
+        "\\resumeItemListEnd"
+    ) < merged.index("\\resumeSubheading{Globex}")
+
+
+def test_mismatched_closers_and_openers_are_not_cancelled():
+    previous = "\\begin{itemize}\n  \\item Python\n\\end{itemize}"
+    following = "\\resumeItemListStart\n  \\resumeItem{Spark}\n\\resumeItemListEnd"
+
+    assert join_fragments(previous, following) == f"{previous}\n\n{following}"
+
+
+def test_only_matching_outer_lists_are_cancelled():
+    # Outer subheading lists match, inner lists differ: only the outer pair merges
+    page_2 = """\\resumeSubHeadingListStart
+      \\begin{itemize}
+        \\item Spark
+      \\end{itemize}
+  \\resumeSubHeadingListEnd"""
+
+    merged = join_fragments(PAGE_1, page_2)
+
+    assert merged.count("\\resumeSubHeadingListStart") == 1
+    assert merged.count("\\resumeItemListEnd") == 1
+    assert _balanced(merged)
+
+
+def test_closer_followed_by_vspace_is_recognized():
+    previous = "\\resumeItemListStart\n  \\resumeItem{A}\n\\resumeItemListEnd\\vspace{-5pt}"
+    following = "\\resumeItemListStart\n  \\resumeItem{B}\n\\resumeItemListEnd"
+
+    merged = join_fragments(previous, following)
+
+    assert merged == "\\resumeItemListStart\n  \\resumeItem{A}\n  \\resumeItem{B}\n\\resumeItemListEnd"
+
+
+def test_fragments_without_lists_are_joined_as_paragraphs():
+    assert join_fragments("Summary text.\n", "\n\\section{Skills}") == "Summary text.\n\n\\section{Skills}"
+
+
+def test_merge_is_deterministic_and_wraps_the_preamble():
+    fragments = [PAGE_1, "\\section{Skills}\nPython"]
+    merged = merge_fragments(PREAMBLE, fragments)
+
+    assert merged == merge_fragments(PREAMBLE, list(fragments))
+    assert merged.startswith(f"{PREAMBLE}{BEGIN_DOCUMENT}\n\n\\section{{Experience}}")
+    assert merged.endswith(f"Python\n\n{END_DOCUMENT}\n")
+
+
+def _convert(monkeypatch, fail_page: int | None, compiles: bool) -> tuple[str, list[str]]:
+    monkeypatch.setattr(settings, "PARALLEL_PAGE_CONVERSION", True)
+    monkeypatch.setattr(
+        latex_generator, "load_template",
+        lambda: f"{PREAMBLE}{BEGIN_DOCUMENT}\nbody\n{END_DOCUMENT}\n",
+    )
+    calls = []
+
+    async def generate_page_fragment(image, page_number, page_count, template_body):
+        calls.append(f"page-{page_number}")
+        if page_number == fail_page:
+            raise RuntimeError("overloaded")
+        return f"Page {page_number}"
+
+    async def generate_latex_from_images(images):
+        calls.append("whole")
+        return "whole document"
+
+    async def _compiles(latex):
+        return compiles
+
+    monkeypatch.setattr(latex_generator, "generate_page_fragment", generate_page_fragment)
+    monkeypatch.setattr(latex_generator, "generate_latex_from_images", generate_latex_from_images)
+    monkeypatch.setattr(latex_generator, "_compiles", _compiles)
+    latex = asyncio.run(generate_latex([b"page 1", b"page 2"]))
+    return latex, calls
+
+
+def test_pages_are_converted_in_parallel_and_merged(monkeypatch):
+    latex, calls = _convert(monkeypatch, fail_page=None, compiles=True)
+    assert latex == merge_fragments(PREAMBLE, ["Page 1", "Page 2"])
+    assert calls == ["page-1", "page-2"]
+
+
+def test_failed_page_falls_back_to_a_single_request(monkeypatch):
+    latex, calls = _convert(monkeypatch, fail_page=2, compiles=True)
+    assert latex == "whole document"
+    assert calls[-1] == "whole"
+
+
+def test_merged_document_that_does_not_compile_falls_back(monkeypatch):
+    latex, calls = _convert(monkeypatch, fail_page=None, compiles=False)
+    assert latex == "whole document"
+    assert calls == ["page-1", "page-2", "whole"]
@@ -0,0 +1,158 @@
+import os
+import time
+
+from src.config import settings
+from src.services import retention
+from src.services.retention import GRACE_SECONDS, sweep
+
+CV = "0123456789abcdef"
+JOB = "job-1"
+DAY = 24 * 3600
+
+
+def _write(root, rel, age_seconds, size=10):
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    then = time.time() - age_seconds
+    os.utime(path, (then, then))
+    return path
+
+
+def _tree(root, age_seconds):
+    """One upload with its conversion, one analysis and one compiled change set."""
+    return {
+        "upload": _write(root, f"uploads/{CV}.pdf", age_seconds),
+        "latex": _write(root, f"generated/{CV}/original.tex", age_seconds),
+        "analysis": _write(root, f"generated/{CV}/analyses/{JOB}/analysis.json", age_seconds),
+        "set": _write(root, f"generated/{CV}/wizard/{JOB}/sets/abc/optimized.pdf", age_seconds),
+    }
+
+
+def _use_data_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(settings, "DATA_DIR_QUOTA_MB", 0)
+    for name in ("UPLOADS", "LATEX", "ANALYSES", "PDFS", "PREVIEWS", "INTERMEDIATES"):
+        monkeypatch.setattr(settings, f"RETENTION_TTL_HOURS_{name}", 1000)
+
+
+def test_expired_latex_takes_its_analyses_and_pdfs_along(monkeypatch, tmp_path):
+    _use_data_dir(monkeypatch, tmp_path)
+    monkeypatch.setattr(settings, "RETENTION_TTL_HOURS_LATEX", 1)
+    files = _tree(tmp_path, DAY)
+
+    result = sweep()
+
+    assert files["upload"].exists()
+    assert not files["latex"].exists()
+    assert not files["analysis"].exists()
+    assert not files["set"].exists()
+    assert result["expired"] == 3
+
+    # The emptied directories go once their grace period is over
+    sweep(now=time.time() + GRACE_SECONDS + 1)
+    assert not (tmp_path / "generated" / CV).exists()
+
+
+def test_expired_analysis_takes_its_change_sets_along(monkeypatch, tmp_path):
+    _use_data_dir(monkeypatch, tmp_path)
+    monkeypatch.setattr(settings, "RETENTION_TTL_HOURS_ANALYSES", 1)
+    files = _tree(tmp_path, DAY)
+
+    sweep()
+
+    assert files["upload"].exists()
+    assert files["latex"].exists()
+    assert not files["analysis"].exists()
+    assert not files["set"].exists()
+
+
+def test_expired_pdf_is_removed_alone(monkeypatch, tmp_path):
+    _use_data_dir(monkeypatch, tmp_path)
+    monkeypatch.setattr(settings, "RETENTION_TTL_HOURS_PDFS", 1)
+    files = _tree(tmp_path, DAY)
+
+    assert sweep()["expired"] == 1
+    assert not files["set"].exists()
+    assert files["analysis"].exists()
+
+
+def test_quota_evicts_whole_job_groups(monkeypatch, tmp_path):
+    _use_data_dir(monkeypatch, tmp_path)
+    monkeypatch.setattr(settings, "DATA_DIR_QUOTA_MB", 1)
+    size = 400 * 1024
+    _write(tmp_path, f"uploads/{CV}.pdf", DAY, size)
+    _write(tmp_path, f"generated/{CV}/original.tex", DAY, 10)
+    old = [
+        _write(tmp_path, f"generated/{CV}/analyses/old/analysis.json", 3 * DAY, size),
+        _write(tmp_path, f"generated/{CV}/wizard/old/sets/abc/optimized.pdf", 2 * DAY, 10),
+    ]
+    new = _write(tmp_path, f"generated/{CV}/analyses/new/analysis.json", DAY, size)
+
+    result = sweep()
+
+    assert not any(path.exists() for path in old)
+    assert new.exists()
+    assert (tmp_path / "generated" / CV / "original.tex").exists()
+    assert result["evicted"] == 2
+
+
+def test_inputs_outlive_recently_used_dependents_under_quota(monkeypatch, tmp_path):
+    _use_data_dir(monkeypatch, tmp_path)
+    monkeypatch.setattr(settings, "DATA_DIR_QUOTA_MB", 1)
+    size = 400 * 1024
+    upload = _write(tmp_path, f"uploads/{CV}.pdf", 5 * DAY, size)
+    latex = _write(tmp_path, f"generated/{CV}/original.tex", 5 * DAY, size)
+    old = _write(tmp_path, f"generated/{CV}/analyses/old/analysis.json", 3 * DAY, size)
+    new = _write(tmp_path, f"generated/{CV}/analyses/new/analysis.json", DAY, 10)
+
+    sweep()
+
+    # The oldest files are the inputs, but a recent analysis still depends on them
+    assert upload.exists() and latex.exists() and new.exists()
+    assert not old.exists()
+
+
+def test_recently_modified_groups_and_directories_are_spared(monkeypatch, tmp_path):
+    _use_data_dir(monkeypatch, tmp_path)
+    monkeypatch.setattr(settings, "RETENTION_TTL_HOURS_LATEX", 1)
+    latex = _write(tmp_path, f"generated/{CV}/original.tex", DAY)
+    # A request just started writing a new analysis for this conversion
+    fresh = _write(tmp_path, f"generated/{CV}/analyses/{JOB}/summary.txt", 0)
+    empty = tmp_path / "generated" / "fedcba9876543210" / "analyses"
+    empty.mkdir(parents=True)
+
+    sweep()
+
+    assert latex.exists() and fresh.exists()
+    assert empty.exists()
+
+    sweep(now=time.time() + GRACE_SECONDS + 1)
+    assert not latex.exists() and not fresh.exists()
+
+
+def test_remove_empty_dirs_skips_recent_directories(tmp_path):
+    stale = tmp_path / "stale"
+    recent = tmp_path / "recent"
+    stale.mkdir()
+    recent.mkdir()
+    then = time.time() - DAY
+    os.utime(stale, (then, then))
+
+    retention._remove_empty_dirs(tmp_path, time.time())
+
+    assert not stale.exists()
+    assert recent.exists()
+
+
+def test_indexes_are_never_evicted(monkeypatch, tmp_path):
+    _use_data_dir(monkeypatch, tmp_path)
+    monkeypatch.setattr(settings, "DATA_DIR_QUOTA_MB", 1)
+    upload = _write(tmp_path, f"uploads/{CV}.pdf", DAY, 2 * 1024 * 1024)
+    index = _write(tmp_path, "index/cv_fingerprints.bin", 3 * DAY, 1024)
+
+    result = sweep()
+
+    assert not upload.exists()
+    assert index.exists()
+    assert result["total_bytes"] == 0
@@ -0,0 +1,104 @@
+import asyncio
+import io
+
+from fastapi.responses import FileResponse, StreamingResponse
+
+from src.api.routes import cv as cv_routes
+from src.services.storage import LocalArtifactStore, S3ArtifactStore
+
+PDF = b"%PDF-1.4 " + b"x" * 100
+
+
+class FakeClientError(Exception):
+    def __init__(self, code: str) -> None:
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+class FakeBody:
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+
+    def read(self) -> bytes:
+        return self._data
+
+    def iter_chunks(self, chunk_size: int):
+        stream = io.BytesIO(self._data)
+        while chunk := stream.read(chunk_size):
+            yield chunk
+
+
+class FakeS3Client:
+    """The subset of the boto3 S3 client used by S3ArtifactStore, backed by a dict."""
+
+    def __init__(self) -> None:
+        self.objects: dict[str, bytes] = {}
+
+    def _get(self, key: str) -> bytes:
+        if key not in self.objects:
+            raise FakeClientError("NoSuchKey")
+        return self.objects[key]
+
+    def head_object(self, Bucket: str, Key: str) -> dict:
+        return {"ContentLength": len(self._get(Key))}
+
+    def get_object(self, Bucket: str, Key: str) -> dict:
+        return {"Body": FakeBody(self._get(Key))}
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes) -> None:
+        self.objects[Key] = Body
+
+    def copy_object(self, Bucket: str, Key: str, CopySource: dict) -> None:
+        self.objects[Key] = self._get(CopySource["Key"])
+
+
+def _s3_store(tmp_path) -> S3ArtifactStore:
+    store = S3ArtifactStore.__new__(S3ArtifactStore)
+    store._client = FakeS3Client()
+    store._client_error = FakeClientError
+    store.bucket = "bucket"
+    store.prefix = "cvs"
+    store.cache_dir = tmp_path
+    return store
+
+
+async def _body(response: StreamingResponse) -> bytes:
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+def test_s3_store_round_trip(tmp_path):
+    store = _s3_store(tmp_path)
+    store.write_bytes("generated/a/a_optimized.pdf", PDF)
+
+    assert store._client.objects == {"cvs/generated/a/a_optimized.pdf": PDF}
+    assert store.exists("generated/a/a_optimized.pdf")
+    assert not store.exists("generated/a/missing.pdf")
+    assert b"".join(store.iter_bytes("generated/a/a_optimized.pdf")) == PDF
+
+
+def test_latest_pdf_is_streamed_from_s3_not_the_local_cache(monkeypatch, tmp_path):
+    store = _s3_store(tmp_path)
+    key = "generated/a/a_optimized.pdf"
+    store.write_bytes(key, b"stale")
+    # Another replica publishes a new latest result; this replica's cache is now stale
+    store._client.objects[store._object_key(key)] = PDF
+    monkeypatch.setattr(cv_routes, "get_store", lambda: store)
+
+    response = asyncio.run(cv_routes._latest_pdf(key, "a_optimized.pdf"))
+
+    assert isinstance(response, StreamingResponse)
+    assert response.headers["content-disposition"] == 'attachment; filename="a_optimized.pdf"'
+    assert asyncio.run(_body(response)) == PDF
+
+
+def test_latest_pdf_is_a_file_response_for_local_storage(monkeypatch, tmp_path):
+    store = LocalArtifactStore(tmp_path)
+    key = "generated/a/a_optimized.pdf"
+    store.write_bytes(key, PDF)
+    monkeypatch.setattr(cv_routes, "get_store", lambda: store)
+
+    response = asyncio.run(cv_routes._latest_pdf(key, "a_optimized.pdf"))
+
+    assert isinstance(response, FileResponse)
+    assert response.path == tmp_path / key
+    assert response.media_type == "application/pdf"
@@ -11,12 +11,11 @@ import { ReviewView } from "@/components/wizard/review-view";
 import { FinalView } from "@/components/wizard/final-view";
 import { GlassButton } from "@/components/ui/glass-button";
 import { useAppState } from "@/lib/app-state";
+import { useLivePreview } from "@/lib/live-preview";
 import {
-  analyzeCV,
+  analyzeCVStream,
   applyChanges,
-  getOriginalPdfUrl,
-  getOptimizedPdfUrl,
-  getHighlightedPdfUrl,
+  resolveApiUrl,
 } from "@/lib/api-client";
 import type { WizardStep, CVAnalyzeResponse, CVApplyResponse, ChangeProposal } from "@/types";
 
@@ -31,7 +30,14 @@ export default function BetaOptimizePage() {
   const [selectedKeywords, setSelectedKeywords] = useState<string[]>([]);
   const [filteredChanges, setFilteredChanges] = useState<ChangeProposal[]>([]);
   const [error, setError] = useState<string | null>(null);
+  const [changesPending, setChangesPending] = useState(true);
   const hasStarted = useRef(false);
+  const livePreview = useLivePreview(
+    cvId,
+    analysis?.job_id ?? null,
+    acceptedIds,
+    step === "review"
+  );
 
   // Start analysis on mount
   useEffect(() => {
@@ -44,21 +50,45 @@ export default function BetaOptimizePage() {
     hasStarted.current = true;
 
     const minDelay = new Promise((r) => setTimeout(r, 3000));
+    let partial: CVAnalyzeResponse | null = null;
+    const publish = (next: CVAnalyzeResponse) => {
+      partial = next;
+      setAnalysis(next);
+    };
 
-    Promise.all([
-      analyzeCV(cvId, {
+    // Show the score and keywords as soon as they stream in; changes keep arriving
+    analyzeCVStream(
+      cvId,
+      {
         title: selectedJob.title,
         company: selectedJob.company,
         location: selectedJob.location,
         type: selectedJob.type,
         description: selectedJob.description,
         keywords: selectedJob.keywords,
-      }),
-      minDelay,
-    ])
-      .then(([res]) => {
-        setAnalysis(res);
-        setStep("configure");
+      },
+      {
+        onSummary: (summary) => {
+          publish({
+            cv_id: cvId,
+            job_id: "",
+            section_scores: [],
+            issues: [],
+            strengths: [],
+            changes: [],
+            ...summary,
+          });
+          minDelay.then(() => setStep((prev) => (prev === "analyzing" ? "configure" : prev)));
+        },
+        onDetails: (details) => partial && publish({ ...partial, ...details }),
+        onChange: (change) => partial && publish({ ...partial, changes: [...partial.changes, change] }),
+      }
+    )
+      .then(async ({ jobId }) => {
+        await minDelay;
+        if (partial) publish({ ...partial, job_id: jobId });
+        setChangesPending(false);
+        setStep((prev) => (prev === "analyzing" ? "configure" : prev));
       })
       .catch((err) => {
         setError(err instanceof Error ? err.message : "Analysis failed");
@@ -194,6 +224,7 @@ export default function BetaOptimizePage() {
             issues={analysis.issues}
             strengths={analysis.strengths}
             changes={analysis.changes}
+            changesPending={changesPending}
             onContinue={handleConfigureContinue}
           />
         )}
@@ -210,6 +241,8 @@ export default function BetaOptimizePage() {
             onRejectAll={handleRejectAll}
             onFinalize={handleFinalize}
             onBack={() => setStep("configure")}
+            previewUrl={livePreview.highlightedUrl}
+            previewCompiling={livePreview.compiling}
           />
         )}
 
@@ -230,9 +263,9 @@ export default function BetaOptimizePage() {
         {step === "done" && applyResult && analysis && (
           <FinalView
             key="done"
-            originalUrl={getOriginalPdfUrl(applyResult.cv_id)}
-            optimizedUrl={getOptimizedPdfUrl(applyResult.cv_id)}
-            highlightedUrl={getHighlightedPdfUrl(applyResult.cv_id)}
+            originalUrl={resolveApiUrl(applyResult.original_pdf_url)}
+            optimizedUrl={resolveApiUrl(applyResult.optimized_pdf_url)}
+            highlightedUrl={resolveApiUrl(applyResult.highlighted_pdf_url)}
             originalScore={analysis.score}
             acceptedChanges={acceptedChanges}
             onStartOver={handleStartOver}
@@ -2,7 +2,7 @@
 
 import { useState } from "react";
 import ReactMarkdown from "react-markdown";
-import { PdfViewer } from "@/components/pdf-viewer";
+import { PagePreview } from "@/components/page-preview";
 import { GlassButton } from "@/components/ui/glass-button";
 
 interface ComparisonViewProps {
@@ -32,7 +32,7 @@ export function ComparisonView({
             Original
           </span>
           <div className="rounded-2xl border border-border overflow-hidden">
-            <PdfViewer url={originalUrl} />
+            <PagePreview url={originalUrl} />
           </div>
         </div>
 
@@ -47,7 +47,7 @@ export function ComparisonView({
             </span>
           </div>
           <div className="rounded-2xl border border-border overflow-hidden">
-            <PdfViewer url={highlightedUrl} />
+            <PagePreview url={highlightedUrl} />
           </div>
         </div>
       </div>
@@ -0,0 +1,76 @@
+"use client";
+
+import { useState, useEffect } from "react";
+
+interface PagePreviewProps {
+  url: string;
+}
+
+const DISPLAY_WIDTH = 500;
+
+function previewWidth(): number {
+  const dpr = typeof window === "undefined" ? 1 : window.devicePixelRatio || 1;
+  // Round up to a multiple of 100 so the server-side render cache is shared
+  return Math.min(2000, Math.ceil((DISPLAY_WIDTH * dpr) / 100) * 100);
+}
+
+/**
+ * Renders a PDF as server-rendered page images instead of loading the PDF itself.
+ * Pages are requested one after another until the server reports no further page.
+ */
+export function PagePreview({ url }: PagePreviewProps) {
+  const [numPages, setNumPages] = useState(1);
+  const [lastPage, setLastPage] = useState<number | null>(null);
+  const [failed, setFailed] = useState(false);
+  const [width, setWidth] = useState(DISPLAY_WIDTH);
+
+  useEffect(() => {
+    setWidth(previewWidth());
+    setNumPages(1);
+    setLastPage(null);
+    setFailed(false);
+  }, [url]);
+
+  if (failed) {
+    return (
+      <div className="flex h-64 items-center justify-center bg-white text-sm text-destructive">
+        <span className="font-mono text-xs">Failed to load PDF</span>
+      </div>
+    );
+  }
+
+  return (
+    <div className="max-h-[70vh] overflow-y-auto bg-white">
+      {Array.from({ length: numPages }, (_, i) => (
+        <div key={i + 1}>
+          {i > 0 && (
+            <div className="flex items-center gap-3 py-2 px-4">
+              <div className="h-px flex-1 bg-gray-200" />
+              <span className="text-[10px] font-mono text-gray-400">
+                Page {i + 1}
+              </span>
+              <div className="h-px flex-1 bg-gray-200" />
+            </div>
+          )}
+          {/* eslint-disable-next-line @next/next/no-img-element */}
+          <img
+            src={`${url}/preview/${i + 1}?width=${width}&format=webp`}
+            alt={`Page ${i + 1}`}
+            width={DISPLAY_WIDTH}
+            className="mx-auto"
+            onLoad={() => {
+              if (lastPage === null && i + 1 === numPages) setNumPages(numPages + 1);
+            }}
+            onError={() => {
+              if (i === 0) setFailed(true);
+              else {
+                setLastPage(i);
+                setNumPages(i);
+              }
+            }}
+          />
+        </div>
+      ))}
+    </div>
+  );
+}
@@ -1,6 +1,6 @@
 "use client";
 
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useMemo, useRef, useState } from "react";
 import { motion } from "framer-motion";
 import { GlassButton } from "@/components/ui/glass-button";
 import type { AnalysisIssue, AnalysisStrength, ChangeProposal, SectionScore } from "@/types";
@@ -14,6 +14,7 @@ interface AnalysisViewProps {
   issues: AnalysisIssue[];
   strengths: AnalysisStrength[];
   changes: ChangeProposal[];
+  changesPending?: boolean;
   onContinue: (selectedSections: string[], selectedKeywords: string[]) => void;
 }
 
@@ -85,6 +86,7 @@ export function AnalysisView({
   issues,
   strengths,
   changes,
+  changesPending = false,
   onContinue,
 }: AnalysisViewProps) {
   // Derive available sections from changes
@@ -94,10 +96,17 @@ export function AnalysisView({
     return Array.from(secs);
   }, [changes]);
 
-  // Section toggles — all enabled by default
+  // Section toggles — all enabled by default, including sections of changes still streaming in
   const [enabledSections, setEnabledSections] = useState<Set<string>>(
     () => new Set(availableSections)
   );
+  const seenSections = useRef<Set<string>>(new Set(availableSections));
+  useEffect(() => {
+    const added = availableSections.filter((s) => !seenSections.current.has(s));
+    if (added.length === 0) return;
+    added.forEach((s) => seenSections.current.add(s));
+    setEnabledSections((prev) => new Set([...prev, ...added]));
+  }, [availableSections]);
 
   // Missing keyword selection — all selected by default
   const [selectedKeywords, setSelectedKeywords] = useState<Set<string>>(
@@ -354,7 +363,11 @@ export function AnalysisView({
         animate={{ opacity: 1 }}
         transition={{ delay: 0.8 }}
       >
-        {enabledChangesCount > 0 ? (
+        {changesPending ? (
+          <p className="text-xs font-mono text-muted-foreground animate-pulse">
+            Finding improvements... ({changes.length} so far)
+          </p>
+        ) : enabledChangesCount > 0 ? (
           <>
             <GlassButton size="default" onClick={handleContinue}>
               Improve My Resume ({enabledChangesCount} change{enabledChangesCount !== 1 ? "s" : ""})
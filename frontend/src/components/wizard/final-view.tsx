@@ -2,7 +2,7 @@
 
 import { useEffect, useState } from "react";
 import { motion } from "framer-motion";
-import { PdfViewer } from "@/components/pdf-viewer";
+import { PagePreview } from "@/components/page-preview";
 import { GlassButton } from "@/components/ui/glass-button";
 import type { ChangeProposal } from "@/types";
 
@@ -108,7 +108,7 @@ export function FinalView({
             Original
           </span>
           <div className="rounded-2xl border border-border overflow-hidden">
-            <PdfViewer url={originalUrl} />
+            <PagePreview url={originalUrl} />
           </div>
         </div>
 
@@ -123,7 +123,7 @@ export function FinalView({
             </span>
           </div>
           <div className="rounded-2xl border border-border overflow-hidden">
-            <PdfViewer url={highlightedUrl} />
+            <PagePreview url={highlightedUrl} />
           </div>
         </div>
       </div>
@@ -3,6 +3,7 @@
 import { useMemo } from "react";
 import { motion } from "framer-motion";
 import { GlassButton } from "@/components/ui/glass-button";
+import { PagePreview } from "@/components/page-preview";
 import type { ChangeProposal } from "@/types";
 
 interface ReviewViewProps {
@@ -14,6 +15,8 @@ interface ReviewViewProps {
   onRejectAll: () => void;
   onFinalize: () => void;
   onBack: () => void;
+  previewUrl?: string | null;
+  previewCompiling?: boolean;
 }
 
 const impactConfig = {
@@ -31,6 +34,8 @@ export function ReviewView({
   onRejectAll,
   onFinalize,
   onBack,
+  previewUrl = null,
+  previewCompiling = false,
 }: ReviewViewProps) {
   const acceptedCount = acceptedIds.size;
   const totalCount = changes.length;
@@ -75,6 +80,25 @@ export function ReviewView({
         </div>
       </div>
 
+      {/* Live preview of the current selection */}
+      {previewUrl && (
+        <div className="flex flex-col gap-3">
+          <div className="flex items-baseline gap-2">
+            <span className="font-mono text-xs uppercase tracking-wider text-muted-foreground">
+              Preview
+            </span>
+            {previewCompiling && (
+              <span className="font-mono text-[10px] text-muted-foreground/60 animate-pulse">
+                updating...
+              </span>
+            )}
+          </div>
+          <div className="rounded-2xl border border-border overflow-hidden">
+            <PagePreview url={previewUrl} />
+          </div>
+        </div>
+      )}
+
       {/* Keyword info banner */}
       {selectedKeywords.length > 0 && (
         <motion.div
@@ -1,4 +1,4 @@
-import type { CVAnalyzeResponse, CVApplyResponse } from "@/types";
+import type { AnalysisStreamHandlers, CVAnalyzeResponse, CVApplyResponse } from "@/types";
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
@@ -54,6 +54,10 @@ export function getHighlightedPdfUrl(id: string): string {
   return `${API_BASE}/api/cv/${id}/highlighted`;
 }
 
+export function resolveApiUrl(path: string): string {
+  return `${API_BASE}${path}`;
+}
+
 export async function analyzeCV(
   cvId: string,
   job: { title: string; company: string; location: string; type: string; description: string; keywords?: string[] }
@@ -77,6 +81,56 @@ export async function analyzeCV(
   }
 }
 
+/**
+ * Streamed variant of analyzeCV: handlers are called as the server emits partial results.
+ * Resolves with `complete: false` if the server salvaged a partial analysis.
+ */
+export async function analyzeCVStream(
+  cvId: string,
+  job: { title: string; company: string; location: string; type: string; description: string; keywords?: string[] },
+  handlers: AnalysisStreamHandlers
+): Promise<{ jobId: string; complete: boolean }> {
+  const controller = new AbortController();
+  const timeout = setTimeout(() => controller.abort(), 300000); // 5 min
+  try {
+    const res = await fetch(`${API_BASE}/api/cv/analyze/stream`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ cv_id: cvId, job }),
+      signal: controller.signal,
+    });
+    if (!res.ok || !res.body) {
+      const body = await res.json().catch(() => null);
+      throw new Error(body?.detail || `Analysis failed: ${res.statusText}`);
+    }
+
+    const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = "";
+    let jobId = "";
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += value;
+      let sep: number;
+      while ((sep = buffer.indexOf("\n\n")) !== -1) {
+        const block = buffer.slice(0, sep);
+        buffer = buffer.slice(sep + 2);
+        const event = block.match(/^event: (.*)$/m)?.[1];
+        const data = JSON.parse(block.match(/^data: (.*)$/m)?.[1] ?? "{}");
+        if (event === "meta") jobId = data.job_id;
+        else if (event === "summary") handlers.onSummary?.(data);
+        else if (event === "details") handlers.onDetails?.(data);
+        else if (event === "change") handlers.onChange?.(data);
+        else if (event === "error") throw new Error(data.detail || "Analysis failed");
+        else if (event === "done") return { jobId, complete: data.complete };
+      }
+    }
+    throw new Error("Analysis stream ended unexpectedly");
+  } finally {
+    clearTimeout(timeout);
+  }
+}
+
 export async function applyChanges(
   cvId: string,
   jobId: string,
@@ -104,3 +158,8 @@ export async function applyChanges(
     clearTimeout(timeout);
   }
 }
+
+export function openLivePreview(cvId: string, jobId: string): WebSocket {
+  const wsBase = API_BASE.replace(/^http/, "ws");
+  return new WebSocket(`${wsBase}/api/cv/${cvId}/jobs/${jobId}/live`);
+}
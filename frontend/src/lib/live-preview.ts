@@ -0,0 +1,82 @@
+"use client";
+
+import { useEffect, useRef, useState } from "react";
+import { openLivePreview, resolveApiUrl } from "@/lib/api-client";
+import type { LivePreviewMessage } from "@/types";
+
+export interface LivePreviewState {
+  highlightedUrl: string | null;
+  compiling: boolean;
+}
+
+/**
+ * Keeps a server-side live preview in sync with the selected changes.
+ * The server debounces and cancels superseded compiles; we only show the newest result.
+ */
+export function useLivePreview(
+  cvId: string | null,
+  jobId: string | null,
+  acceptedIds: Set<string>,
+  enabled: boolean
+): LivePreviewState {
+  const [state, setState] = useState<LivePreviewState>({ highlightedUrl: null, compiling: false });
+  const socketRef = useRef<WebSocket | null>(null);
+  const sentRef = useRef(0);
+  const pendingRef = useRef<string | null>(null);
+  const retryRef = useRef<number | null>(null);
+
+  useEffect(() => {
+    if (!enabled || !cvId || !jobId) return;
+
+    const ws = openLivePreview(cvId, jobId);
+    socketRef.current = ws;
+    sentRef.current = 0;
+
+    ws.onopen = () => {
+      if (pendingRef.current !== null) {
+        ws.send(pendingRef.current);
+        sentRef.current += 1;
+      }
+    };
+    ws.onmessage = (event) => {
+      const msg: LivePreviewMessage = JSON.parse(event.data);
+      // Ignore anything older than the latest selection we sent
+      if (msg.revision !== undefined && msg.revision !== sentRef.current) return;
+      if (msg.type === "compiling") {
+        setState((prev) => ({ ...prev, compiling: true }));
+      } else if (msg.type === "ready") {
+        setState({ highlightedUrl: resolveApiUrl(msg.highlighted_pdf_url), compiling: false });
+      } else if (msg.type === "busy") {
+        // Server at capacity: ask for the latest selection again once a slot is likely free
+        setState((prev) => ({ ...prev, compiling: false }));
+        retryRef.current = window.setTimeout(() => {
+          if (ws.readyState === WebSocket.OPEN && pendingRef.current !== null) {
+            ws.send(pendingRef.current);
+            sentRef.current += 1;
+          }
+        }, msg.retry_after * 1000);
+      } else {
+        setState((prev) => ({ ...prev, compiling: false }));
+      }
+    };
+
+    return () => {
+      if (retryRef.current !== null) window.clearTimeout(retryRef.current);
+      socketRef.current = null;
+      ws.close();
+    };
+  }, [cvId, jobId, enabled]);
+
+  useEffect(() => {
+    if (!enabled) return;
+    const message = JSON.stringify({ accepted_change_ids: Array.from(acceptedIds) });
+    pendingRef.current = message;
+    const ws = socketRef.current;
+    if (ws && ws.readyState === WebSocket.OPEN) {
+      ws.send(message);
+      sentRef.current += 1;
+    }
+  }, [acceptedIds, enabled]);
+
+  return state;
+}
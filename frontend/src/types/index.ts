@@ -74,13 +74,34 @@ export interface CVAnalyzeResponse {
   issues: AnalysisIssue[];
   strengths: AnalysisStrength[];
   changes: ChangeProposal[];
+  /** False if the analysis was salvaged from a broken-off generation. */
+  complete?: boolean;
 }
 
 export interface CVApplyResponse {
   cv_id: string;
+  change_set_id?: string | null;
   original_pdf_url: string;
   optimized_pdf_url: string;
   highlighted_pdf_url: string;
 }
 
 export type WizardStep = "analyzing" | "configure" | "review" | "compiling" | "done" | "error";
+
+export type LivePreviewMessage =
+  | { type: "compiling"; revision: number }
+  | {
+      type: "ready";
+      revision: number;
+      change_set_id: string;
+      optimized_pdf_url: string;
+      highlighted_pdf_url: string;
+    }
+  | { type: "busy"; revision: number; retry_after: number }
+  | { type: "error"; revision?: number; detail: string };
+
+export interface AnalysisStreamHandlers {
+  onSummary?: (summary: Pick<CVAnalyzeResponse, "score" | "score_label" | "matched_keywords" | "missing_keywords">) => void;
+  onDetails?: (details: Pick<CVAnalyzeResponse, "section_scores" | "issues" | "strengths">) => void;
+  onChange?: (change: ChangeProposal) => void;
+}